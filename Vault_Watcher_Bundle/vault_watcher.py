@@ -1,17 +1,50 @@
+import os
+import sys
 import time
 import subprocess
 from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
-import os
 
-class VaultChangeHandler(FileSystemEventHandler):
-    def on_any_event(self, event):
-        if event.is_directory:
-            return
-        print(f"[Vault Watcher] Change detected: {event.src_path}")
+# Shared event layer and memory modules live in python-backend
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'python-backend'))
+if BACKEND_DIR not in sys.path:
+    sys.path.append(BACKEND_DIR)
+
+from utils.file_events import DebouncedEventHandler
+from memory.vault_indexer import VaultIndexer
+from memory.vector_store import get_vector_store
+
+QUIET_SECONDS = float(os.getenv("VAULT_WATCHER_QUIET_SECONDS", "5"))
+# Write to the store the API's /memory/query reads; its relative default is
+# resolved against python-backend, where the API runs. VectorStorage
+# serializes writers across processes and the API picks up our commits on
+# its next query.
+os.environ.setdefault("MEMORY_VECTOR_PATH", os.path.join(BACKEND_DIR, "data", "vectors.db"))
+
+def ignore_path(path):
+    # Dot folders/files (.git, .obsidian, the index manifest) and editor swap
+    # files churn constantly and never need a sync
+    parts = path.replace("\\", "/").split("/")
+    return any(p.startswith(".") for p in parts if p not in (".", "..")) \
+        or path.endswith((".tmp", ".swp", "~"))
+
+class VaultChangeHandler(DebouncedEventHandler):
+    """
+    One push per quiet window instead of one per raw event. Embeddings are
+    updated in-process, re-embedding only the chunks that actually changed.
+    """
+
+    def __init__(self, indexer, quiet_seconds=QUIET_SECONDS):
+        self.indexer = indexer
+        super().__init__(self.sync, quiet_seconds=quiet_seconds, ignore=ignore_path)
+
+    def sync(self, changes):
+        print(f"[Vault Watcher] {len(changes)} change(s) from {changes.events} event(s): "
+              f"{len(changes.created)} new, {len(changes.modified)} modified, {len(changes.deleted)} deleted")
         try:
+            start = time.perf_counter()
+            embedded = self.indexer.apply(changes)
+            print(f"[Vault Watcher] Re-embedded {embedded} chunk(s) in {time.perf_counter() - start:.2f}s.")
             subprocess.run(["python", "scripts/auto_push_vault.py"], check=True)
-            subprocess.run(["python", "rag-backend/embedder.py"], check=True)
             print("[Vault Watcher] Vault embedded and pushed to GitHub.")
         except subprocess.CalledProcessError as e:
             print("[Vault Watcher] Error during sync:", e)
@@ -19,12 +52,17 @@ class VaultChangeHandler(FileSystemEventHandler):
 if __name__ == "__main__":
     path_to_watch = "vault"
     print(f"[Vault Watcher] Watching: {path_to_watch}")
+    indexer = VaultIndexer(path_to_watch, get_vector_store())
+    # Catch up on edits made while the watcher wasn't running
+    print(f"[Vault Watcher] Startup sync embedded {indexer.sync()} chunk(s).")
+    handler = VaultChangeHandler(indexer)
     observer = Observer()
-    observer.schedule(VaultChangeHandler(), path=path_to_watch, recursive=True)
+    observer.schedule(handler, path=path_to_watch, recursive=True)
     observer.start()
     try:
         while True:
             time.sleep(5)
     except KeyboardInterrupt:
         observer.stop()
-    observer.join()
\ No newline at end of file
+    observer.join()
+    handler.stop()
@@ -57,50 +57,95 @@ function startPythonBackend() {
   return pythonProcess;
 }
 
-// IPC handler for API calls to Python backend
-ipcMain.handle('call-python-api', async (_event, endpoint, data) => {
-  try {
-    const response = await fetch(`${PYTHON_API_URL}${endpoint}`, {
-      method: 'POST',
-      headers: {
-        'Content-Type': 'application/json',
-      },
-      body: JSON.stringify(data),
-    });
-    
+const JOB_POLL_MS = 1000;
+
+async function postJson(endpoint, data) {
+  const response = await fetch(`${PYTHON_API_URL}${endpoint}`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify(data),
+  });
+  
+  if (!response.ok) {
+    throw new Error(`HTTP error! status: ${response.status}`);
+  }
+  
+  return { status: response.status, body: await response.json() };
+}
+
+// Long-running endpoints answer 202 with a job id; poll /jobs/{id} until it
+// finishes, forwarding progress to the renderer on the way
+async function waitForJob(sender, accepted) {
+  while (true) {
+    const response = await fetch(`${PYTHON_API_URL}${accepted.job_url || `/jobs/${accepted.job_id}`}`);
     if (!response.ok) {
       throw new Error(`HTTP error! status: ${response.status}`);
     }
+    const { job } = await response.json();
+    
+    if (!sender.isDestroyed()) {
+      sender.send('job-progress', {
+        id: job.id,
+        type: job.type,
+        status: job.status,
+        progress: job.progress,
+        message: job.message,
+      });
+    }
     
-    return await response.json();
+    if (job.status === 'succeeded') {
+      return job;
+    }
+    if (job.status === 'failed' || job.status === 'cancelled') {
+      throw new Error(`${job.type} job ${job.status}: ${job.error || job.message || 'no details'}`);
+    }
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_MS));
+  }
+}
+
+// IPC handler for API calls to Python backend
+ipcMain.handle('call-python-api', async (event, endpoint, data) => {
+  try {
+    const { status, body } = await postJson(endpoint, data);
+    if (status === 202 && body.job_id) {
+      const job = await waitForJob(event.sender, body);
+      return { status: 'success', result: job.result, message: job.message };
+    }
+    return body;
   } catch (error) {
     console.error('API call error:', error);
     throw error;
   }
 });
 
-// IPC handler for duplicate cleaner (now via API)
-ipcMain.handle('run-duplicate-cleaner', async (_event, options) => {
+// IPC handler for duplicate cleaner (now via API, as a background job)
+ipcMain.handle('run-duplicate-cleaner', async (event, options) => {
   try {
-    const response = await fetch(`${PYTHON_API_URL}/fileflow/duplicate-cleaner`, {
-      method: 'POST',
-      headers: {
-        'Content-Type': 'application/json',
-      },
-      body: JSON.stringify(options),
-    });
-    
-    if (!response.ok) {
-      throw new Error(`HTTP error! status: ${response.status}`);
+    const { status, body } = await postJson('/fileflow/duplicate-cleaner', options);
+    if (status !== 202) {
+      return body;
     }
     
-    return await response.json();
+    const job = await waitForJob(event.sender, body);
+    return {
+      status: 'success',
+      result: job.result,
+      message: 'Duplicate cleaner completed successfully',
+    };
   } catch (error) {
     console.error('Duplicate cleaner API error:', error);
     throw error;
   }
 });
 
+// IPC handler for cancelling a backend job
+ipcMain.handle('cancel-job', async (_event, jobId) => {
+  const response = await fetch(`${PYTHON_API_URL}/jobs/${jobId}/cancel`, { method: 'POST' });
+  return await response.json();
+});
+
 // Start Python backend when app starts
 app.whenReady().then(() => {
   createWindow();
@@ -3,4 +3,10 @@ const { contextBridge, ipcRenderer } = require('electron');
 contextBridge.exposeInMainWorld('electronAPI', {
   callPythonAPI: (endpoint, data) => ipcRenderer.invoke('call-python-api', endpoint, data),
   runDuplicateCleaner: (options) => ipcRenderer.invoke('run-duplicate-cleaner', options),
+  cancelJob: (jobId) => ipcRenderer.invoke('cancel-job', jobId),
+  onJobProgress: (callback) => {
+    const listener = (_event, progress) => callback(progress);
+    ipcRenderer.on('job-progress', listener);
+    return () => ipcRenderer.removeListener('job-progress', listener);
+  },
 });
@@ -0,0 +1,156 @@
+# fileflow/analysis_cache.py
+"""
+Content-addressed cache for extracted text.
+
+Entries are keyed by a hash of the file's bytes plus the extractor version,
+so a file that comes back through the inbox after a rename, copy or undo is
+a lookup instead of another OCR/pdfminer run. Storage is a single SQLite
+table with size-capped LRU eviction.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+DEFAULT_CACHE_PATH = "data/analysis_cache.db"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(path: str) -> str:
+    """BLAKE2b digest of the file contents."""
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class AnalysisCache:
+    """SQLite-backed text cache keyed by (content hash, extractor version)."""
+
+    def __init__(self, db_path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS analysis_cache (
+                content_hash TEXT NOT NULL,
+                extractor TEXT NOT NULL,
+                text TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL,
+                PRIMARY KEY (content_hash, extractor)
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_analysis_cache_access ON analysis_cache(last_access)"
+        )
+        self._conn.commit()
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM analysis_cache"
+        ).fetchone()[0]
+
+    def get(self, content_hash: str, extractor: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text FROM analysis_cache WHERE content_hash = ? AND extractor = ?",
+                (content_hash, extractor),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE analysis_cache SET last_access = ? WHERE content_hash = ? AND extractor = ?",
+                (time.time(), content_hash, extractor),
+            )
+            self._conn.commit()
+            return row[0]
+
+    def put(self, content_hash: str, extractor: str, text: str) -> None:
+        size = len(text.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._conn.execute(
+                "SELECT size FROM analysis_cache WHERE content_hash = ? AND extractor = ?",
+                (content_hash, extractor),
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO analysis_cache VALUES (?, ?, ?, ?, ?)",
+                (content_hash, extractor, text, size, time.time()),
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache is at 90% of its cap."""
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute(
+            "SELECT content_hash, extractor, size FROM analysis_cache ORDER BY last_access"
+        )
+        doomed = []
+        for content_hash, extractor, size in rows:
+            if self._total_bytes <= target:
+                break
+            doomed.append((content_hash, extractor))
+            self._total_bytes -= size
+        self._conn.executemany(
+            "DELETE FROM analysis_cache WHERE content_hash = ? AND extractor = ?", doomed
+        )
+        self.evictions += len(doomed)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM analysis_cache")
+            self._conn.commit()
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM analysis_cache").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": entries,
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_analysis_cache() -> AnalysisCache:
+    """Process-wide cache, configured from FILEFLOW_CACHE_PATH / FILEFLOW_CACHE_MAX_MB."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            max_mb = int(os.getenv("FILEFLOW_CACHE_MAX_MB", DEFAULT_MAX_BYTES // (1024 * 1024)))
+            _default_cache = AnalysisCache(
+                os.getenv("FILEFLOW_CACHE_PATH", DEFAULT_CACHE_PATH),
+                max_bytes=max_mb * 1024 * 1024,
+            )
+        return _default_cache
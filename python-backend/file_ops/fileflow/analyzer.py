@@ -5,7 +5,34 @@ import pytesseract
 from filetype import guess
 
 # PDF reading
-from pdfminer.high_level import extract_text
+from fileflow.pdf_text import extract_pdf_text
+
+from fileflow.analysis_cache import get_analysis_cache, hash_file
+
+IMAGE_EXTENSIONS = [".png", ".jpg", ".jpeg", ".webp", ".bmp"]
+
+# Bump when extraction logic changes so stale cache entries are ignored
+EXTRACTOR_VERSION = "2"
+
+# The renamer reads the first 500 characters; stop parsing PDFs soon after
+PDF_CHAR_BUDGET = int(os.getenv("FILEFLOW_PDF_CHAR_BUDGET", "2000"))
+PDF_MAX_PAGES = int(os.getenv("FILEFLOW_PDF_MAX_PAGES", "10"))
+
+_tesseract_version = None
+
+def extractor_id(ext):
+    """Cache key component naming the extractor (and engine version) for `ext`."""
+    global _tesseract_version
+    if ext in IMAGE_EXTENSIONS:
+        if _tesseract_version is None:
+            try:
+                _tesseract_version = str(pytesseract.get_tesseract_version())
+            except Exception:
+                _tesseract_version = "unknown"
+        return f"tesseract-{_tesseract_version}/v{EXTRACTOR_VERSION}"
+    if ext == ".pdf":
+        return f"pdfminer-{PDF_CHAR_BUDGET}c{PDF_MAX_PAGES}p/v{EXTRACTOR_VERSION}"
+    return None
 
 def extract_text_from_image(path):
     try:
@@ -16,26 +43,52 @@ def extract_text_from_image(path):
 
 def extract_text_from_pdf(path):
     try:
-        return extract_text(path)
+        return extract_pdf_text(path, char_budget=PDF_CHAR_BUDGET, max_pages=PDF_MAX_PAGES)
     except Exception as e:
         print(f"⚠️ PDF text extraction failed: {e}")
         return ""
 
-def analyze_file(filepath):
+def extract_text_for(filepath, ext):
+    # Filetype-based switch
+    if ext in IMAGE_EXTENSIONS:
+        return extract_text_from_image(filepath)
+    elif ext == ".pdf":
+        return extract_text_from_pdf(filepath)
+    return ""  # For now — fallback to future modes
+
+def analyze_file(filepath, cache=None, use_cache=True, extract=None):
+    """
+    Extract text and metadata for `filepath`. `extract(filepath, ext)` overrides
+    the in-process extractor, e.g. with fileflow.ocr_pool.OcrPool.extract.
+    """
     filename = os.path.basename(filepath)
     timestamp = os.path.getmtime(filepath)
     ext = os.path.splitext(filepath)[1].lower()
 
-    # Filetype-based switch
-    if ext in [".png", ".jpg", ".jpeg", ".webp", ".bmp"]:
-        text = extract_text_from_image(filepath)
-    elif ext == ".pdf":
-        text = extract_text_from_pdf(filepath)
+    extract = extract or extract_text_for
+    extractor = extractor_id(ext)
+    content_hash = None
+    if extractor is None:
+        text = ""
+    elif not use_cache:
+        text = extract(filepath, ext)
     else:
-        text = ""  # For now — fallback to future modes
+        cache = cache or get_analysis_cache()
+        content_hash = hash_file(filepath)
+        text = cache.get(content_hash, extractor)
+        if text is None:
+            text = extract(filepath, ext)
+            # Empty results are usually failures; retry them next time
+            if text:
+                cache.put(content_hash, extractor, text)
 
     return {
         "text": text,
         "timestamp": datetime.fromtimestamp(timestamp).strftime("%Y%m%d_%H%M%S"),
-        "original_filename": filename
+        "original_filename": filename,
+        "content_hash": content_hash
     }
+
+def get_cache_stats():
+    """Hit/miss statistics for the shared analysis cache."""
+    return get_analysis_cache().stats()
@@ -1,20 +1,23 @@
-from fileflow.analyzer import analyze_file
-from fileflow.renamer import generate_new_name
-from fileflow.approval import get_user_approval
-from fileflow.mover import move_file
-import time
+from fileflow.engine import IngestionEngine
 
-def process_batch(queue, config):
-    for _ in range(min(config["BATCH_SIZE"], len(queue))):
-        path = queue.pop(0)
-        try:
-            meta = analyze_file(path)
-            new_name = generate_new_name(path, meta)
-            approved = get_user_approval(path, new_name)
-            if approved:
-                move_file(path, new_name, config["PROCESSED_FOLDER"])
-            else:
-                print("Skipped.")
-        except Exception as e:
-            print(f"Error processing {path}: {e}")
-        time.sleep(1)
+def process_batch(queue, config, **engine_options):
+    """
+    Drain up to BATCH_SIZE paths from `queue` and process them concurrently.
+    Accepts a WorkQueue or a plain list; `engine_options` go to IngestionEngine
+    (e.g. approve= for headless runs). Returns the engine's stage stats.
+    """
+    size = min(config["BATCH_SIZE"], len(queue))
+    if hasattr(queue, "get_nowait"):
+        batch = [queue.get_nowait() for _ in range(size)]
+        for _ in batch:
+            queue.task_done()
+    else:
+        batch = queue[:size]
+        del queue[:size]
+
+    engine = IngestionEngine(config, **engine_options).start()
+    for path in batch:
+        engine.submit(path)
+    engine.join()
+    engine.stop()
+    return engine.get_stats()
@@ -9,14 +9,13 @@ if MODULES_DIR not in sys.path:
     sys.path.insert(0, MODULES_DIR)
 
 from fileflow.watcher import start_watcher
-from fileflow.batcher import process_batch
+from fileflow.engine import IngestionEngine
+from fileflow.ocr_pool import OcrPool
 from fileflow.mover import undo_last_move
 from config.env import load_env
 
 def run():
     print("🌀 Initializing QiFileFlow... please wait")
-    queue = []
-
     # Load config
     cfg = load_env()
 
@@ -30,23 +29,39 @@ def run():
 
     print(f"📂 Source folder: {cfg['SOURCE_FOLDER']}")
     print(f"📁 Processed folder: {cfg['PROCESSED_FOLDER']}")
-    print(f"🔁 Batch size: {cfg['BATCH_SIZE']}")
-
-    # Start watcher
-    observer = start_watcher(queue, cfg["SOURCE_FOLDER"])
+    # Start the worker pool, then the watcher that feeds it
+    pool = None
+    if cfg.get("OCR_WORKERS"):
+        # Extract text in worker processes so OCR uses every core
+        pool = OcrPool(workers=cfg["OCR_WORKERS"], timeout=cfg.get("OCR_TIMEOUT", 120))
+        engine = IngestionEngine(cfg, analyze=pool.analyze).start()
+        print(f"🔬 OCR processes: {pool.workers} (timeout {pool.timeout}s)")
+    else:
+        engine = IngestionEngine(cfg).start()
+    print(f"🧵 Workers: {engine.workers}")
+    observer, handler = start_watcher(engine.queue, cfg["SOURCE_FOLDER"], cfg.get("QUIET_SECONDS", 2.0))
     print(f"👁️ Watching folder: {cfg['SOURCE_FOLDER']} (Ctrl+C to stop)")
 
+    last_done = 0
     try:
         while True:
-            if queue:
-                print(f"🧾 Queue size: {len(queue)}")
-                process_batch(queue, cfg)
             time.sleep(2)
+            done = engine.processed + engine.failed
+            if done != last_done or len(engine.queue):
+                print(f"🧾 Queue size: {len(engine.queue)} | processed: {engine.processed} | failed: {engine.failed}")
+                last_done = done
     except KeyboardInterrupt:
         print("🛑 Stopping watcher...")
         observer.stop()
 
     observer.join()
+    # Hand over events still inside their quiet window before the workers drain
+    handler.stop()
+    engine.stop()
+    if pool:
+        pool.close()
+    for name, stage in engine.get_stats()["stages"].items():
+        print(f"📊 {name}: {stage['count']} files, {stage['per_second']}/s, avg {stage['avg_seconds']}s, errors {stage['errors']}")
     print("✅ Done.")
 
 if __name__ == "__main__":
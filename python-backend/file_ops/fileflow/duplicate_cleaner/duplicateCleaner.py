@@ -0,0 +1,517 @@
+"""
+QiLife Duplicate Cleaner (Python)
+
+Finds exact duplicates in one or more directory trees with a three-stage
+pipeline that reads as few bytes as possible:
+
+  1. one os.scandir walk groups files by size (a unique size can't have a
+     duplicate, so most files are never opened);
+  2. files in same-size groups get a partial hash of their first and last
+     64 KB;
+  3. only files whose partial hashes still collide are fully hashed, in a
+     thread pool with 1 MB buffers (BLAKE3 when installed, else BLAKE2b).
+
+Files in the same size group whose contents differ are still scored on
+name similarity and classified against the review/prefer/AI thresholds,
+like the Node.js version (duplicateCleaner.js). Images are additionally
+compared by perceptual hash (image_hashing.py), so re-saved or re-captured
+near-identical pictures are reported as SIMILAR_IMAGE or MANUAL_REVIEW.
+A perceptual match is never proof of a copy -- two screenshots of the same
+window often share a pHash -- so neither label is ever deleted.
+
+Run with flags such as:
+  python duplicateCleaner.py --roots "C:\\path\\to\\scan,D:\\other\\path" --max-depth -1 --action report
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+try:
+    import blake3  # optional, several times faster than hashlib on large files
+except ImportError:
+    blake3 = None
+
+# fileflow/ lives under file_ops
+FILE_OPS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if FILE_OPS_DIR not in sys.path:
+    sys.path.append(FILE_OPS_DIR)
+
+from fileflow.duplicate_cleaner.image_hashing import hash_images, is_image, similar_pairs
+
+PARTIAL_BYTES = 64 * 1024
+READ_BUFFER = 1024 * 1024
+DEFAULT_WEIGHTS = {"name": 0.6, "size": 0.4}
+DEFAULT_THRESHOLDS = {"review": 0.90, "prefer": 0.971, "ai": 0.98}
+MAX_NAME_GROUP = 200  # name scoring is pairwise; skip it for larger same-size groups
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class FileEntry:
+    path: str
+    size: int
+    name: str
+    mtime: float
+
+
+def _new_hasher():
+    return blake3.blake3() if blake3 is not None else hashlib.blake2b(digest_size=20)
+
+
+def scan(roots: Iterable[str], max_depth: int = -1,
+         exclude: Iterable[str] = ()) -> List[FileEntry]:
+    """Walk `roots` once with os.scandir. Hard links to the same inode are listed once."""
+    excluded = {os.path.normcase(os.path.abspath(p)) for p in exclude}
+    seen_inodes = set()
+    files: List[FileEntry] = []
+    for root in roots:
+        stack = [(os.path.abspath(root), 0)]
+        while stack:
+            current, depth = stack.pop()
+            try:
+                entries = os.scandir(current)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if (max_depth == -1 or depth < max_depth) and \
+                                    os.path.normcase(entry.path) not in excluded:
+                                stack.append((entry.path, depth + 1))
+                        elif entry.is_file(follow_symlinks=False):
+                            st = entry.stat(follow_symlinks=False)
+                            if st.st_ino:
+                                key = (st.st_dev, st.st_ino)
+                                if key in seen_inodes:
+                                    continue
+                                seen_inodes.add(key)
+                            files.append(FileEntry(entry.path, st.st_size, entry.name, st.st_mtime))
+                    except OSError:
+                        continue
+    return files
+
+
+def group_by_size(files: Iterable[FileEntry]) -> Dict[int, List[FileEntry]]:
+    groups: Dict[int, List[FileEntry]] = defaultdict(list)
+    for f in files:
+        groups[f.size].append(f)
+    return groups
+
+
+def partial_hash(path: str, size: int) -> Optional[str]:
+    """Hash of the first and last PARTIAL_BYTES (the whole file if it's small)."""
+    try:
+        hasher = _new_hasher()
+        with open(path, "rb") as f:
+            hasher.update(f.read(PARTIAL_BYTES))
+            if size > 2 * PARTIAL_BYTES:
+                f.seek(-PARTIAL_BYTES, os.SEEK_END)
+                hasher.update(f.read(PARTIAL_BYTES))
+            elif size > PARTIAL_BYTES:
+                hasher.update(f.read())
+        return hasher.hexdigest()
+    except OSError:
+        return None
+
+
+def full_hash(path: str, buffer_size: int = READ_BUFFER) -> Optional[str]:
+    """Hash the whole file with a reusable `buffer_size` buffer (hashing releases the GIL)."""
+    try:
+        hasher = _new_hasher()
+        buffer = bytearray(buffer_size)
+        view = memoryview(buffer)
+        with open(path, "rb", buffering=0) as f:
+            while True:
+                n = f.readinto(buffer)
+                if not n:
+                    break
+                hasher.update(view[:n])
+        return hasher.hexdigest()
+    except OSError:
+        return None
+
+
+def normalize_name(name: str) -> str:
+    name = re.sub(r"\.[^.]+$", "", name)
+    name = re.sub(r"[^\w\s]", " ", name)
+    name = re.sub(r"\d{4}[-_]?(\d{2}[-_]?\d{2})?", "", name, count=1)
+    return re.sub(r"\s+", " ", name.lower().strip())
+
+
+def levenshtein(a: str, b: str) -> int:
+    if not a:
+        return len(b)
+    if not b:
+        return len(a)
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(cur[j - 1] + 1, prev[j] + 1, prev[j - 1] + (ca != cb)))
+        prev = cur
+    return prev[-1]
+
+
+def similarity(a: str, b: str) -> float:
+    longest = max(len(a), len(b))
+    return 1.0 if longest == 0 else 1 - levenshtein(a, b) / longest
+
+
+class DuplicateFinder:
+    """
+    Runs the size -> partial hash -> full hash pipeline and keeps byte and
+    timing counters so the savings are visible in the result.
+    """
+
+    def __init__(self, workers: Optional[int] = None,
+                 progress: Optional[Callable[[float, str], None]] = None,
+                 check_cancelled: Optional[Callable[[], None]] = None):
+        self.workers = workers or min(32, (os.cpu_count() or 4) * 2)
+        self.progress = progress or (lambda fraction, message: None)
+        self.check_cancelled = check_cancelled or (lambda: None)
+        self.stats: Dict[str, Any] = {}
+
+    def _hash_all(self, fn: Callable[[FileEntry], Optional[str]],
+                  items: List[FileEntry]) -> Dict[str, Optional[str]]:
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [(f, pool.submit(fn, f)) for f in items]
+            results = {}
+            try:
+                for f, future in futures:
+                    self.check_cancelled()
+                    results[f.path] = future.result()
+            except BaseException:
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+            return results
+
+    def find(self, roots: Iterable[str], max_depth: int = -1,
+             exclude: Iterable[str] = ()) -> Dict[str, Any]:
+        t0 = time.perf_counter()
+        self.progress(0.0, "Scanning")
+        files = scan(roots, max_depth, exclude)
+        size_groups = {s: g for s, g in group_by_size(files).items() if len(g) > 1}
+        t1 = time.perf_counter()
+
+        # Stage 2: partial hashes for every file that shares its size
+        candidates = [f for s, g in size_groups.items() if s > 0 for f in g]
+        self.progress(0.1, f"Partial hashing {len(candidates)} of {len(files)} files")
+        partial = self._hash_all(lambda f: partial_hash(f.path, f.size), candidates)
+        partial_bytes = sum(min(f.size, 2 * PARTIAL_BYTES) for f in candidates)
+        t2 = time.perf_counter()
+
+        # Stage 3: full hashes only where partial hashes still collide
+        buckets: Dict[tuple, List[FileEntry]] = defaultdict(list)
+        for f in candidates:
+            if partial[f.path] is not None:
+                buckets[(f.size, partial[f.path])].append(f)
+        colliding = [g for g in buckets.values() if len(g) > 1]
+        needs_full = [f for g in colliding if g[0].size > 2 * PARTIAL_BYTES for f in g]
+        self.progress(0.4, f"Full hashing {len(needs_full)} files")
+        full = self._hash_all(lambda f: full_hash(f.path), needs_full)
+        full_bytes = sum(f.size for f in needs_full)
+        t3 = time.perf_counter()
+
+        groups: Dict[tuple, List[FileEntry]] = defaultdict(list)
+        for g in colliding:
+            for f in g:
+                # Small files were read completely by the partial hash
+                digest = full.get(f.path) if f.size > 2 * PARTIAL_BYTES else partial[f.path]
+                if digest is not None:
+                    groups[(f.size, digest)].append(f)
+        # Zero-byte files are trivially identical
+        if len(size_groups.get(0, ())) > 1:
+            groups[(0, "empty")] = size_groups[0]
+        duplicate_groups = [
+            {"size": size, "hash": digest, "files": sorted(g, key=lambda f: (f.mtime, f.path))}
+            for (size, digest), g in groups.items() if len(g) > 1
+        ]
+
+        total_bytes = sum(f.size for f in files)
+        self.stats = {
+            "files_scanned": len(files),
+            "bytes_total": total_bytes,
+            "size_collisions": len(candidates),
+            "partial_hashed": len(candidates),
+            "full_hashed": len(needs_full),
+            "bytes_read": partial_bytes + full_bytes,
+            "read_fraction": round((partial_bytes + full_bytes) / total_bytes, 6) if total_bytes else 0.0,
+            "duplicate_groups": len(duplicate_groups),
+            "duplicate_files": sum(len(g["files"]) - 1 for g in duplicate_groups),
+            "seconds": {
+                "scan": round(t1 - t0, 3),
+                "partial_hash": round(t2 - t1, 3),
+                "full_hash": round(t3 - t2, 3),
+            },
+            "hash": "blake3" if blake3 is not None else "blake2b",
+        }
+        self.progress(0.8, f"{len(duplicate_groups)} duplicate groups")
+        return {"files": files, "size_groups": size_groups, "duplicate_groups": duplicate_groups}
+
+    def find_similar_images(self, files: List[FileEntry], duplicate_groups: List[Dict[str, Any]],
+                            min_similarity: float,
+                            exclude: Iterable[tuple] = ()) -> List[Dict[str, Any]]:
+        """
+        Perceptually similar image pairs among `files`. Extra copies from
+        exact groups are left out -- their keeper already stands for them.
+        """
+        t0 = time.perf_counter()
+        extras = {f.path for g in duplicate_groups for f in g["files"][1:]}
+        images = [f.path for f in files if f.path not in extras and is_image(f.path)]
+        self.progress(0.85, f"Perceptual hashing {len(images)} images")
+        hashes = hash_images(
+            images,
+            progress=lambda done, total: self.progress(0.85 + 0.1 * done / total,
+                                                       f"Hashed {done}/{total} images"),
+            check_cancelled=self.check_cancelled,
+        )
+        pairs = similar_pairs(hashes, min_similarity, exclude)
+        self.stats["images_hashed"] = len(hashes)
+        self.stats["similar_image_pairs"] = len(pairs)
+        self.stats["seconds"]["image_hash"] = round(time.perf_counter() - t0, 3)
+        return pairs
+
+
+def classify(size_groups: Dict[int, List[FileEntry]], duplicate_groups: List[Dict[str, Any]],
+             thresholds: Dict[str, float], weights: Dict[str, float]) -> List[Dict[str, Any]]:
+    """
+    Pairs to act on: every extra copy in an exact group (paired with the
+    keeper), plus same-size files with different contents whose composite
+    name/size score passes a threshold.
+    """
+    results = []
+    exact_paths = set()
+    for group in duplicate_groups:
+        keep, *copies = group["files"]
+        exact_paths.update(f.path for f in group["files"])
+        for dup in copies:
+            results.append({"fileA": keep, "fileB": dup, "nameSim": 1.0, "sizeSim": 1.0,
+                            "compSim": 1.0, "classification": "EXACT", "note": "Exact duplicate"})
+
+    for size, group in size_groups.items():
+        group = [f for f in group if f.path not in exact_paths]
+        if len(group) < 2 or len(group) > MAX_NAME_GROUP:
+            continue
+        names = [normalize_name(f.name) for f in group]
+        for i in range(len(group)):
+            for j in range(i + 1, len(group)):
+                name_sim = similarity(names[i], names[j])
+                comp = name_sim * weights["name"] + 1.0 * weights["size"]
+                if comp >= thresholds["ai"] and comp < 1.0:
+                    label = "AI_REVIEW"
+                    note = f"Composite {comp:.3f} ≥ AI threshold {thresholds['ai']}"
+                elif comp >= thresholds["prefer"]:
+                    label = "PREFER_LARGER"
+                    note = f"Composite {comp:.3f} ≥ Prefer threshold {thresholds['prefer']}"
+                elif comp >= thresholds["review"]:
+                    label = "MANUAL_REVIEW"
+                    note = f"Composite {comp:.3f} ≥ Review threshold {thresholds['review']}"
+                else:
+                    continue
+                results.append({"fileA": group[i], "fileB": group[j], "nameSim": name_sim,
+                                "sizeSim": 1.0, "compSim": comp, "classification": label,
+                                "note": note})
+    return results
+
+
+def classify_images(pairs: List[Dict[str, Any]], files: List[FileEntry],
+                    thresholds: Dict[str, float]) -> List[Dict[str, Any]]:
+    """
+    Label similar-image pairs with the review/prefer thresholds. Pairs above
+    the prefer threshold are SIMILAR_IMAGE rather than PREFER_LARGER, so
+    they are only ever moved or linked for review, never deleted.
+    """
+    by_path = {f.path: f for f in files}
+    results = []
+    for pair in pairs:
+        sim = pair["similarity"]
+        if sim >= thresholds["prefer"]:
+            label = "SIMILAR_IMAGE"
+            note = f"Image similarity {sim:.3f} ≥ Prefer threshold {thresholds['prefer']}"
+        elif sim >= thresholds["review"]:
+            label = "MANUAL_REVIEW"
+            note = f"Image similarity {sim:.3f} ≥ Review threshold {thresholds['review']}"
+        else:
+            continue
+        a, b = by_path[pair["a"]], by_path[pair["b"]]
+        results.append({"fileA": a, "fileB": b,
+                        "nameSim": similarity(normalize_name(a.name), normalize_name(b.name)),
+                        "sizeSim": min(a.size, b.size) / max(a.size, b.size, 1),
+                        "compSim": sim, "classification": label,
+                        "note": f"{note} (pHash Δ{pair['phash_distance']}, "
+                                f"dHash Δ{pair['dhash_distance']})"})
+    return results
+
+
+def _handle_file(entry: FileEntry, classification: str, dest_root: str, action: str) -> None:
+    relative = os.path.splitdrive(os.path.abspath(entry.path))[1].lstrip("\\/")
+    dest = os.path.join(dest_root, classification, relative)
+    if action in ("move", "link"):
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        try:
+            if action == "link":
+                os.link(entry.path, dest)
+            else:
+                os.rename(entry.path, dest)
+        except OSError:
+            shutil.copy2(entry.path, dest)
+            if action == "move":
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+    elif action == "delete":
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def perform_actions(classifications: List[Dict[str, Any]], action: str, dest_root: str) -> int:
+    if action == "report":
+        return 0
+    handled = 0
+    for item in classifications:
+        a, b, label = item["fileA"], item["fileB"], item["classification"]
+        # PREFER_LARGER pairs differ in content (exact copies are all EXACT),
+        # so only byte-identical copies may be deleted
+        if label == "EXACT" or (label == "PREFER_LARGER" and action != "delete"):
+            # fileA is the keeper for EXACT; otherwise keep the larger file
+            discard = b if label == "EXACT" or a.size >= b.size else a
+            if os.path.exists(discard.path):
+                _handle_file(discard, label, dest_root, action)
+                handled += 1
+        elif action != "delete":  # never delete on a name match alone
+            for entry in (a, b):
+                if os.path.exists(entry.path):
+                    _handle_file(entry, label, dest_root, action)
+                    handled += 1
+    return handled
+
+
+def write_reports(classifications: List[Dict[str, Any]], output_dir: str) -> Dict[str, str]:
+    os.makedirs(output_dir, exist_ok=True)
+    csv_path = os.path.join(output_dir, "duplicates.csv")
+    json_path = os.path.join(output_dir, "duplicates.json")
+    with open(csv_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["fileA", "fileB", "nameSim", "sizeSim", "composite", "classification", "note"])
+        for item in classifications:
+            writer.writerow([item["fileA"].path, item["fileB"].path, f"{item['nameSim']:.3f}",
+                             f"{item['sizeSim']:.3f}", f"{item['compSim']:.3f}",
+                             item["classification"], item["note"]])
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump([_serializable(item) for item in classifications], f)
+    return {"csv": csv_path, "json": json_path}
+
+
+def _serializable(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: asdict(v) if isinstance(v, FileEntry) else v for k, v in item.items()}
+
+
+def run_duplicate_cleaner(options: Dict[str, Any], job=None) -> Dict[str, Any]:
+    """
+    Entry point for POST /fileflow/duplicate-cleaner. `options` mirrors
+    DuplicateCleanerRequest; `job` is the optional utils.jobs.JobContext.
+    """
+    roots = options.get("roots") or []
+    if isinstance(roots, str):
+        roots = [p.strip() for p in roots.split(",") if p.strip()]
+    if not roots:
+        raise ValueError("roots is required")
+    max_depth = options.get("max_depth")
+    max_depth = -1 if max_depth is None else int(max_depth)
+    weights = {**DEFAULT_WEIGHTS, **(options.get("weights") or {})}
+    thresholds = {
+        name: DEFAULT_THRESHOLDS[name] if options.get(f"{name}_threshold") is None
+        else float(options[f"{name}_threshold"])
+        for name in DEFAULT_THRESHOLDS
+    }
+    action = (options.get("action") or "report").lower()
+    if action not in ("report", "move", "link", "delete"):
+        raise ValueError(f"Unknown action: {action}")
+    output_dir = options.get("output") or os.path.join(roots[0], "_DUPES")
+
+    finder = DuplicateFinder(
+        progress=job.report if job is not None else None,
+        check_cancelled=job.check_cancelled if job is not None else None,
+    )
+    found = finder.find(roots, max_depth, exclude=[output_dir])
+    classifications = classify(found["size_groups"], found["duplicate_groups"], thresholds, weights)
+    if options.get("image_similarity", True) is not False:
+        try:
+            pairs = finder.find_similar_images(
+                found["files"], found["duplicate_groups"],
+                min(thresholds["review"], thresholds["prefer"]),
+                exclude=[(c["fileA"].path, c["fileB"].path) for c in classifications])
+            classifications += classify_images(pairs, found["files"], thresholds)
+        except RuntimeError as e:
+            logger.warning("Skipping image similarity: %s", e)
+    reports = write_reports(classifications, output_dir)
+    handled = perform_actions(classifications, action, output_dir)
+
+    counts: Dict[str, int] = defaultdict(int)
+    for item in classifications:
+        counts[item["classification"]] += 1
+    return {
+        "stats": finder.stats,
+        "classifications": dict(counts),
+        "duplicate_groups": [
+            {"size": g["size"], "hash": g["hash"], "keep": g["files"][0].path,
+             "duplicates": [f.path for f in g["files"][1:]]}
+            for g in found["duplicate_groups"]
+        ],
+        "reports": reports,
+        "action": action,
+        "files_handled": handled,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Find duplicate files")
+    parser.add_argument("--roots", required=True, help="comma-separated paths")
+    parser.add_argument("--max-depth", type=int, default=-1)
+    parser.add_argument("--weights", default="0.6,0.4", help="name,size weights")
+    parser.add_argument("--review-threshold", type=float)
+    parser.add_argument("--prefer-threshold", type=float)
+    parser.add_argument("--ai-threshold", type=float)
+    parser.add_argument("--action", default="report", choices=["report", "move", "link", "delete"])
+    parser.add_argument("--output")
+    parser.add_argument("--no-images", action="store_true",
+                        help="skip perceptual-hash comparison of images")
+    args = parser.parse_args()
+    name_w, size_w = (float(x) for x in args.weights.split(","))
+    result = run_duplicate_cleaner({
+        "roots": args.roots,
+        "max_depth": args.max_depth,
+        "weights": {"name": name_w, "size": size_w},
+        "review_threshold": args.review_threshold,
+        "prefer_threshold": args.prefer_threshold,
+        "ai_threshold": args.ai_threshold,
+        "action": args.action,
+        "output": args.output,
+        "image_similarity": not args.no_images,
+    })
+    stats = result["stats"]
+    print(f"Found {sum(result['classifications'].values())} candidate pairs across "
+          f"{stats['files_scanned']} files "
+          f"(read {stats['read_fraction']:.2%} of {stats['bytes_total']} bytes).")
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
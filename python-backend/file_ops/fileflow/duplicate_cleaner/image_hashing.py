@@ -0,0 +1,330 @@
+"""
+Perceptual hashes and near-duplicate search for images.
+
+Byte hashes only catch identical files; two screenshots of the same window
+or a photo re-saved at a different quality differ in every byte. Each image
+is decoded at reduced size (JPEG draft mode), turned into a 32x32 grayscale
+array and summarised as three 64-bit hashes with NumPy:
+
+  aHash  8x8 mean threshold
+  dHash  9x8 horizontal gradient sign
+  pHash  sign of the low 8x8 DCT coefficients against their median
+
+Hashing runs in a process pool and the results are cached in the shared
+file index (utils/file_index.py), so a rescan only decodes new or changed
+images. Similar pairs are found with multi-index hashing over pHash, so
+100k images never need an all-pairs comparison; a dHash check confirms
+each candidate. Images with identical hashes (blank or repeated captures)
+are collapsed into one bucket first, so a folder of 20k identical
+screenshots costs one index entry rather than 200M candidate pairs.
+"""
+
+import os
+import sys
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# utils/ lives at the python-backend root
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+if BACKEND_DIR not in sys.path:
+    sys.path.append(BACKEND_DIR)
+
+from utils.file_index import FileIndex, get_file_index
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp", ".gif", ".webp", ".tif", ".tiff", ".heic"}
+HASH_BITS = 64
+DHASH_CONFIRM_BITS = 12  # a pHash match must also be this close on dHash
+_DCT_SIZE = 32
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    k = np.arange(n)[:, None]
+    x = np.arange(n)[None, :]
+    return np.cos(np.pi * (2 * x + 1) * k / (2 * n))
+
+
+_DCT = _dct_matrix(_DCT_SIZE)
+
+
+def _bits_to_int(bits: np.ndarray) -> int:
+    return int.from_bytes(np.packbits(bits.ravel()).tobytes(), "big")
+
+
+def hashes_from_array(pixels: np.ndarray) -> Tuple[int, int, int]:
+    """(aHash, dHash, pHash) of a 32x32 grayscale array."""
+    pixels = pixels.astype(np.float64)
+    # Block means give the 8x8 and 9x8 thumbnails without another resize
+    small = pixels.reshape(8, 4, 8, 4).mean(axis=(1, 3))
+    ahash = _bits_to_int(small > small.mean())
+    cols = np.linspace(0, _DCT_SIZE, 10).astype(int)
+    rows = pixels.reshape(8, 4, _DCT_SIZE).mean(axis=1)
+    wide = np.add.reduceat(rows, cols[:-1], axis=1) / np.diff(cols)
+    dhash = _bits_to_int(wide[:, 1:] > wide[:, :-1])
+    low = (_DCT @ pixels @ _DCT.T)[:8, :8]
+    phash = _bits_to_int(low > np.median(low))
+    return ahash, dhash, phash
+
+
+def image_hashes(path: str) -> Optional[Tuple[int, int, int]]:
+    """Decode `path` at reduced size and hash it; None if it can't be read."""
+    try:
+        with Image.open(path) as img:
+            img.draft("L", (_DCT_SIZE * 2, _DCT_SIZE * 2))  # JPEG: decode at 1/2..1/8 scale
+            gray = img.convert("L").resize((_DCT_SIZE, _DCT_SIZE), Image.BOX)
+            return hashes_from_array(np.asarray(gray))
+    except Exception:
+        return None
+
+
+_POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount64(values: np.ndarray) -> np.ndarray:
+    """Set bits per element of a uint64 array."""
+    return _POPCOUNT8[values.view(np.uint8).reshape(-1, 8)].sum(axis=1, dtype=np.uint8)
+
+
+def _flip_masks(bits: int, radius: int) -> np.ndarray:
+    masks = [0]
+    for k in range(1, radius + 1):
+        masks.extend(sum(1 << b for b in combo) for combo in combinations(range(bits), k))
+    return np.array(masks, dtype=np.uint16)
+
+
+class MultiIndexHash:
+    """
+    Multi-index hashing over 64-bit hashes. Each hash is split into four
+    16-bit chunks; by pigeonhole, two hashes within r bits agree to within
+    r // 4 bits on at least one chunk. Every chunk is kept as a sorted table,
+    so candidates come from binary searches for the handful of chunk values
+    near the query instead of a scan of all hashes, and only those
+    candidates get a full Hamming check.
+    """
+
+    CHUNKS = 4
+    CHUNK_BITS = HASH_BITS // CHUNKS
+
+    def __init__(self, hashes: Sequence[int]):
+        self.hashes = np.array(hashes, dtype=np.uint64)
+        self._orders = []
+        self._keys = []
+        for c in range(self.CHUNKS):
+            keys = self._chunk(self.hashes, c)
+            order = np.argsort(keys, kind="stable")
+            self._orders.append(order)
+            self._keys.append(keys[order])
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def _chunk(self, values: np.ndarray, c: int) -> np.ndarray:
+        return ((values >> np.uint64(c * self.CHUNK_BITS)) & np.uint64(0xFFFF)).astype(np.uint16)
+
+    def search(self, value: int, radius: int) -> List[Tuple[int, int]]:
+        """(distance, position) of every stored hash within `radius` of `value`."""
+        query = np.array([value], dtype=np.uint64)
+        masks = _flip_masks(self.CHUNK_BITS, radius // self.CHUNKS)
+        candidates = []
+        for c in range(self.CHUNKS):
+            targets = self._chunk(query, c) ^ masks
+            lo = np.searchsorted(self._keys[c], targets, "left")
+            hi = np.searchsorted(self._keys[c], targets, "right")
+            candidates.extend(self._orders[c][a:b] for a, b in zip(lo, hi) if b > a)
+        if not candidates:
+            return []
+        positions = np.unique(np.concatenate(candidates))
+        distances = popcount64(self.hashes[positions] ^ query)
+        keep = distances <= radius
+        return list(zip(distances[keep].tolist(), positions[keep].tolist()))
+
+    def pairs(self, radius: int) -> np.ndarray:
+        """
+        Every pair of stored hashes within `radius`, as rows (i, j, distance)
+        with i < j. This is the bulk form of search(): each chunk table is
+        joined against itself for every flip mask, all in NumPy. Memory grows
+        with the square of the number of equal values, so store distinct
+        hashes only (see _hash_buckets).
+        """
+        masks = _flip_masks(self.CHUNK_BITS, radius // self.CHUNKS)
+        found = []
+        for order, keys in zip(self._orders, self._keys):
+            for mask in masks:
+                lo = np.searchsorted(keys, keys ^ mask, "left")
+                counts = np.searchsorted(keys, keys ^ mask, "right") - lo
+                total = int(counts.sum())
+                if not total:
+                    continue
+                # Expand each query row into its run of matching rows
+                left = np.repeat(order, counts)
+                offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+                right = order[np.repeat(lo, counts) + offsets]
+                keep = left < right
+                left, right = left[keep], right[keep]
+                distances = popcount64(self.hashes[left] ^ self.hashes[right])
+                close = distances <= radius
+                found.append(np.stack([left[close], right[close], distances[close]], axis=1))
+        if not found:
+            return np.empty((0, 3), dtype=np.int64)
+        rows = np.concatenate(found).astype(np.int64)
+        # The same pair can surface through several chunks
+        _, first = np.unique(rows[:, 0] * len(self) + rows[:, 1], return_index=True)
+        return rows[first]
+
+
+def is_image(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in IMAGE_EXTENSIONS
+
+
+def hash_images(paths: Sequence[str], workers: Optional[int] = None,
+                index: Optional[FileIndex] = None,
+                progress: Optional[Callable[[int, int], None]] = None,
+                check_cancelled: Optional[Callable[[], None]] = None
+                ) -> Dict[str, Tuple[int, int, int]]:
+    """
+    Perceptual hashes for `paths`, reusing the file index's cached values
+    for unchanged files and hashing the rest in a process pool.
+    """
+    if Image is None:
+        raise RuntimeError("Pillow is required for image similarity (pip install Pillow)")
+    index = index or get_file_index()
+    signatures = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        signatures[path] = (st.st_size, st.st_mtime_ns)
+    hashes = index.get_image_hashes(signatures)
+    missing = [p for p in signatures if p not in hashes]
+    if missing:
+        rows = []
+        workers = workers or os.cpu_count() or 4
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            chunksize = max(1, min(64, len(missing) // (workers * 4)))
+            for i, (path, result) in enumerate(
+                    zip(missing, pool.map(image_hashes, missing, chunksize=chunksize)), 1):
+                if check_cancelled is not None:
+                    check_cancelled()
+                if result is not None:
+                    hashes[path] = result
+                    rows.append((path, *signatures[path], *result))
+                if progress is not None and i % 500 == 0:
+                    progress(i, len(missing))
+                if len(rows) >= 1000:
+                    index.put_image_hashes(rows)
+                    rows = []
+        index.put_image_hashes(rows)
+    return hashes
+
+
+def _radius(min_similarity: float) -> int:
+    return int((1.0 - min_similarity) * HASH_BITS + 1e-9)
+
+
+def _hash_buckets(hashes: Dict[str, Tuple[int, int, int]]
+                  ) -> Tuple[List[Tuple[int, int]], List[List[str]]]:
+    """Distinct (pHash, dHash) keys and the sorted paths sharing each one."""
+    buckets: Dict[Tuple[int, int], List[str]] = {}
+    for path in sorted(hashes):
+        buckets.setdefault((hashes[path][2], hashes[path][1]), []).append(path)
+    keys = list(buckets)
+    return keys, [buckets[k] for k in keys]
+
+
+def _bucket_pairs(keys: List[Tuple[int, int]], radius: int
+                  ) -> List[Tuple[int, int, int, int]]:
+    """
+    (i, j, pHash distance, dHash distance) for every pair of distinct
+    buckets whose pHashes are within `radius` and whose dHashes confirm it.
+    The index only ever sees distinct pHash values.
+    """
+    by_phash: Dict[int, List[int]] = defaultdict(list)
+    for i, (phash, _) in enumerate(keys):
+        by_phash[phash].append(i)
+    phashes = sorted(by_phash)
+    # Same pHash with different dHashes, then pairs of distinct pHashes
+    matched = [(p, p, 0) for p in phashes if len(by_phash[p]) > 1]
+    if len(phashes) > 1:
+        rows = MultiIndexHash(phashes).pairs(radius)
+        matched.extend((phashes[i], phashes[j], d) for i, j, d in rows.tolist())
+    limit = max(DHASH_CONFIRM_BITS, radius)
+    found = []
+    for pa, pb, distance in matched:
+        for i in by_phash[pa]:
+            for j in by_phash[pb]:
+                if pa == pb and j <= i:
+                    continue
+                d_distance = bin(keys[i][1] ^ keys[j][1]).count("1")
+                if d_distance <= limit:
+                    found.append((i, j, distance, d_distance))
+    return found
+
+
+def similar_pairs(hashes: Dict[str, Tuple[int, int, int]], min_similarity: float,
+                  exclude: Iterable[Tuple[str, str]] = ()) -> List[Dict[str, object]]:
+    """
+    Pairs whose pHash similarity (1 - distance / 64) is at least
+    `min_similarity` and whose dHashes agree within DHASH_CONFIRM_BITS.
+    Images with identical hashes are interchangeable, so each is paired
+    with the first path of its bucket, and matching buckets are paired
+    through those first paths; the output stays linear in the number of
+    images however many share a hash.
+    """
+    radius = _radius(min_similarity)
+    skip = {frozenset(pair) for pair in exclude}
+    keys, buckets = _hash_buckets(hashes)
+    pairs = []
+
+    def add(a: str, b: str, distance: int, d_distance: int) -> None:
+        if frozenset((a, b)) in skip:
+            return
+        pairs.append({
+            "a": a, "b": b, "phash_distance": distance,
+            "dhash_distance": d_distance,
+            "similarity": 1.0 - distance / HASH_BITS,
+        })
+
+    for members in buckets:
+        for other in members[1:]:
+            add(members[0], other, 0, 0)
+    for i, j, distance, d_distance in _bucket_pairs(keys, radius):
+        add(buckets[i][0], buckets[j][0], distance, d_distance)
+    return pairs
+
+
+def representative_groups(hashes: Dict[str, Tuple[int, int, int]], min_similarity: float,
+                          key: Optional[Callable[[str], object]] = None) -> List[List[str]]:
+    """
+    Groups of two or more images, each led by the image to keep. Images
+    are visited in `key` order (path order by default); each joins the
+    first kept image it matches itself, or is kept. Matches don't chain:
+    A~B and B~C put C with A only if A~C too.
+    """
+    keys, buckets = _hash_buckets(hashes)
+    bucket_of = {path: i for i, members in enumerate(buckets) for path in members}
+    neighbours: Dict[int, List[int]] = defaultdict(list)
+    for i, j, _, _ in _bucket_pairs(keys, _radius(min_similarity)):
+        neighbours[i].append(j)
+        neighbours[j].append(i)
+    kept_in: Dict[int, int] = {}  # bucket -> group of the image kept from it
+    groups: List[List[str]] = []
+    for path in sorted(hashes, key=key):
+        bucket = bucket_of[path]
+        home = kept_in.get(bucket)
+        if home is None:
+            home = min((kept_in[n] for n in neighbours[bucket] if n in kept_in), default=None)
+        if home is None:
+            kept_in[bucket] = len(groups)
+            groups.append([path])
+        else:
+            groups[home].append(path)
+    return [group for group in groups if len(group) > 1]
@@ -0,0 +1,229 @@
+# fileflow/engine.py
+"""
+Concurrent ingestion engine for QiFileFlow.
+
+The watcher feeds file paths into a bounded, thread-safe WorkQueue. A pool of
+worker threads drains it and runs each file through analyze -> rename ->
+approve -> move. When the queue is full, producers block (backpressure)
+instead of growing memory without bound.
+"""
+
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+# utils/ lives at the python-backend root
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if BACKEND_DIR not in sys.path:
+    sys.path.append(BACKEND_DIR)
+
+from utils.metrics import get_metrics
+from fileflow.analyzer import analyze_file
+from fileflow.renamer import generate_new_name
+from fileflow.approval import get_user_approval
+from fileflow.mover import move_file
+
+STAGES = ("analyze", "rename", "approve", "move")
+
+_STOP = object()
+
+
+class WorkQueue:
+    """
+    Bounded FIFO of file paths shared by the watcher and the workers.
+
+    Paths already waiting in the queue are not enqueued twice, so a burst of
+    events for the same file does not schedule duplicate work.
+    """
+
+    def __init__(self, maxsize: int = 1000):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def put(self, path: str, timeout: Optional[float] = None) -> bool:
+        """
+        Enqueue `path`, blocking while the queue is full.
+        Returns False if the path was already pending or the timeout expired.
+        """
+        with self._lock:
+            if path in self._pending:
+                return False
+            self._pending.add(path)
+        try:
+            self._queue.put(path, timeout=timeout)
+        except queue.Full:
+            with self._lock:
+                self._pending.discard(path)
+            return False
+        return True
+
+    # list-style alias so existing callers that append() keep working
+    append = put
+
+    def get(self, block: bool = True, timeout: Optional[float] = None):
+        item = self._queue.get(block=block, timeout=timeout)
+        if item is not _STOP:
+            with self._lock:
+                self._pending.discard(item)
+        return item
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def task_done(self) -> None:
+        self._queue.task_done()
+
+    def join(self) -> None:
+        """Block until every queued path has been processed."""
+        self._queue.join()
+
+    def empty(self) -> bool:
+        return self._queue.empty()
+
+    def __len__(self) -> int:
+        return self._queue.qsize()
+
+    def _put_sentinel(self) -> None:
+        self._queue.put(_STOP)
+
+
+class StageCounter:
+    """Thread-safe per-stage counters: items, errors and busy time."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.count = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, duration: float, ok: bool = True) -> None:
+        with self._lock:
+            self.count += 1
+            self.busy_seconds += duration
+            if not ok:
+                self.errors += 1
+
+    def snapshot(self, elapsed: float) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "count": self.count,
+                "errors": self.errors,
+                "busy_seconds": round(self.busy_seconds, 4),
+                "avg_seconds": round(self.busy_seconds / self.count, 4) if self.count else 0.0,
+                "per_second": round(self.count / elapsed, 2) if elapsed > 0 else 0.0,
+            }
+
+
+class IngestionEngine:
+    """
+    Worker pool that processes paths from a WorkQueue concurrently.
+
+    Stage functions can be swapped out (tests, headless mode). Interactive
+    approval is serialized behind a lock so prompts never interleave.
+    """
+
+    def __init__(self, config: dict, work_queue: Optional[WorkQueue] = None,
+                 workers: Optional[int] = None,
+                 analyze: Callable = analyze_file,
+                 rename: Callable = generate_new_name,
+                 approve: Callable = get_user_approval,
+                 move: Callable = move_file):
+        self.config = config
+        self.queue = work_queue or WorkQueue(config.get("QUEUE_SIZE", 1000))
+        self.workers = workers or config.get("WORKERS") or os.cpu_count() or 4
+        self.analyze = analyze
+        self.rename = rename
+        self.approve = approve
+        self.move = move
+        self.stats = {name: StageCounter(name) for name in STAGES}
+        self.processed = 0
+        self.failed = 0
+        self._approval_lock = threading.Lock()
+        self._count_lock = threading.Lock()
+        self._threads = []
+        self._started_at = None
+
+    def start(self) -> "IngestionEngine":
+        self._started_at = time.perf_counter()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker, name=f"fileflow-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def submit(self, path: str, timeout: Optional[float] = None) -> bool:
+        """Queue a file for processing; blocks while the queue is full."""
+        return self.queue.put(path, timeout=timeout)
+
+    def join(self) -> None:
+        """Wait until everything queued so far has been processed."""
+        self.queue.join()
+
+    def stop(self, wait: bool = True) -> None:
+        """Let the workers finish queued work, then shut them down."""
+        for _ in self._threads:
+            self.queue._put_sentinel()
+        if wait:
+            for t in self._threads:
+                t.join()
+        self._threads = []
+
+    def get_stats(self) -> Dict[str, object]:
+        elapsed = time.perf_counter() - self._started_at if self._started_at else 0.0
+        return {
+            "workers": self.workers,
+            "queued": len(self.queue),
+            "processed": self.processed,
+            "failed": self.failed,
+            "elapsed_seconds": round(elapsed, 3),
+            "stages": {name: c.snapshot(elapsed) for name, c in self.stats.items()},
+        }
+
+    def _timed(self, stage: str, fn: Callable, *args):
+        start = time.perf_counter()
+        try:
+            result = fn(*args)
+        except Exception:
+            elapsed = time.perf_counter() - start
+            self.stats[stage].record(elapsed, ok=False)
+            get_metrics().observe("fileflow_stage", elapsed, stage=stage)
+            get_metrics().inc("fileflow_stage_errors", stage=stage)
+            raise
+        elapsed = time.perf_counter() - start
+        self.stats[stage].record(elapsed)
+        get_metrics().observe("fileflow_stage", elapsed, stage=stage)
+        return result
+
+    def _approve(self, path: str, new_name: str) -> bool:
+        with self._approval_lock:
+            return self.approve(path, new_name)
+
+    def process_file(self, path: str) -> Optional[str]:
+        """Run one file through every stage. Returns the destination path or None."""
+        meta = self._timed("analyze", self.analyze, path)
+        new_name = self._timed("rename", self.rename, path, meta)
+        if not self._timed("approve", self._approve, path, new_name):
+            print("Skipped.")
+            return None
+        return self._timed("move", self.move, path, new_name, self.config["PROCESSED_FOLDER"])
+
+    def _worker(self) -> None:
+        while True:
+            path = self.queue.get()
+            try:
+                if path is _STOP:
+                    return
+                self.process_file(path)
+                with self._count_lock:
+                    self.processed += 1
+            except Exception as e:
+                with self._count_lock:
+                    self.failed += 1
+                print(f"Error processing {path}: {e}")
+            finally:
+                self.queue.task_done()
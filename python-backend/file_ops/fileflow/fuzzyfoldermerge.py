@@ -7,13 +7,99 @@ underscores vs spaces, minor variations) and merges their contents into a single
 "canonical" folder per group. It supports a dry-run mode to preview changes.
 
 Dependencies:
-    pip install rapidfuzz
+    pip install rapidfuzz numpy
 """
 import os
+import re
 import shutil
+from collections import defaultdict
 from pathlib import Path
+from typing import Iterator
+
+import numpy as np
 from rapidfuzz import process, fuzz
 
+BLOCK_KEY_LENGTH = 3   # names are only compared within a shared prefix/suffix block
+CDIST_ROWS = 2048      # rows per cdist call, bounds the score matrix to rows x block size
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase and treat runs of spaces, underscores, dashes and dots as one space."""
+    return re.sub(r"[\s_\-.]+", " ", name.lower()).strip()
+
+
+def blocking_keys(normalized: str, length: int = BLOCK_KEY_LENGTH) -> set[str]:
+    """
+    Prefix and suffix keys. Two names close enough to merge almost always
+    share their first or their last few characters, so only names sharing
+    a key are scored.
+    """
+    return {"^" + normalized[:length], normalized[-length:] + "$"}
+
+
+class _UnionFind:
+    def __init__(self, size: int):
+        self.parent = list(range(size))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+def similar_pairs(names: list[str], threshold: int) -> Iterator[tuple[int, int]]:
+    """
+    Index pairs (i < j) whose fuzz.ratio is at least `threshold`, scored
+    block by block with one multi-threaded rapidfuzz cdist call per chunk.
+    """
+    blocks = defaultdict(list)
+    for idx, name in enumerate(names):
+        for key in blocking_keys(name):
+            blocks[key].append(idx)
+    for members in blocks.values():
+        if len(members) < 2:
+            continue
+        block_names = [names[i] for i in members]
+        ids = np.asarray(members)
+        for start in range(0, len(members), CDIST_ROWS):
+            scores = process.cdist(
+                block_names[start:start + CDIST_ROWS], block_names,
+                scorer=fuzz.ratio, score_cutoff=threshold,
+                dtype=np.uint8, workers=-1,
+            )
+            rows, cols = np.nonzero(scores)
+            rows += start
+            upper = rows < cols
+            yield from zip(ids[rows[upper]].tolist(), ids[cols[upper]].tolist())
+
+
+def iter_clusters(root: Path, threshold: int) -> Iterator[list[Path]]:
+    """
+    Yield clusters of similar folder names under `root`, each a list of
+    Paths to merge together. Clusters are the connected components of all
+    pairs scoring at least `threshold` (0-100) on normalized names, so the
+    result doesn't depend on the order folders are visited in.
+    """
+    folders = sorted((p for p in root.iterdir() if p.is_dir()), key=lambda p: p.name.lower())
+    names = [normalize_name(p.name) for p in folders]
+
+    union_find = _UnionFind(len(folders))
+    for a, b in similar_pairs(names, threshold):
+        union_find.union(a, b)
+
+    groups = defaultdict(list)
+    for idx in range(len(folders)):
+        groups[union_find.find(idx)].append(folders[idx])
+    for root_idx in sorted(groups):
+        if len(groups[root_idx]) > 1:
+            yield groups[root_idx]
+
 
 def find_clusters(root: Path, threshold: int) -> list[list[Path]]:
     """
@@ -26,31 +112,7 @@ def find_clusters(root: Path, threshold: int) -> list[list[Path]]:
     Returns:
         List of clusters, each a list of Paths to merge together.
     """
-    folders = [p for p in root.iterdir() if p.is_dir()]
-    names = [p.name for p in folders]
-
-    clusters = []
-    visited = set()
-
-    for idx, name in enumerate(names):
-        if name in visited:
-            continue
-        matches = process.extract(
-            name,
-            names,
-            scorer=fuzz.ratio,
-            score_cutoff=threshold,
-            limit=None
-        )
-        group = [folders[idx]]
-        visited.add(name)
-        for other_name, score, other_idx in matches:
-            if other_name != name and other_name not in visited:
-                group.append(folders[other_idx])
-                visited.add(other_name)
-        if len(group) > 1:
-            clusters.append(group)
-    return clusters
+    return list(iter_clusters(root, threshold))
 
 
 def merge_cluster(cluster: list[Path], dry_run: bool = True) -> Path:
@@ -110,15 +172,18 @@ def main():
     mode = 'DRY-RUN' if dry_run else 'COMMIT'
     print(f"\nRunning in {mode} mode on: {root}\nSimilarity threshold: {threshold}%\n")
 
-    clusters = find_clusters(root, threshold)
+    # Clusters are printed as they come; only a commit run needs the full list
+    clusters = []
+    for cluster in iter_clusters(root, threshold):
+        if not clusters:
+            print("Similar folders to merge:\n")
+        clusters.append(cluster)
+        names = [p.name for p in cluster]
+        print(f"  Cluster {len(clusters)}: {', '.join(names)}")
     if not clusters:
         print("No similar folders detected. Nothing to merge.")
         return
-
-    print(f"Found {len(clusters)} cluster(s) of similar folders to merge:\n")
-    for i, cluster in enumerate(clusters, 1):
-        names = [p.name for p in cluster]
-        print(f"  Cluster {i}: {', '.join(names)}")
+    print(f"\nFound {len(clusters)} cluster(s) of similar folders to merge.")
 
     if dry_run:
         print("\nDry-run complete. No changes were made.")
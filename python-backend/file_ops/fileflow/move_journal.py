@@ -0,0 +1,265 @@
+# fileflow/move_journal.py
+"""
+Append-only move journal backed by a SQLite WAL table.
+
+Every move is written as a 'pending' intent before the file is touched and
+flipped to 'done' afterwards, so a crash between the two leaves a record
+that recover() can replay. Undo of the last move, a batch or a whole
+session is an indexed lookup; nothing is ever rewritten wholesale.
+
+Several processes (core.run, the API server) share one journal. Each
+journal instance keeps a heartbeat row in `owners` and stamps its pending
+moves with its owner id, so recover() only replays moves whose owner has
+stopped beating, never one that a live process is in the middle of.
+"""
+
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+PENDING = "pending"
+DONE = "done"
+UNDONE = "undone"
+FAILED = "failed"
+
+HEARTBEAT_SECONDS = 10
+LEASE_SECONDS = 60  # an owner silent this long is presumed dead
+
+
+class MoveJournal:
+    """Thread-safe journal of file moves with batch and session grouping."""
+
+    def __init__(self, db_path: str, session_id: Optional[str] = None):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.session_id = session_id or uuid.uuid4().hex
+        self.owner = uuid.uuid4().hex  # this instance, even if a session is shared
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS moves (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                batch_id TEXT,
+                src TEXT NOT NULL,
+                dest TEXT NOT NULL,
+                state TEXT NOT NULL,
+                ts REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_moves_state ON moves(state, id);
+            CREATE INDEX IF NOT EXISTS idx_moves_batch ON moves(batch_id);
+            CREATE INDEX IF NOT EXISTS idx_moves_session ON moves(session_id);
+            CREATE TABLE IF NOT EXISTS owners (
+                owner TEXT PRIMARY KEY,
+                pid INTEGER NOT NULL,
+                heartbeat REAL NOT NULL
+            );
+        """)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(moves)")}
+        if "owner" not in columns:
+            # Journals from before owners existed; their rows count as ownerless
+            self._conn.execute("ALTER TABLE moves ADD COLUMN owner TEXT")
+        self._beat()
+        self._stopped = threading.Event()
+        self._heartbeat = threading.Thread(target=self._heartbeat_loop,
+                                           name="move-journal-heartbeat", daemon=True)
+        self._heartbeat.start()
+
+    @contextmanager
+    def _transaction(self, durable: bool = False):
+        """One commit for everything inside; `durable` forces an fsync on commit."""
+        with self._lock:
+            if durable:
+                self._conn.execute("PRAGMA synchronous=FULL")
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            finally:
+                if durable:
+                    self._conn.execute("PRAGMA synchronous=NORMAL")
+
+    def _beat(self) -> None:
+        with self._transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO owners (owner, pid, heartbeat) VALUES (?, ?, ?)",
+                         (self.owner, os.getpid(), time.time()))
+
+    def _heartbeat_loop(self) -> None:
+        while not self._stopped.wait(HEARTBEAT_SECONDS):
+            try:
+                self._beat()
+            except sqlite3.Error as e:
+                print(f"⚠️ Move journal heartbeat failed: {e}")
+
+    # -- recording -----------------------------------------------------------
+
+    def move(self, src: str, dest: str, batch_id: Optional[str] = None) -> str:
+        """Journal and perform a single move; raises OSError if it fails."""
+        moved = self.move_many([(src, dest)], batch_id=batch_id)
+        if not moved:
+            raise OSError(f"Move failed: {src} -> {dest}")
+        return moved[0]
+
+    def move_many(self, pairs: Iterable[Tuple[str, str]],
+                  batch_id: Optional[str] = None) -> List[str]:
+        """
+        Move many files with two grouped commits: all intents up front, then
+        all completions. Files that fail to move are marked 'failed' and
+        skipped; the rest still complete.
+        """
+        pairs = list(pairs)
+        now = time.time()
+        with self._transaction(durable=True) as conn:
+            ids = []
+            for src, dest in pairs:
+                cur = conn.execute(
+                    "INSERT INTO moves (session_id, batch_id, src, dest, state, ts, owner) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (self.session_id, batch_id, src, dest, PENDING, now, self.owner),
+                )
+                ids.append(cur.lastrowid)
+
+        moved, states = [], []
+        for row_id, (src, dest) in zip(ids, pairs):
+            try:
+                Path(dest).parent.mkdir(parents=True, exist_ok=True)
+                shutil.move(src, dest)
+                moved.append(dest)
+                states.append((DONE, row_id))
+            except Exception as e:
+                print(f"⚠️ Move failed {src} -> {dest}: {e}")
+                states.append((FAILED, row_id))
+
+        with self._transaction() as conn:
+            conn.executemany("UPDATE moves SET state = ? WHERE id = ?", states)
+        return moved
+
+    # -- undo ----------------------------------------------------------------
+
+    def _undo_rows(self, rows) -> int:
+        states = []
+        for row_id, src, dest in rows:
+            try:
+                Path(src).parent.mkdir(parents=True, exist_ok=True)
+                shutil.move(dest, src)
+                states.append((UNDONE, row_id))
+                print(f"Undo complete: {dest} -> {src}")
+            except Exception as e:
+                # Mark it so the next undo moves past it instead of retrying forever
+                states.append((FAILED, row_id))
+                print(f"⚠️ Could not undo {dest} -> {src}: {e}")
+        if states:
+            with self._transaction() as conn:
+                conn.executemany("UPDATE moves SET state = ? WHERE id = ?", states)
+        return sum(1 for state, _ in states if state == UNDONE)
+
+    def undo_last(self) -> int:
+        """Undo the most recent completed move. Returns the number undone."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, src, dest FROM moves WHERE state = ? ORDER BY id DESC LIMIT 1",
+                (DONE,),
+            ).fetchall()
+            return self._undo_rows(rows)
+
+    def undo_batch(self, batch_id: str) -> int:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, src, dest FROM moves WHERE batch_id = ? AND state = ? ORDER BY id DESC",
+                (batch_id, DONE),
+            ).fetchall()
+            return self._undo_rows(rows)
+
+    def undo_session(self, session_id: Optional[str] = None) -> int:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, src, dest FROM moves WHERE session_id = ? AND state = ? ORDER BY id DESC",
+                (session_id or self.session_id, DONE),
+            ).fetchall()
+            return self._undo_rows(rows)
+
+    # -- recovery ------------------------------------------------------------
+
+    def recover(self) -> int:
+        """
+        Replay moves left 'pending' by a crashed process.
+
+        Only moves whose owner's heartbeat is older than LEASE_SECONDS (or
+        that have no owner) are touched; they are claimed in the same
+        transaction that finds them, so two processes starting together
+        never replay the same move. If the destination exists and the source
+        is gone the move finished and is marked done. If the source still
+        exists, any partial destination (an interrupted cross-device copy) is
+        removed and the move is redone. Returns the number of entries resolved.
+        """
+        with self._lock:
+            cutoff = time.time() - LEASE_SECONDS
+            with self._transaction() as conn:
+                rows = conn.execute(
+                    "SELECT m.id, m.src, m.dest FROM moves m "
+                    "LEFT JOIN owners o ON o.owner = m.owner "
+                    "WHERE m.state = ? AND (m.owner IS NULL OR m.owner != ?) "
+                    "AND (o.heartbeat IS NULL OR o.heartbeat < ?) ORDER BY m.id",
+                    (PENDING, self.owner, cutoff),
+                ).fetchall()
+                conn.executemany("UPDATE moves SET owner = ? WHERE id = ?",
+                                 [(self.owner, row_id) for row_id, _, _ in rows])
+                conn.execute("DELETE FROM owners WHERE heartbeat < ?", (cutoff,))
+            states = []
+            for row_id, src, dest in rows:
+                if os.path.exists(src):
+                    try:
+                        if os.path.exists(dest):
+                            os.remove(dest)
+                        Path(dest).parent.mkdir(parents=True, exist_ok=True)
+                        shutil.move(src, dest)
+                        states.append((DONE, row_id))
+                    except Exception as e:
+                        print(f"⚠️ Could not replay move {src} -> {dest}: {e}")
+                        states.append((FAILED, row_id))
+                elif os.path.exists(dest):
+                    states.append((DONE, row_id))
+                else:
+                    states.append((FAILED, row_id))
+            if states:
+                with self._transaction() as conn:
+                    conn.executemany("UPDATE moves SET state = ? WHERE id = ?", states)
+            return len(states)
+
+    def import_legacy_log(self, log_path: str) -> int:
+        """Load 'src -> dest' lines from the old undo.log as completed moves."""
+        if not os.path.exists(log_path):
+            return 0
+        rows = []
+        with open(log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if " -> " in line:
+                    src, dest = line.rstrip("\n").split(" -> ", 1)
+                    rows.append(("legacy", None, src, dest, DONE, 0.0))
+        with self._transaction(durable=True) as conn:
+            conn.executemany(
+                "INSERT INTO moves (session_id, batch_id, src, dest, state, ts) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        os.replace(log_path, log_path + ".migrated")
+        return len(rows)
+
+    def close(self) -> None:
+        self._stopped.set()
+        self._heartbeat.join()
+        with self._lock:
+            self._conn.execute("DELETE FROM owners WHERE owner = ?", (self.owner,))
+            self._conn.close()
@@ -1,6 +1,29 @@
 import os
 import re
 import shutil
+import sys
+
+# fileflow/ lives under file_ops
+FILE_OPS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if FILE_OPS_DIR not in sys.path:
+    sys.path.append(FILE_OPS_DIR)
+
+from fileflow.duplicate_cleaner.image_hashing import hash_images, is_image, representative_groups
+
+NEAR_DUPLICATE_SIMILARITY = 0.95  # pHash similarity; 0.95 allows 3 of 64 bits to differ
+
+
+def near_duplicate_extras(directory, files, min_similarity=NEAR_DUPLICATE_SIMILARITY):
+    """
+    Return near-identical images to set aside. Starting from the largest
+    file, each image is kept unless its perceptual hash matches one already
+    kept, so every extra resembles the copy that stays.
+    """
+    paths = [os.path.join(directory, f) for f in files if is_image(f)]
+    hashes = hash_images(paths)
+    groups = representative_groups(hashes, min_similarity,
+                                   key=lambda p: (-os.path.getsize(p), p))
+    return sorted(os.path.basename(p) for group in groups for p in group[1:])
 
 def delete_screenshots(directory, mode):
     """
@@ -8,7 +31,8 @@ def delete_screenshots(directory, mode):
 
     Args:
         directory (str): The path to the directory containing screenshots.
-        mode (str): The deletion mode ('1' for digit-based, '2' for pattern-based).
+        mode (str): The deletion mode ('1' for digit-based, '2' for pattern-based,
+            '3' for near-duplicate images).
     """
     try:
         delete_folder = os.path.join(directory, "check before delete")
@@ -66,6 +90,19 @@ def delete_screenshots(directory, mode):
                     # print(f"Skipped: {filename}")
                     pass
 
+        # --- Mode 3: Near-duplicate captures (perceptual hash) ---
+        elif mode == '3':
+            print("Running Round 3: Moving near-identical screenshots, keeping the largest of each group...")
+            for filename in near_duplicate_extras(directory, files):
+                source_filepath = os.path.join(directory, filename)
+                destination_filepath = os.path.join(delete_folder, filename)
+                try:
+                    shutil.move(source_filepath, destination_filepath)
+                    print(f"Moved: {filename}")
+                    moved_count += 1
+                except OSError as e:
+                    print(f"Error moving {filename}: {e}")
+
         print(f"\nFinished processing. Moved {moved_count} files to '{delete_folder}'.")
         print("Please review the files in this folder before deleting them permanently.")
 
@@ -84,13 +121,14 @@ def main():
     print("\nPlease choose a deletion method:")
     print("  1: Round 1 (Original method: moves files based on last digit)")
     print("  2: Round 2 (New method: moves files in a patterned sequence)")
+    print("  3: Round 3 (Near duplicates: moves all but the largest of each group of look-alike images)")
 
-    choice = input("Enter your choice (1 or 2): ")
+    choice = input("Enter your choice (1, 2 or 3): ")
 
-    if choice in ['1', '2']:
+    if choice in ['1', '2', '3']:
         delete_screenshots(screenshot_directory, choice)
     else:
-        print("Invalid choice. Please run the script again and enter 1 or 2.")
+        print("Invalid choice. Please run the script again and enter 1, 2 or 3.")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
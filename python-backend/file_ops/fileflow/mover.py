@@ -1,30 +1,45 @@
 import os
-import shutil
-from pathlib import Path
+import threading
 
-UNDO_LOG_PATH = "logs/undo.log"
+from fileflow.move_journal import MoveJournal
 
-def move_file(filepath, new_name, destination_folder):
-    Path(destination_folder).mkdir(parents=True, exist_ok=True)
-    dest_path = os.path.join(destination_folder, new_name)
-    shutil.move(filepath, dest_path)
+UNDO_LOG_PATH = "logs/undo.log"  # legacy text log, imported into the journal once
+JOURNAL_PATH = "logs/moves.db"
+
+_journal = None
+_journal_lock = threading.Lock()
 
-    with open(UNDO_LOG_PATH, "a", encoding="utf-8") as f:
-        f.write(f"{filepath} -> {dest_path}\n")
+def get_journal():
+    """Shared journal; on first use, imports the legacy log and replays unfinished moves."""
+    global _journal
+    with _journal_lock:
+        if _journal is None:
+            _journal = MoveJournal(JOURNAL_PATH)
+            _journal.import_legacy_log(UNDO_LOG_PATH)
+            recovered = _journal.recover()
+            if recovered:
+                print(f"♻️ Recovered {recovered} unfinished move(s) from the journal.")
+        return _journal
+
+def move_file(filepath, new_name, destination_folder, batch_id=None):
+    dest_path = os.path.join(destination_folder, new_name)
+    get_journal().move(filepath, dest_path, batch_id=batch_id)
     return dest_path
 
+def move_files(moves, destination_folder, batch_id=None):
+    """Move many (filepath, new_name) pairs with grouped journal commits."""
+    pairs = [(src, os.path.join(destination_folder, name)) for src, name in moves]
+    return get_journal().move_many(pairs, batch_id=batch_id)
+
 def undo_last_move():
-    if not os.path.exists(UNDO_LOG_PATH):
+    if not get_journal().undo_last():
+        print("Nothing to undo.")
+
+def undo_batch(batch_id):
+    if not get_journal().undo_batch(batch_id):
         print("Nothing to undo.")
-        return
-    with open(UNDO_LOG_PATH, "r", encoding="utf-8") as f:
-        lines = f.readlines()
-    if not lines:
+
+def undo_session(session_id=None):
+    """Undo every move from `session_id` (default: this process's session)."""
+    if not get_journal().undo_session(session_id):
         print("Nothing to undo.")
-        return
-    last = lines[-1]
-    original, moved = last.strip().split(" -> ")
-    shutil.move(moved, original)
-    with open(UNDO_LOG_PATH, "w", encoding="utf-8") as f:
-        f.writelines(lines[:-1])
-    print(f"Undo complete: {moved} -> {original}")
@@ -0,0 +1,313 @@
+# fileflow/naming_service.py
+"""
+Batched, cached and rate-limited LLM file naming.
+
+Concurrent callers of NamingService.name() are coalesced into one chat
+completion per batch (up to `batch_size` files, or whatever arrives within
+`linger_seconds`). Results are cached by a hash of (text snippet, rules),
+requests go through a token bucket and a concurrency cap, and failures are
+retried with exponential backoff before falling back to the deterministic
+smart_file_renamer slug.
+
+Point OPENAI_BASE_URL (or `base_url`) at any OpenAI-compatible server,
+including a local fake one, to exercise the service without the real API.
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# utils/ lives at the python-backend root
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if BACKEND_DIR not in sys.path:
+    sys.path.append(BACKEND_DIR)
+
+from utils.metrics import get_metrics
+
+from fileflow.rules import get_naming_prompt
+from fileflow.analysis_cache import AnalysisCache, get_analysis_cache
+from fileflow import smart_file_renamer
+
+SNIPPET_CHARS = 500
+SYSTEM_PROMPT = "You are a helpful assistant that creates descriptive filenames."
+
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """Block until `tokens` are available, then consume them."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+def fallback_name(filepath: str, metadata: dict) -> str:
+    """Deterministic slug name from smart_file_renamer, used when the LLM is unavailable."""
+    meta = dict(metadata)
+    ts = meta.get("timestamp")
+    # analyzer emits YYYYMMDD_HHMMSS; smart_file_renamer expects ISO format
+    if ts and not re.match(r"\d{4}-\d{2}-\d{2}", ts):
+        try:
+            meta["timestamp"] = datetime.strptime(ts, "%Y%m%d_%H%M%S").isoformat()
+        except ValueError:
+            meta.pop("timestamp")
+    return smart_file_renamer.generate_new_name(filepath, meta)
+
+
+def clean_suggestion(suggestion: str, ext: str) -> str:
+    """Strip quotes, path separators and any extension the model added."""
+    name = suggestion.strip().strip("`'\"").strip()
+    name = re.sub(r'[<>:"/\\|?*\x00-\x1f]', "_", name)
+    if ext and name.lower().endswith(ext.lower()):
+        name = name[: -len(ext)]
+    name = name.strip(" .")
+    return f"{name}{ext}" if name else ""
+
+
+def parse_batch_response(content: str) -> Dict[str, str]:
+    """Accept {"names": {id: name}}, {id: name} or [{"id":..,"name":..}] (optionally fenced)."""
+    content = content.strip()
+    fence = re.match(r"^```(?:json)?\s*(.*?)\s*```$", content, re.S)
+    if fence:
+        content = fence.group(1)
+    data = json.loads(content)
+    if isinstance(data, dict) and "names" in data:
+        data = data["names"]
+    if isinstance(data, list):
+        return {str(d["id"]): str(d["name"]) for d in data if "id" in d and "name" in d}
+    if isinstance(data, dict):
+        return {str(k): str(v) for k, v in data.items()}
+    raise ValueError("Unrecognized batch naming response")
+
+
+class NamingService:
+    """
+    Coalesces naming requests into batched chat completions.
+    Thread-safe; share one instance across fileflow workers.
+    """
+
+    def __init__(self, client=None, model: str = "gpt-4", base_url: Optional[str] = None,
+                 api_key: Optional[str] = None, batch_size: int = 20,
+                 linger_seconds: float = 0.2, max_concurrency: int = 4,
+                 requests_per_second: float = 2.0, max_retries: int = 3,
+                 backoff_seconds: float = 1.0, timeout: float = 30.0,
+                 cache: Optional[AnalysisCache] = None, temperature: float = 0.4):
+        self._client = client
+        self.model = model
+        self.base_url = base_url or os.getenv("OPENAI_BASE_URL")
+        self.api_key = api_key or os.getenv("OPENAI_API_KEY")
+        self.batch_size = batch_size
+        self.linger_seconds = linger_seconds
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.timeout = timeout
+        self.temperature = temperature
+        self.cache = cache if cache is not None else get_analysis_cache()
+        self.bucket = TokenBucket(requests_per_second)
+        self.stats = {"requests": 0, "retries": 0, "cache_hits": 0, "named": 0, "fallbacks": 0}
+        self._stats_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency,
+                                            thread_name_prefix="naming")
+        self._pending: List[Tuple[str, dict, Future]] = []
+        self._cv = threading.Condition()
+        self._dispatcher = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            import openai
+            self._client = openai.OpenAI(api_key=self.api_key, base_url=self.base_url)
+        return self._client
+
+    @property
+    def available(self) -> bool:
+        """False when there is no client, API key or base URL to talk to."""
+        return bool(self._client is not None or self.api_key or self.base_url)
+
+    # -- cache ---------------------------------------------------------------
+
+    def _cache_key(self, metadata: dict, rules: str) -> str:
+        snippet = metadata.get("text", "")[:SNIPPET_CHARS]
+        h = hashlib.blake2b(digest_size=20)
+        h.update(rules.encode("utf-8"))
+        h.update(b"\0")
+        h.update(snippet.encode("utf-8"))
+        if not snippet.strip():
+            # Without text the filename is all the model has to go on
+            h.update(b"\0")
+            h.update(str(metadata.get("original_filename", "")).encode("utf-8"))
+        return h.hexdigest()
+
+    def _cache_namespace(self) -> str:
+        return f"llm-name/{self.model}"
+
+    def _bump(self, key: str, n: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] += n
+
+    # -- public API ----------------------------------------------------------
+
+    def name(self, filepath: str, metadata: dict) -> str:
+        """Name one file; concurrent calls are batched together."""
+        cached = self._lookup(metadata)
+        if cached is not None:
+            return f"{cached}{os.path.splitext(filepath)[1]}"
+        fut: Future = Future()
+        with self._cv:
+            self._pending.append((filepath, metadata, fut))
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch_loop,
+                                                    name="naming-dispatcher", daemon=True)
+                self._dispatcher.start()
+            self._cv.notify()
+        return fut.result()
+
+    def name_many(self, items: Sequence[Tuple[str, dict]]) -> List[str]:
+        """Name a list of (filepath, metadata) pairs in as few requests as possible."""
+        results: List[Optional[str]] = [None] * len(items)
+        todo = []
+        for i, (filepath, metadata) in enumerate(items):
+            cached = self._lookup(metadata)
+            if cached is not None:
+                results[i] = f"{cached}{os.path.splitext(filepath)[1]}"
+            else:
+                todo.append(i)
+        futures = []
+        for start in range(0, len(todo), self.batch_size):
+            chunk = todo[start:start + self.batch_size]
+            futures.append((chunk, self._executor.submit(
+                self._name_batch, [items[i] for i in chunk])))
+        for chunk, fut in futures:
+            for i, name in zip(chunk, fut.result()):
+                results[i] = name
+        return results
+
+    def get_stats(self) -> Dict[str, int]:
+        with self._stats_lock:
+            return dict(self.stats)
+
+    # -- internals -----------------------------------------------------------
+
+    def _lookup(self, metadata: dict) -> Optional[str]:
+        key = self._cache_key(metadata, get_naming_prompt())
+        stem = self.cache.get(key, self._cache_namespace())
+        if stem is not None:
+            self._bump("cache_hits")
+        return stem
+
+    def _dispatch_loop(self) -> None:
+        while True:
+            with self._cv:
+                while not self._pending:
+                    self._cv.wait()
+                deadline = time.monotonic() + self.linger_seconds
+                while len(self._pending) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cv.wait(remaining)
+                batch = self._pending[:self.batch_size]
+                del self._pending[:self.batch_size]
+            self._executor.submit(self._resolve_batch, batch)
+
+    def _resolve_batch(self, batch: List[Tuple[str, dict, Future]]) -> None:
+        try:
+            names = self._name_batch([(path, meta) for path, meta, _ in batch])
+        except Exception as e:
+            for _, _, fut in batch:
+                fut.set_exception(e)
+            return
+        for (_, _, fut), name in zip(batch, names):
+            fut.set_result(name)
+
+    def _build_prompt(self, items: Sequence[Tuple[str, dict]], rules: str) -> str:
+        files = [
+            {
+                "id": str(i),
+                "original_filename": meta.get("original_filename"),
+                "extracted_text": meta.get("text", "")[:SNIPPET_CHARS],
+                "parent_folder": meta.get("parent_folder", ""),
+            }
+            for i, (_, meta) in enumerate(items)
+        ]
+        return f"""
+You are an AI file naming assistant. For each file below, suggest a clean, descriptive filename based on its metadata and the rules.
+
+Files (JSON):
+{json.dumps(files, ensure_ascii=False)}
+
+Rules:
+{rules}
+
+Respond with only a JSON object of the form {{"names": {{"<id>": "<filename>"}}}} covering every id.
+"""
+
+    def _request(self, prompt: str) -> str:
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            self._bump("requests")
+            try:
+                with get_metrics().timer("llm_request", model=self.model):
+                    response = self.client.chat.completions.create(
+                        model=self.model,
+                        messages=[
+                            {"role": "system", "content": SYSTEM_PROMPT},
+                            {"role": "user", "content": prompt},
+                        ],
+                        temperature=self.temperature,
+                        timeout=self.timeout,
+                    )
+                return response.choices[0].message.content
+            except Exception:
+                if attempt >= self.max_retries:
+                    raise
+                self._bump("retries")
+                time.sleep(self.backoff_seconds * (2 ** attempt) * (1 + random.random() * 0.25))
+                attempt += 1
+
+    def _name_batch(self, items: Sequence[Tuple[str, dict]]) -> List[str]:
+        rules = get_naming_prompt()
+        suggestions: Dict[str, str] = {}
+        if self.available:
+            try:
+                suggestions = parse_batch_response(self._request(self._build_prompt(items, rules)))
+            except Exception as e:
+                print(f"⚠️ GPT fallback due to error: {e}")
+
+        names = []
+        for i, (filepath, metadata) in enumerate(items):
+            ext = os.path.splitext(filepath)[1]
+            name = clean_suggestion(suggestions.get(str(i), ""), ext)
+            if name:
+                self.cache.put(self._cache_key(metadata, rules), self._cache_namespace(),
+                               name[: len(name) - len(ext)] if ext else name)
+                self._bump("named")
+            else:
+                name = fallback_name(filepath, metadata)
+                self._bump("fallbacks")
+            names.append(name)
+        return names
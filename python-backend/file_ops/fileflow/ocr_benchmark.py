@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Compare serial and process-pool text extraction on a folder of scans.
+
+Usage:
+    python -m fileflow.ocr_benchmark <folder> [--workers N] [--timeout SECONDS]
+
+Both modes run analyzer.extract_text_for on every image/PDF in the folder
+(no analysis cache), then the outputs are checked for equality.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+MODULES_DIR = os.path.abspath(os.path.join(CURRENT_DIR, '..'))
+if MODULES_DIR not in sys.path:
+    sys.path.insert(0, MODULES_DIR)
+
+from fileflow.analyzer import IMAGE_EXTENSIONS, extract_text_for
+from fileflow.ocr_pool import OcrPool
+
+
+def collect(folder):
+    exts = set(IMAGE_EXTENSIONS) | {".pdf"}
+    return sorted(
+        os.path.join(folder, name) for name in os.listdir(folder)
+        if os.path.splitext(name)[1].lower() in exts
+    )
+
+
+def run_serial(paths):
+    return {p: extract_text_for(p, os.path.splitext(p)[1].lower()) for p in paths}
+
+
+def run_pool(paths, workers, timeout):
+    with OcrPool(workers=workers, timeout=timeout) as pool:
+        with ThreadPoolExecutor(max_workers=pool.workers) as feeder:
+            return dict(zip(paths, feeder.map(pool.extract, paths)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("folder")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    paths = collect(args.folder)
+    if not paths:
+        print("No images or PDFs found.")
+        return 1
+    print(f"📂 {len(paths)} files in {args.folder}")
+
+    start = time.perf_counter()
+    serial = run_serial(paths)
+    serial_s = time.perf_counter() - start
+    print(f"🐢 serial:  {serial_s:.2f}s ({len(paths) / serial_s:.2f} files/s)")
+
+    start = time.perf_counter()
+    pooled = run_pool(paths, args.workers, args.timeout)
+    pool_s = time.perf_counter() - start
+    print(f"🚀 pool:    {pool_s:.2f}s ({len(paths) / pool_s:.2f} files/s), speedup x{serial_s / pool_s:.2f}")
+
+    mismatched = [p for p in paths if serial[p] != pooled[p]]
+    if mismatched:
+        print(f"❌ {len(mismatched)} file(s) differ between modes:")
+        for p in mismatched:
+            print(f"   {p}")
+        return 1
+    print("✅ Outputs identical")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
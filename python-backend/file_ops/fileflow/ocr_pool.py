@@ -0,0 +1,101 @@
+# fileflow/ocr_pool.py
+"""
+Process-pool text extraction for fileflow.
+
+Tesseract and pdfminer are CPU-bound, and pdfminer holds the GIL, so the
+worker threads in fileflow.engine only keep one core busy when they extract
+in-process. OcrPool runs the exact same extractor (analyzer.extract_text_for)
+in worker processes instead, with a per-file timeout: a file that overruns
+gets an empty result and the pool's processes are recycled so a stuck PDF
+cannot stall the pipeline.
+"""
+
+import os
+import sys
+import threading
+from concurrent.futures import (ProcessPoolExecutor, ThreadPoolExecutor,
+                                TimeoutError as FutureTimeout, as_completed)
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterable, Iterator, Optional, Tuple
+
+# utils/ lives at the python-backend root
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if BACKEND_DIR not in sys.path:
+    sys.path.append(BACKEND_DIR)
+
+from utils.metrics import get_metrics
+
+
+def _extract_in_worker(filepath: str, ext: str) -> str:
+    # Imported lazily so the parent doesn't pay for it twice under spawn
+    from fileflow.analyzer import extract_text_for
+    return extract_text_for(filepath, ext)
+
+
+class OcrPool:
+    """
+    Runs text extraction in `workers` processes with a per-file `timeout`.
+
+    At most `workers` extractions are in flight at once, so a file's timeout
+    starts when a process actually picks it up rather than when it was queued.
+    """
+
+    def __init__(self, workers: Optional[int] = None, timeout: float = 120.0):
+        self.workers = workers or os.cpu_count() or 2
+        self.timeout = timeout
+        self.timeouts = 0
+        self._slots = threading.BoundedSemaphore(self.workers)
+        self._lock = threading.Lock()
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def extract(self, filepath: str, ext: Optional[str] = None) -> str:
+        """Extract text for one file in a worker process. Safe to call from many threads."""
+        ext = ext if ext is not None else os.path.splitext(filepath)[1].lower()
+        with self._slots, get_metrics().timer("ocr_extract", ext=ext or "none"):
+            for attempt in range(2):
+                executor = self._executor
+                future = executor.submit(_extract_in_worker, filepath, ext)
+                try:
+                    return future.result(timeout=self.timeout)
+                except FutureTimeout:
+                    self.timeouts += 1
+                    get_metrics().inc("ocr_timeouts")
+                    print(f"⚠️ Text extraction timed out after {self.timeout}s: {filepath}")
+                    self._recycle(executor)
+                    return ""
+                except BrokenProcessPool:
+                    # Another file's timeout killed the pool under us; retry once
+                    if attempt:
+                        raise
+        return ""
+
+    def analyze(self, filepath: str) -> dict:
+        """analyzer.analyze_file with extraction routed through this pool."""
+        from fileflow.analyzer import analyze_file
+        return analyze_file(filepath, extract=self.extract)
+
+    def imap(self, paths: Iterable[str]) -> Iterator[Tuple[str, dict]]:
+        """Yield (path, metadata) for each file as soon as its analysis completes."""
+        with ThreadPoolExecutor(max_workers=self.workers) as feeder:
+            futures = {feeder.submit(self.analyze, p): p for p in paths}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    def _recycle(self, executor: ProcessPoolExecutor) -> None:
+        """Kill the processes of `executor` and replace it, unless already done."""
+        with self._lock:
+            if executor is not self._executor:
+                return
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        for proc in list(getattr(executor, "_processes", {}).values()):
+            proc.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "OcrPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
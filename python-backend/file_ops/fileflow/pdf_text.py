@@ -0,0 +1,118 @@
+# fileflow/pdf_text.py
+"""
+Budgeted PDF text extraction.
+
+The renamer only looks at the first few hundred characters of a document, so
+there is no point parsing a 300-page statement end to end. This extractor
+walks pages in order, stops as soon as it has `char_budget` characters (or
+hits `max_pages`), and only OCRs pages that have no text layer. Text-layer
+detection reuses the vendored ocrmypdf.pdfinfo page scan, one page at a
+time as the extractor reaches it.
+"""
+
+import os
+import sys
+from contextlib import closing
+from typing import Iterator, List, Optional
+
+from pdfminer.converter import PDFPageAggregator
+from pdfminer.layout import LAParams, LTTextContainer
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+
+CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
+OCRMYPDF_SRC = os.path.abspath(
+    os.path.join(CURRENT_DIR, '..', '..', 'utils', 'OCRmyPDF-main', 'src')
+)
+if os.path.isdir(OCRMYPDF_SRC) and OCRMYPDF_SRC not in sys.path:
+    sys.path.append(OCRMYPDF_SRC)
+
+DEFAULT_CHAR_BUDGET = 2000
+DEFAULT_MAX_PAGES = 10
+
+
+def iter_text_pages(path: str) -> Iterator[Optional[bool]]:
+    """
+    Yield each page's text-layer flag from ocrmypdf.pdfinfo, in page order.
+    A page is only scanned when the caller asks for it, so stopping early
+    leaves the rest of the document untouched. Flags are None when the scan
+    is unavailable.
+    """
+    try:
+        import pikepdf
+        from ocrmypdf.pdfinfo.info import PageInfo
+        pdf = pikepdf.open(path)
+    except Exception as e:
+        print(f"⚠️ Text-layer scan unavailable, falling back to pdfminer: {e}")
+        pdf = None
+
+    if pdf is not None:
+        with pdf:
+            for pageno in range(len(pdf.pages)):
+                try:
+                    flag = PageInfo(pdf, pageno, path, check_pages=(pageno,)).has_text
+                except Exception:
+                    flag = None
+                yield flag
+    while True:
+        yield None
+
+
+def ocr_page(path: str, pageno: int) -> str:
+    """OCR a scanned page by running Tesseract on its largest embedded image."""
+    try:
+        import pikepdf
+        import pytesseract
+        from pikepdf import PdfImage
+
+        with pikepdf.open(path) as pdf:
+            page = pdf.pages[pageno]
+            images = [PdfImage(img) for img in page.images.values()]
+            if not images:
+                return ""
+            largest = max(images, key=lambda im: im.width * im.height)
+            return pytesseract.image_to_string(largest.as_pil_image())
+    except Exception as e:
+        print(f"⚠️ OCR failed on page {pageno + 1} of {path}: {e}")
+        return ""
+
+
+def page_text(layout) -> str:
+    return "".join(
+        element.get_text() for element in layout if isinstance(element, LTTextContainer)
+    )
+
+
+def extract_pdf_text(path: str, char_budget: int = DEFAULT_CHAR_BUDGET,
+                     max_pages: int = DEFAULT_MAX_PAGES, ocr: bool = True) -> str:
+    """
+    Return up to roughly `char_budget` characters from the start of the PDF.
+
+    Pages are parsed lazily; parsing stops once the budget is met. Pages the
+    text-layer scan marks as image-only skip pdfminer and go straight to OCR,
+    and pages that yield no text from pdfminer are OCR'd as a fallback.
+    """
+    text_flags = iter_text_pages(path)
+    parts: List[str] = []
+    collected = 0
+
+    rsrcmgr = PDFResourceManager(caching=True)
+    device = PDFPageAggregator(rsrcmgr, laparams=LAParams())
+    interpreter = PDFPageInterpreter(rsrcmgr, device)
+
+    with open(path, "rb") as f, closing(text_flags):
+        for pageno, page in enumerate(PDFPage.get_pages(f, maxpages=max_pages)):
+            flag = next(text_flags)
+            text = ""
+            if flag is not False:
+                interpreter.process_page(page)
+                text = page_text(device.get_result())
+            if not text.strip() and ocr:
+                text = ocr_page(path, pageno)
+            if text:
+                parts.append(text)
+                collected += len(text)
+            if collected >= char_budget:
+                break
+
+    return "".join(parts)
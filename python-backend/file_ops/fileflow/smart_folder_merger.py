@@ -1,13 +1,25 @@
 import os
 import shutil
-import filecmp
 import re
 import json
+import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict, Any, Union
+from typing import List, Dict, Any, Optional, Union
 
-LOG_FILENAME = ".merge_folders_log.json"
+# utils/ lives at the python-backend root
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if BACKEND_DIR not in sys.path:
+    sys.path.append(BACKEND_DIR)
+
+from utils.file_index import get_file_index
+from utils.file_utils import FileUtils
+
+LOG_FILENAME = ".merge_folders_log.jsonl"
+LEGACY_LOG_FILENAME = ".merge_folders_log.json"
+COPY_WORKERS = 4  # concurrent cross-device copies
 
 
 def get_log_path(base_path: Path) -> Path:
@@ -15,23 +27,60 @@ def get_log_path(base_path: Path) -> Path:
     return base_path / LOG_FILENAME
 
 
+class SessionLog:
+    """
+    Append-only JSON-lines log of one merge session. Each operation is
+    written as soon as it completes, so an interrupted merge can still be
+    undone, and a session is never rewritten -- a later undo only appends
+    an "undone" marker.
+    """
+
+    def __init__(self, base_path: Path, session_id: Optional[float] = None):
+        self.path = get_log_path(base_path)
+        self.id = session_id if session_id is not None else time.time()
+        self._lock = threading.Lock()
+
+    def _append(self, record: Dict[str, Any]) -> None:
+        with self._lock, self.path.open('a', encoding='utf-8') as f:
+            f.write(json.dumps({'session': self.id, **record}) + "\n")
+
+    def record(self, op: Dict[str, Any]) -> None:
+        self._append({'op': op})
+
+    def mark(self, status: str) -> None:
+        self._append({'status': status, 'ts': time.time()})
+
+
 def load_logs(base_path: Path) -> List[Dict[str, Any]]:
-    """Loads the log file if it exists."""
-    log_path = get_log_path(base_path)
-    if log_path.exists():
-        with log_path.open('r') as f:
+    """
+    Sessions from the log, oldest first, as {'id', 'operations', 'status'}.
+    Sessions from the old single-JSON log are included ahead of them.
+    """
+    sessions: Dict[Any, Dict[str, Any]] = {}
+    legacy_path = base_path / LEGACY_LOG_FILENAME
+    if legacy_path.exists():
+        with legacy_path.open('r') as f:
             try:
-                return json.load(f)
+                for session in json.load(f):
+                    sessions[session['id']] = {**session, 'status': 'completed'}
             except json.JSONDecodeError:
-                return []
-    return []
-
-
-def save_logs(base_path: Path, logs: List[Dict[str, Any]]) -> None:
-    """Saves the logs to the log file."""
+                pass
     log_path = get_log_path(base_path)
-    with log_path.open('w') as f:
-        json.dump(logs, f, indent=2)
+    if log_path.exists():
+        with log_path.open('r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # a torn last line from an interrupted write
+                session = sessions.setdefault(
+                    record['session'],
+                    {'id': record['session'], 'operations': [], 'status': 'started'})
+                if 'op' in record:
+                    session['operations'].append(record['op'])
+                else:
+                    session['status'] = record['status']
+    return list(sessions.values())
 
 
 def group_folders(base_path: Path) -> Dict[str, List[Path]]:
@@ -75,89 +124,207 @@ def get_unique_name(path: Path) -> Path:
     return new_path
 
 
-def merge_group(folders: List[Path], session_ops: List[Dict[str, Any]], dry_run: bool = False) -> None:
+def _content_hash(path: Path) -> Optional[str]:
+    """Hash through the shared file index, so each file is read at most once."""
+    return get_file_index().get_hash(str(path), FileUtils.get_file_hash, algo="md5")
+
+
+def _same_content(a: Path, a_size: int, b: Path, b_size: int) -> bool:
+    # Different sizes can't be duplicates, and neither file has to be opened
+    if a_size != b_size:
+        return False
+    hash_a = _content_hash(a)
+    return hash_a is not None and hash_a == _content_hash(b)
+
+
+def plan_group(folders: List[Path]) -> Dict[str, Any]:
     """
-    Merges a group of similar folders into a single target folder.
+    Work out every operation for merging a group before touching anything.
+    A name collision is a duplicate only if sizes match and content hashes
+    agree; otherwise the incoming file gets a unique name. Files planned to
+    arrive in the target count as collisions too.
     """
     # The target folder is the one with the shortest name
     target = min(folders, key=lambda p: len(p.name))
-    print(f"\nMerging {len(folders)} folders into: {target.name}")
-
+    target_dev = target.stat().st_dev
+    # name -> (path holding that content, size) for everything in or headed to target
+    occupied: Dict[str, tuple] = {}
+    for entry in os.scandir(target):
+        # A subfolder with the same name is a collision that's never a duplicate
+        occupied[entry.name] = (Path(entry.path), entry.stat().st_size if entry.is_file() else -1)
+
+    ops: List[Dict[str, Any]] = []
+    sources = []
     for src in folders:
         if src == target:
             continue
-
-        print(f"  Processing source folder: {src.name}")
         # Ensure the source directory still exists before processing
         if not src.exists():
             print(f"  - Source folder {src.name} no longer exists, skipping.")
             continue
-
-        for src_file in src.iterdir():
-            if not src_file.is_file():
+        sources.append(src)
+        for entry in sorted(os.scandir(src), key=lambda e: e.name):
+            if not entry.is_file():
+                continue
+            src_file = Path(entry.path)
+            st = entry.stat()
+            existing = occupied.get(entry.name)
+            if existing is not None and _same_content(src_file, st.st_size, *existing):
+                ops.append({'action': 'delete_file', 'path': str(src_file),
+                            'origin': str(target / entry.name), 'size': st.st_size})
                 continue
+            name = entry.name
+            if existing is not None:
+                base, ext = src_file.stem, src_file.suffix
+                i = 1
+                while f"{base}_{i}{ext}" in occupied or (target / f"{base}_{i}{ext}").exists():
+                    i += 1
+                name = f"{base}_{i}{ext}"
+            occupied[name] = (src_file, st.st_size)
+            ops.append({'action': 'move', 'src': str(src_file), 'dest': str(target / name),
+                        'size': st.st_size, 'rename': name != entry.name,
+                        # DirEntry.stat() leaves st_dev as 0 on Windows
+                        'same_device': os.stat(entry.path).st_dev == target_dev})
+    return {'target': target, 'sources': sources, 'operations': ops}
+
+
+def _print_plan(plan: Dict[str, Any]) -> None:
+    for op in plan['operations']:
+        name = os.path.basename(op.get('src') or op['path'])
+        if op['action'] == 'delete_file':
+            print(f"    - Deleting duplicate file: {name}")
+        elif op['rename']:
+            print(f"    - Renaming and moving conflicting file: {name} -> {os.path.basename(op['dest'])}")
+        else:
+            print(f"    - Moving file: {name}")
 
-            dest_file = target / src_file.name
-
-            if dest_file.exists():
-                if filecmp.cmp(str(src_file), str(dest_file), shallow=False):
-                    print(f"    - Deleting duplicate file: {src_file.name}")
-                    if not dry_run:
-                        src_file.unlink()
-                    session_ops.append({
-                        'action': 'delete_file',
-                        'path': str(src_file),
-                        'origin': str(dest_file)
-                    })
-                else:
-                    new_dest = get_unique_name(dest_file)
-                    print(f"    - Renaming and moving conflicting file: {src_file.name} -> {new_dest.name}")
-                    if not dry_run:
-                        shutil.move(str(src_file), new_dest)
-                    session_ops.append({
-                        'action': 'move',
-                        'src': str(src_file),
-                        'dest': str(new_dest)
-                    })
-            else:
-                print(f"    - Moving file: {src_file.name}")
-                if not dry_run:
-                    shutil.move(str(src_file), dest_file)
-                session_ops.append({
-                    'action': 'move',
-                    'src': str(src_file),
-                    'dest': str(dest_file)
-                })
-        
-        # After processing files, attempt to remove the source folder
-        if not dry_run:
-            # Add a small delay to allow cloud sync to release file handles
-            time.sleep(1) 
+
+def execute_plan(plan: Dict[str, Any], session_ops: List[Dict[str, Any]],
+                 log: Optional[SessionLog] = None,
+                 workers: int = COPY_WORKERS) -> List[Dict[str, Any]]:
+    """
+    Run a plan: same-filesystem moves are plain renames done right away,
+    cross-device moves are copied in a bounded thread pool, and duplicates
+    are deleted last (their undo restores from the file they matched, which
+    may be one of the files just moved). Every finished operation goes to
+    `session_ops` and, when given, straight into the session log.
+
+    Returns the operations that failed or were skipped; their files are
+    still in the source folders.
+    """
+    ops = plan['operations']
+    total_bytes = sum(op['size'] for op in ops) or 1
+    done = {'ops': 0, 'bytes': 0}
+    lock = threading.Lock()
+    unfinished: List[Dict[str, Any]] = []
+
+    def finished(op: Dict[str, Any]) -> None:
+        entry = {k: v for k, v in op.items() if k in ('action', 'src', 'dest', 'path', 'origin')}
+        with lock:
+            session_ops.append(entry)
+            done['ops'] += 1
+            done['bytes'] += op['size']
+            print(f"    [{done['ops']}/{len(ops)} · {done['bytes'] / total_bytes:.0%}] "
+                  f"{op['action']}: {os.path.basename(op.get('src') or op['path'])}")
+        if log is not None:
+            log.record(entry)
+
+    copies = []
+    for op in ops:
+        if op['action'] != 'move':
+            continue
+        if op['same_device']:
+            try:
+                os.rename(op['src'], op['dest'])
+                finished(op)
+                continue
+            except OSError:
+                pass  # e.g. a mount point inside the tree; fall back to copying
+        copies.append(op)
+
+    if copies:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(shutil.move, op['src'], op['dest']): op for op in copies}
+            for future in as_completed(futures):
+                op = futures[future]
+                try:
+                    future.result()
+                    finished(op)
+                except Exception as e:
+                    print(f"    - ⚠️ Could not move {op['src']}: {e}")
+                    unfinished.append(op)
+
+    for op in ops:
+        if op['action'] == 'delete_file':
+            if not os.path.exists(op['origin']):
+                print(f"    - Keeping {op['path']}: the copy it matched is missing")
+                unfinished.append(op)
+                continue
             try:
-                # Use shutil.rmtree for more robust deletion of the directory
-                shutil.rmtree(src)
-                print(f"  - Successfully deleted source folder: {src.name}")
-                session_ops.append({'action': 'delete_folder', 'path': str(src)})
-            except PermissionError:
-                print(f"  - Could not delete folder: {src.name}. It may be in use by another process (like Google Drive). Please delete it manually.")
-            except Exception as e:
-                print(f"  - An unexpected error occurred while trying to delete {src.name}: {e}")
+                os.unlink(op['path'])
+                finished(op)
+            except OSError as e:
+                print(f"    - ⚠️ Could not delete {op['path']}: {e}")
+                unfinished.append(op)
+    return unfinished
+
+
+def _leftover_files(folder: Path) -> List[str]:
+    """Files still anywhere under `folder`, e.g. ones a merge could not move."""
+    return [os.path.join(root, name) for root, _, files in os.walk(folder) for name in files]
+
+
+def merge_group(folders: List[Path], session_ops: List[Dict[str, Any]], dry_run: bool = False,
+                log: Optional[SessionLog] = None) -> None:
+    """
+    Merges a group of similar folders into a single target folder.
+    """
+    plan = plan_group(folders)
+    print(f"\nMerging {len(folders)} folders into: {plan['target'].name}")
+    _print_plan(plan)
+    if dry_run:
+        session_ops.extend(plan['operations'])
+        return
+    unfinished = execute_plan(plan, session_ops, log)
+    if unfinished:
+        print(f"  - {len(unfinished)} operation(s) did not complete; their source folders are kept.")
+
+    # After processing files, attempt to remove the source folders. A folder
+    # is only removed once nothing is left in it: a failed move, a kept
+    # duplicate, a subfolder or a file that appeared mid-merge all keep it.
+    for src in plan['sources']:
+        leftover = _leftover_files(src)
+        if leftover:
+            print(f"  - Keeping source folder {src.name}: {len(leftover)} file(s) were not merged, "
+                  f"e.g. {os.path.relpath(leftover[0], src)}")
+            continue
+        # Add a small delay to allow cloud sync to release file handles
+        time.sleep(1)
+        try:
+            # Use shutil.rmtree for more robust deletion of the directory
+            shutil.rmtree(src)
+            print(f"  - Successfully deleted source folder: {src.name}")
+            op = {'action': 'delete_folder', 'path': str(src)}
+            session_ops.append(op)
+            if log is not None:
+                log.record(op)
+        except PermissionError:
+            print(f"  - Could not delete folder: {src.name}. It may be in use by another process (like Google Drive). Please delete it manually.")
+        except Exception as e:
+            print(f"  - An unexpected error occurred while trying to delete {src.name}: {e}")
 
 
 def save_session(base_path: Path, ops: List[Dict[str, Any]]) -> None:
-    """Saves the operations of the current merge session to the log."""
-    logs = load_logs(base_path)
-    session = {
-        'id': time.time(),
-        'operations': ops
-    }
-    logs.append(session)
-    save_logs(base_path, logs)
+    """Appends an already-completed session's operations to the log."""
+    log = SessionLog(base_path)
+    for op in ops:
+        log.record(op)
+    log.mark('completed')
 
 
 def undo_last(base_path: Path) -> None:
     """Reverts the last merge session."""
-    logs = load_logs(base_path)
+    logs = [s for s in load_logs(base_path) if s['status'] != 'undone']
     if not logs:
         print("No merge sessions found to undo.")
         return
@@ -176,14 +343,13 @@ def undo_last(base_path: Path) -> None:
                 print(f"  - Restored deleted file: {op['path']}")
             elif action == 'move':
                 # Ensure the source directory exists before moving back
-                Path(op['src']).parent.mkdir(exist_ok=True)
+                Path(op['src']).parent.mkdir(parents=True, exist_ok=True)
                 shutil.move(op['dest'], op['src'])
                 print(f"  - Moved back file: {op['dest']} -> {op['src']}")
         except Exception as e:
             print(f"  - Could not perform undo operation for {op}: {e}")
 
-
-    save_logs(base_path, logs)
+    SessionLog(base_path, session['id']).mark('undone')
     print("Undo complete.")
 
 
@@ -222,14 +388,16 @@ def main() -> None:
         
         print("\n--- Starting Actual Merge ---")
         session_ops: List[Dict[str, Any]] = []
+        # Operations are logged as they finish, so even an interrupted merge can be undone
+        log = SessionLog(base_path)
         for key, folder_list in groups.items():
-            merge_group(folder_list, session_ops, dry_run=False)
+            merge_group(folder_list, session_ops, dry_run=False, log=log)
 
         if not session_ops:
             print("\nNo operations were performed in the actual merge.")
             continue
         
-        save_session(base_path, session_ops)
+        log.mark('completed')
         print("\nMerge operations completed and logged.")
         if input("Undo last merge? (y/n): ").lower().startswith('y'):
             undo_last(base_path)
@@ -1,19 +1,38 @@
+import os
+import sys
 from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
-import time
 
-class FileWatcher(FileSystemEventHandler):
-    def __init__(self, queue, watch_folder):
+# utils/ lives at the python-backend root
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if BACKEND_DIR not in sys.path:
+    sys.path.append(BACKEND_DIR)
+
+from utils.file_events import DebouncedEventHandler
+
+class FileWatcher(DebouncedEventHandler):
+    """
+    Queues new files once they have finished writing. Events are coalesced per
+    path and only files that stay unchanged for `quiet_seconds` are queued.
+    """
+
+    def __init__(self, queue, watch_folder, quiet_seconds=2.0):
+        # `queue` is a fileflow.engine.WorkQueue; put() blocks while it is full
         self.queue = queue
         self.watch_folder = watch_folder
+        super().__init__(self.on_batch_ready, quiet_seconds=quiet_seconds)
 
-    def on_created(self, event):
-        if not event.is_directory:
-            self.queue.append(event.src_path)
+    def on_batch_ready(self, changes):
+        for path in changes.created:
+            self.queue.put(path)
 
-def start_watcher(queue, watch_folder):
+def start_watcher(queue, watch_folder, quiet_seconds=2.0):
+    """
+    Returns (observer, handler). To shut down, stop and join the observer,
+    then call handler.stop() so paths still waiting out their quiet window
+    are queued instead of dropped.
+    """
     observer = Observer()
-    event_handler = FileWatcher(queue, watch_folder)
+    event_handler = FileWatcher(queue, watch_folder, quiet_seconds)
     observer.schedule(event_handler, watch_folder, recursive=False)
     observer.start()
-    return observer
+    return observer, event_handler
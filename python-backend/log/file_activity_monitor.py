@@ -1,6 +1,13 @@
+import os
+import sys
 import time
 from watchdog.observers import Observer
-from watchdog.events import FileSystemEventHandler
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if BACKEND_DIR not in sys.path:
+    sys.path.append(BACKEND_DIR)
+
+from utils.file_events import DebouncedEventHandler
 from a_core.e_utils.ae03_utils import load_env, setup_logger
 from a_core.a_fileflow.aa04_analyze import analyze_file
 from a_core.a_fileflow.aa06_rename import generate_new_name
@@ -10,11 +17,17 @@ from a_core.b_lifelog.ab06_notion_logger import log_to_life_feed
 env = load_env()
 logger = setup_logger("QiFileFlow", "logs/fileflow.log")
 
-class NewFileHandler(FileSystemEventHandler):
-    def on_created(self, event):
-        if event.is_directory:
-            return
-        src_path = event.src_path
+class NewFileHandler(DebouncedEventHandler):
+    """Files new since the last quiet window, handled once they stop changing."""
+
+    def __init__(self, quiet_seconds=2.0):
+        super().__init__(self.on_batch_ready, quiet_seconds=quiet_seconds)
+
+    def on_batch_ready(self, changes):
+        for src_path in changes.created:
+            self.handle_file(src_path)
+
+    def handle_file(self, src_path):
         logger.info(f"Detected new file: {src_path}")
         meta = analyze_file(src_path)
         new_name = generate_new_name(src_path, meta)
@@ -1,13 +1,22 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Optional, Dict, Any
 import uvicorn
+import asyncio
+import json
 import sys
 import os
+import time
 
-# Add the current directory to Python path
+# Add the current directory (and file_ops/, home of the fileflow package) to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "file_ops"))
+
+from utils.jobs import Job, get_job_manager
+from utils.metrics import get_metrics
+from utils.module_registry import ModuleUnavailable, get_registry
 
 app = FastAPI(title="QiLife Python Backend", version="0.1.0")
 
@@ -20,6 +29,48 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Time every request, labelled by route template rather than raw path"""
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        labels = {
+            "method": request.method,
+            "route": getattr(route, "path", "unmatched"),
+            "status": status,
+        }
+        get_metrics().observe("http_request", time.perf_counter() - start, **labels)
+
+@app.on_event("startup")
+async def preload_modules():
+    """
+    Import and warm subsystems in parallel threads. Startup waits at most
+    BACKEND_PRELOAD_BUDGET seconds; anything slower finishes in the background.
+    """
+    budget = os.getenv("BACKEND_PRELOAD_BUDGET")
+    await asyncio.to_thread(get_registry().preload,
+                            budget_seconds=float(budget) if budget else None)
+
+@app.on_event("startup")
+async def start_metrics_flusher():
+    """Persist metric rollups to the activity log db every METRICS_FLUSH_SECONDS"""
+    from utils.logging_utils import get_logging_utils
+    
+    interval = float(os.getenv("METRICS_FLUSH_SECONDS", "60"))
+    if interval > 0:
+        get_metrics().start_flusher(get_logging_utils().write_metrics_rollup, interval)
+
+@app.on_event("shutdown")
+async def stop_background_work():
+    get_metrics().stop_flusher()
+    get_job_manager().shutdown()
+
 # Pydantic models for API requests
 class DuplicateCleanerRequest(BaseModel):
     roots: Optional[List[str]] = None
@@ -30,6 +81,7 @@ class DuplicateCleanerRequest(BaseModel):
     ai_threshold: Optional[float] = None
     action: Optional[str] = None
     output: Optional[str] = None
+    image_similarity: Optional[bool] = None
 
 class FileFlowRequest(BaseModel):
     source_path: str
@@ -53,80 +105,174 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Detailed health check"""
+    """Detailed health check: per-subsystem availability and import time"""
+    registry = get_registry()
+    modules = registry.status()
+    modules["forms"] = {"status": "available", "builtin": True}
+    # Subsystems that aren't written yet are reported but don't degrade health
+    degraded = any(m["status"] == "unavailable" and m.get("implemented", True)
+                   for m in modules.values())
     return {
-        "status": "healthy",
+        "status": "degraded" if degraded else "healthy",
         "version": "0.1.0",
         "python_version": sys.version,
-        "modules": {
-            "fileflow": "available",
-            "voice": "available", 
-            "memory": "available",
-            "food": "available",
-            "forms": "available"
-        }
+        "startup_seconds": registry.startup_seconds,
+        "modules": modules
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Latency summaries (p50/p95/p99) and counters in Prometheus text format"""
+    return PlainTextResponse(get_metrics().render_prometheus(),
+                             media_type="text/plain; version=0.0.4")
+
+# Long-running work runs as background jobs (see utils/jobs.py). These are
+# the job bodies; they execute on the job pool, never on the event loop.
+def _duplicate_cleaner_job(options: Dict[str, Any], job=None):
+    get_registry().require("duplicate_cleaner")
+    from fileflow.duplicate_cleaner.duplicateCleaner import run_duplicate_cleaner
+    return run_duplicate_cleaner(options, job=job)
+
+def _fileflow_job(source_path: str, destination_path: str, file_types: Optional[List[str]],
+                  job=None):
+    get_registry().require("fileflow")
+    from fileflow.analyzer import analyze_file
+    from fileflow.batcher import process_batch
+    
+    wanted = {t.lower() if t.startswith(".") else f".{t.lower()}" for t in file_types or []}
+    paths = [os.path.join(folder, name)
+             for folder, _, names in os.walk(source_path) for name in sorted(names)
+             if not wanted or os.path.splitext(name)[1].lower() in wanted]
+    # Analysis is the first half of the progress bar, processing the second
+    analysis = {}
+    for i, path in enumerate(paths):
+        if job:
+            job.check_cancelled()
+            job.report(0.5 * i / len(paths), f"Analyzing {os.path.basename(path)}")
+        analysis[path] = analyze_file(path)
+    
+    # No one is at a terminal to approve renames, so the request is the approval
+    os.makedirs(destination_path, exist_ok=True)
+    config = {"PROCESSED_FOLDER": destination_path,
+              "BATCH_SIZE": int(os.getenv("FILEFLOW_BATCH_SIZE", "50"))}
+    queue = list(paths)
+    batches = []
+    while queue:
+        # Cancellation takes effect between batches; a started batch runs to the end
+        if job:
+            job.check_cancelled()
+            done = len(paths) - len(queue)
+            job.report(0.5 + 0.5 * done / len(paths), f"Processed {done}/{len(paths)} files")
+        # Reuse the analysis above instead of hashing (or OCRing) every file again
+        batches.append(process_batch(queue, config, analyze=analysis.__getitem__,
+                                     approve=lambda path, new_name: True))
+    result = {
+        "files": len(paths),
+        "processed": sum(b["processed"] for b in batches),
+        "failed": sum(b["failed"] for b in batches),
+        "batches": batches
+    }
+    return {"analysis": analysis, "result": result}
+
+def _transcribe_job(file_path: str, job=None):
+    get_registry().require("voice")
+    from voice.voice_transcriber import transcribe_audio_file
+    # A single call with no progress of its own to report; once started it
+    # can't be interrupted, so cancel only works while the job is queued
+    if job:
+        job.report(message=f"Transcribing {os.path.basename(file_path)}")
+    return transcribe_audio_file(file_path)
+
+def _memory_query_job(query: str, context: Optional[str]):
+    get_registry().require("memory")
+    from memory.vector_store import query_memory
+    return query_memory(query, context)
+
+def _submit(job_type: str, subsystem: str, fn, *args) -> Job:
+    # Fail fast with 503 when the subsystem is already known to be broken
+    if get_registry().is_unavailable(subsystem):
+        raise HTTPException(status_code=503, detail=f"{subsystem} is unavailable; see /health")
+    return get_job_manager().submit(job_type, fn, *args)
+
+def _accepted(job: Job, response: Response) -> Dict[str, Any]:
+    response.status_code = 202
+    return {
+        "status": "accepted",
+        "job_id": job.id,
+        "job_url": f"/jobs/{job.id}",
+        "events_url": f"/jobs/{job.id}/events",
+        "message": f"{job.type} job queued"
     }
 
+async def _await_job(job: Job, label: str) -> Job:
+    job = await get_job_manager().result(job)
+    if job.status != "succeeded":
+        raise HTTPException(status_code=500, detail=f"{label} error: {job.error or job.status}")
+    return job
+
 @app.post("/fileflow/duplicate-cleaner")
-async def run_duplicate_cleaner(request: DuplicateCleanerRequest):
-    """Run the duplicate cleaner module"""
-    try:
-        # Import the duplicate cleaner module
-        from fileflow.duplicate_cleaner.duplicateCleaner import run_duplicate_cleaner
-        
-        # Convert request to the format expected by the module
-        options = {
-            "roots": request.roots,
-            "max_depth": request.max_depth,
-            "weights": request.weights,
-            "review_threshold": request.review_threshold,
-            "prefer_threshold": request.prefer_threshold,
-            "ai_threshold": request.ai_threshold,
-            "action": request.action,
-            "output": request.output
-        }
-        
-        # Run the duplicate cleaner
-        result = run_duplicate_cleaner(options)
-        
-        return {
-            "status": "success",
-            "result": result,
-            "message": "Duplicate cleaner completed successfully"
-        }
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Duplicate cleaner error: {str(e)}")
+async def run_duplicate_cleaner(request: DuplicateCleanerRequest, response: Response,
+                                wait: bool = False):
+    """Run the duplicate cleaner module as a background job"""
+    # Convert request to the format expected by the module
+    options = {
+        "roots": request.roots,
+        "max_depth": request.max_depth,
+        "weights": request.weights,
+        "review_threshold": request.review_threshold,
+        "prefer_threshold": request.prefer_threshold,
+        "ai_threshold": request.ai_threshold,
+        "action": request.action,
+        "output": request.output,
+        "image_similarity": request.image_similarity
+    }
+    job = _submit("duplicate_cleaner", "duplicate_cleaner", _duplicate_cleaner_job, options)
+    if not wait:
+        return _accepted(job, response)
+    
+    job = await _await_job(job, "Duplicate cleaner")
+    return {
+        "status": "success",
+        "result": job.result,
+        "message": "Duplicate cleaner completed successfully"
+    }
 
 @app.post("/fileflow/process")
-async def process_fileflow(request: FileFlowRequest):
-    """Process files through the fileflow system"""
+async def process_fileflow(request: FileFlowRequest, response: Response, wait: bool = False):
+    """Process files through the fileflow system as a background job"""
+    job = _submit("fileflow", "fileflow", _fileflow_job, request.source_path,
+                  request.destination_path, request.file_types)
+    if not wait:
+        return _accepted(job, response)
+    
+    job = await _await_job(job, "File processing")
+    return {
+        "status": "success",
+        "analysis": job.result["analysis"],
+        "result": job.result["result"],
+        "message": "File processing completed"
+    }
+
+@app.get("/fileflow/cache/stats")
+def fileflow_cache_stats():
+    """Hit/miss counters and size of the shared analysis cache"""
     try:
-        # Import fileflow modules
-        from fileflow.analyzer import analyze_files
-        from fileflow.batcher import batch_process
-        
-        # Analyze files
-        analysis = analyze_files(request.source_path, request.file_types)
+        get_registry().require("fileflow")
+        from fileflow.analyzer import get_cache_stats
         
-        # Process files
-        result = batch_process(analysis, request.destination_path)
-        
-        return {
-            "status": "success",
-            "analysis": analysis,
-            "result": result,
-            "message": "File processing completed"
-        }
+        return {"status": "success", "cache": get_cache_stats()}
         
+    except ModuleUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"File processing error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Cache stats error: {str(e)}")
 
 @app.post("/quick-receipt/generate")
 async def generate_receipt(request: QuickReceiptRequest):
     """Generate a quick receipt"""
     try:
         # Import receipt generation module
+        get_registry().require("quick_receipt")
         from mini_apps.quick_receipt import generate_receipt
         
         receipt = generate_receipt(
@@ -141,42 +287,159 @@ async def generate_receipt(request: QuickReceiptRequest):
             "message": "Receipt generated successfully"
         }
         
+    except ModuleUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Receipt generation error: {str(e)}")
 
 @app.get("/voice/transcribe")
-async def transcribe_audio(file_path: str):
-    """Transcribe audio file"""
+async def transcribe_audio(file_path: str, response: Response, wait: bool = False):
+    """Transcribe audio file as a background job"""
+    job = _submit("transcribe", "voice", _transcribe_job, file_path)
+    if not wait:
+        return _accepted(job, response)
+    
+    job = await _await_job(job, "Transcription")
+    return {
+        "status": "success",
+        "transcription": job.result,
+        "message": "Audio transcribed successfully"
+    }
+
+@app.post("/memory/query")
+async def query_memory(query: str, response: Response, context: Optional[str] = None,
+                       wait: bool = True):
+    """Query the memory system (off the event loop; wait=false returns a job id)"""
+    job = _submit("memory_query", "memory", _memory_query_job, query, context)
+    if not wait:
+        return _accepted(job, response)
+    
+    job = await _await_job(job, "Memory query")
+    return {
+        "status": "success",
+        "result": job.result,
+        "message": "Memory query completed"
+    }
+
+@app.get("/jobs")
+async def list_jobs(type: Optional[str] = None, status: Optional[str] = None):
+    """List known jobs (newest last) and per-type concurrency"""
+    manager = get_job_manager()
+    return {
+        "status": "success",
+        "jobs": [job.to_dict(include_result=False) for job in manager.list(type, status)],
+        "limits": manager.stats()
+    }
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Poll one job's status, progress and (when finished) result"""
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return {"status": "success", "job": job.to_dict()}
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """Server-sent events: one `data:` line per job change, ending when it finishes"""
+    manager = get_job_manager()
+    if manager.get(job_id) is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    
+    async def events():
+        async for snapshot in manager.events(job_id):
+            if snapshot is None:
+                yield ": keepalive\n\n"
+            else:
+                yield f"event: {snapshot['status']}\ndata: {json.dumps(snapshot, default=str)}\n\n"
+    
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+@app.websocket("/jobs/{job_id}/ws")
+async def job_websocket(websocket: WebSocket, job_id: str):
+    """WebSocket variant of /jobs/{job_id}/events; send "cancel" to cancel the job"""
+    manager = get_job_manager()
+    await websocket.accept()
+    if manager.get(job_id) is None:
+        await websocket.close(code=4404, reason=f"Unknown job: {job_id}")
+        return
+    
+    async def listen_for_cancel():
+        try:
+            while True:
+                if await websocket.receive_text() == "cancel":
+                    manager.cancel(job_id)
+        except WebSocketDisconnect:
+            pass
+    
+    listener = asyncio.create_task(listen_for_cancel())
     try:
-        from voice.voice_transcriber import transcribe_audio_file
+        async for snapshot in manager.events(job_id):
+            if snapshot is not None:
+                await websocket.send_text(json.dumps(snapshot, default=str))
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        listener.cancel()
+
+@app.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str):
+    """Cancel a queued job, or ask a running one to stop"""
+    job = get_job_manager().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return {"status": "success", "job": job.to_dict(include_result=False)}
+
+# The log endpoints do blocking sqlite reads (and wait up to 5 s for the log
+# writer to flush), so they are plain `def` and FastAPI runs them in its
+# threadpool instead of on the event loop.
+@app.get("/logs")
+def get_logs(hours: int = 24, activity_type: Optional[List[str]] = Query(None),
+             limit: int = 100, cursor: Optional[str] = None):
+    """Page through recent activity, newest first"""
+    try:
+        from utils.logging_utils import get_logging_utils
         
-        transcription = transcribe_audio_file(file_path)
-        
-        return {
-            "status": "success",
-            "transcription": transcription,
-            "message": "Audio transcribed successfully"
-        }
+        page = get_logging_utils().get_logs_page(hours, activity_type, limit, cursor)
+        return {"status": "success", **page}
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Transcription error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Log query error: {str(e)}")
 
-@app.post("/memory/query")
-async def query_memory(query: str, context: Optional[str] = None):
-    """Query the memory system"""
+@app.get("/logs/summary")
+def get_logs_summary(hours: int = 24, granularity: Optional[str] = None):
+    """Activity counts for the last `hours`, optionally per hour/day bucket"""
     try:
-        from memory.vector_store import query_memory
-        
-        result = query_memory(query, context)
+        from utils.logging_utils import get_logging_utils
         
-        return {
-            "status": "success",
-            "result": result,
-            "message": "Memory query completed"
-        }
+        logging_utils = get_logging_utils()
+        result = {"status": "success", "summary": logging_utils.get_log_summary(hours)}
+        if granularity:
+            result["rollups"] = logging_utils.get_rollups(granularity, hours)
+        return result
         
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Memory query error: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Log summary error: {str(e)}")
+
+@app.get("/logs/export")
+def export_logs(format: str = "jsonl", hours: int = 24):
+    """Stream the activity log as JSON lines or CSV"""
+    from utils.logging_utils import get_logging_utils
+    
+    if format not in ("jsonl", "csv"):
+        raise HTTPException(status_code=400, detail=f"Unsupported export format: {format}")
+    media_type = "application/x-ndjson" if format == "jsonl" else "text/csv"
+    return StreamingResponse(
+        get_logging_utils().iter_export(format, hours),
+        media_type=media_type,
+        headers={"Content-Disposition": f"attachment; filename=activity_log.{format}"},
+    )
 
 @app.post("/forms/submit")
 async def submit_form(request: FormSubmissionRequest):
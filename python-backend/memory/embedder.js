@@ -4,45 +4,133 @@ src/memory/embedder.py
 Handles creating and managing context embeddings, tying them to your vector store and DB.
 """
 
-from typing import Any, List
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union
+
+import numpy as np
+
+from memory.embedding_backends import default_backend
+
+Document = Union[Tuple[str, str], Dict[str, Any]]
+
+
+def chunk_text(text: str, window: int = 200, overlap: int = 40) -> List[str]:
+    """
+    Split `text` into chunks of `window` words, each sharing `overlap` words
+    with the previous one. Short texts come back as a single chunk.
+    """
+    if overlap >= window:
+        raise ValueError("overlap must be smaller than window")
+    words = text.split()
+    if len(words) <= window:
+        return [" ".join(words)] if words else []
+    step = window - overlap
+    return [" ".join(words[i:i + window]) for i in range(0, len(words) - overlap, step)]
+
 
 class ContextMemory:
     """
-    A stubbed context memory engine.
-    Should interface between your raw content, embeddings, and storage.
+    Context memory engine: chunks raw content, embeds it in fixed-size
+    batches through a pluggable backend, and bulk-writes the vectors.
+    Chunks are stored as `<key>#<i>`; re-ingesting a key replaces all of them.
     """
 
-    def __init__(self, db_manager: Any, vector_store: Any = None):
+    def __init__(self, db_manager: Any, vector_store: Any = None, backend: Any = None,
+                 chunk_window: int = 200, chunk_overlap: int = 40, batch_size: int = 64):
         """
         Initialize with a database manager and an optional vector store.
+        `backend` defaults to memory.embedding_backends.default_backend().
         """
         self.db_manager = db_manager
         self.vector_store = vector_store
-        # TODO: Initialize embedding model or API client here
+        dim = getattr(vector_store, "dim", 768)
+        self.backend = backend or default_backend(dim)
+        self.chunk_window = chunk_window
+        self.chunk_overlap = chunk_overlap
+        self.batch_size = batch_size
+
+    def embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Embed texts in `batch_size` slices; returns an (n, dim) float32 array."""
+        if not texts:
+            return np.zeros((0, self.backend.dim), dtype=np.float32)
+        parts = [self.backend.embed(texts[i:i + self.batch_size])
+                 for i in range(0, len(texts), self.batch_size)]
+        return np.vstack(parts).astype(np.float32, copy=False)
+
+    def _iter_chunks(self, documents: Iterable[Document]) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        for doc in documents:
+            if isinstance(doc, dict):
+                key, text = doc["key"], doc["text"]
+                meta = {k: v for k, v in doc.items() if k not in ("key", "text")}
+            else:
+                key, text = doc
+                meta = {}
+            chunks = chunk_text(text, self.chunk_window, self.chunk_overlap)
+            chunk_keys = [f"{key}#{i}" for i in range(len(chunks))]
+            self._drop_stale_chunks(key, chunk_keys)
+            for i, (chunk_key, chunk) in enumerate(zip(chunk_keys, chunks)):
+                yield chunk_key, chunk, {**meta, "source": key, "chunk": i, "text": chunk[:200]}
+
+    def _drop_stale_chunks(self, key: str, chunk_keys: List[str]) -> None:
+        """
+        Remove chunks of `key` left over from an earlier, longer version of the
+        document (and the bare `key` older versions used for one-chunk texts).
+        Chunks that are about to be rewritten stay and are replaced in place.
+        """
+        if self.vector_store is None:
+            return
+        self.vector_store.remove_prefix(f"{key}#", keep=chunk_keys)
+        self.vector_store.remove_vector(key)
+
+    def ingest(self, documents: Iterable[Document]) -> int:
+        """
+        Stream documents ((key, text) pairs or dicts with "key"/"text" and extra
+        metadata) into the vector store. Chunks are embedded `batch_size` at a
+        time and written with one bulk add per batch. Returns chunks stored.
+        """
+        stored = 0
+        keys: List[str] = []
+        texts: List[str] = []
+        metas: List[Dict[str, Any]] = []
+
+        def flush() -> int:
+            if not texts:
+                return 0
+            vectors = self.backend.embed(texts)
+            if self.vector_store is not None:
+                self.vector_store.add_vectors(keys, vectors, metas)
+            n = len(texts)
+            keys.clear()
+            texts.clear()
+            metas.clear()
+            return n
+
+        for key, chunk, meta in self._iter_chunks(documents):
+            keys.append(key)
+            texts.append(chunk)
+            metas.append(meta)
+            if len(texts) >= self.batch_size:
+                stored += flush()
+        stored += flush()
+        return stored
 
     def store_context(self, key: str, text: str) -> None:
         """
         Generate an embedding for `text` and store it with `key`.
         """
-        vector = self._embed_text(text)
-        if self.vector_store:
-            self.vector_store.add_vector(key, vector)
-        # Optionally log to DB
-        print(f"🧠 Stored context for key={key}")
+        stored = self.ingest([(key, text)])
+        print(f"🧠 Stored context for key={key} ({stored} chunk(s))")
 
     def retrieve(self, query: str, top_k: int = 5) -> List[str]:
         """
         Embed the `query` and return top_k matching keys from the vector store.
         """
         vector = self._embed_text(query)
-        if self.vector_store:
+        if self.vector_store is not None:
             return self.vector_store.query(vector, top_k=top_k)
         return []
 
-    def _embed_text(self, text: str) -> List[float]:
+    def _embed_text(self, text: str) -> np.ndarray:
         """
-        Placeholder embedding function.
-        Replace with actual model or API call.
+        Embed a single text with the configured backend.
         """
-        print(f"🔗 Embedding text (stub): {text[:30]}...")
-        return [0.0] * 768  # stub vector
+        return self.backend.embed([text])[0]
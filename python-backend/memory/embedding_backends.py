@@ -0,0 +1,108 @@
+"""
+src/memory/embedding_backends.py
+
+Pluggable embedding backends for ContextMemory.
+
+Every backend takes a batch of texts and returns an (n, dim) float32 NumPy
+array; nothing on the embedding path round-trips through Python lists.
+
+- HashingEmbedder: deterministic, dependency-free feature hashing. Good
+  enough for tests, offline use and near-duplicate lookups.
+- HttpEmbedder: any OpenAI-compatible /embeddings endpoint.
+"""
+
+import hashlib
+import os
+import re
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class HashingEmbedder:
+    """
+    Signed feature hashing of unigrams and bigrams into `dim` buckets,
+    L2-normalized. The same text always maps to the same vector.
+    """
+
+    def __init__(self, dim: int = 768, seed: int = 0):
+        self.dim = dim
+        self._salt = seed.to_bytes(8, "little")
+
+    def _features(self, text: str) -> List[int]:
+        tokens = _TOKEN_RE.findall(text.lower())
+        grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        return [
+            int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=8, salt=self._salt).digest(),
+                           "little")
+            for g in grams
+        ]
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        rows, cols, signs = [], [], []
+        for i, text in enumerate(texts):
+            hashes = np.fromiter(self._features(text), dtype=np.uint64)
+            rows.append(np.full(hashes.shape, i, dtype=np.int64))
+            cols.append((hashes % np.uint64(self.dim)).astype(np.int64))
+            signs.append(np.where((hashes >> np.uint64(63)) == 1, -1.0, 1.0).astype(np.float32))
+        if rows:
+            np.add.at(out, (np.concatenate(rows), np.concatenate(cols)), np.concatenate(signs))
+        norms = np.linalg.norm(out, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return out / norms
+
+
+class HttpEmbedder:
+    """
+    Client for an OpenAI-compatible embeddings API (OpenAI, LM Studio,
+    Ollama's /v1, text-embeddings-inference, ...).
+    """
+
+    def __init__(self, url: str, model: str, dim: int, api_key: Optional[str] = None,
+                 timeout: float = 60.0):
+        self.url = url.rstrip("/")
+        if not self.url.endswith("/embeddings"):
+            self.url += "/embeddings"
+        self.model = model
+        self.dim = dim
+        self.api_key = api_key
+        self.timeout = timeout
+        self._session = None
+
+    @property
+    def session(self):
+        # One keep-alive session for the embedder's lifetime
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+            if self.api_key:
+                self._session.headers["Authorization"] = f"Bearer {self.api_key}"
+        return self._session
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        resp = self.session.post(self.url, json={"model": self.model, "input": list(texts)},
+                                 timeout=self.timeout)
+        resp.raise_for_status()
+        data = sorted(resp.json()["data"], key=lambda d: d["index"])
+        out = np.asarray([d["embedding"] for d in data], dtype=np.float32)
+        if out.shape != (len(texts), self.dim):
+            raise ValueError(f"Embedding service returned shape {out.shape}, expected ({len(texts)}, {self.dim})")
+        return out
+
+
+def default_backend(dim: int = 768):
+    """HttpEmbedder if MEMORY_EMBED_URL is set, otherwise the local HashingEmbedder."""
+    url = os.getenv("MEMORY_EMBED_URL")
+    if url:
+        return HttpEmbedder(
+            url,
+            model=os.getenv("MEMORY_EMBED_MODEL", "text-embedding-3-small"),
+            dim=int(os.getenv("MEMORY_EMBED_DIM", str(dim))),
+            api_key=os.getenv("MEMORY_EMBED_API_KEY") or os.getenv("OPENAI_API_KEY"),
+        )
+    return HashingEmbedder(dim)
@@ -0,0 +1,248 @@
+"""
+src/memory/vault_indexer.py
+
+Incremental, in-process indexer for an Obsidian-style vault.
+
+A SQLite manifest records each note's content hash and the hash of every
+chunk it was split into. When a note changes only chunks whose hash is new
+get embedded; chunks that disappeared are removed from the vector store.
+Deleted notes are tombstoned in the manifest rather than forgotten, so a
+later sync can tell "deleted" from "never seen". The manifest lives next to
+the vector store, not inside the vault, so it is never committed with it.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, Optional, Sequence
+
+NOTE_EXTENSIONS = {".md", ".markdown", ".txt"}
+DEFAULT_CHUNK_CHARS = 1200
+
+
+def content_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def chunk_note(text: str, max_chars: int = DEFAULT_CHUNK_CHARS) -> List[str]:
+    """
+    Split a markdown note on headings and blank lines, packing paragraphs
+    into chunks of up to `max_chars`. Splitting on structure (rather than a
+    fixed offset) keeps an edit in one section from shifting every chunk.
+    """
+    blocks = [b.strip() for b in re.split(r"\n\s*\n|\n(?=#{1,6}\s)", text) if b.strip()]
+    chunks: List[str] = []
+    current = ""
+    for block in blocks:
+        while len(block) > max_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(block[:max_chars])
+            block = block[max_chars:]
+        if current and len(current) + len(block) + 2 > max_chars:
+            chunks.append(current)
+            current = block
+        else:
+            current = f"{current}\n\n{block}" if current else block
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class VaultIndexer:
+    """
+    Keeps a vector store in step with a folder of notes.
+
+    `embed(texts)` must return an (n, dim) array; by default it is
+    ContextMemory.embed_batch. The vector store needs
+    add_vectors(keys, vectors, metadatas) and remove_vector(key).
+    """
+
+    def __init__(self, vault_path: str, vector_store: Any,
+                 embed: Optional[Callable[[Sequence[str]], Sequence[Any]]] = None,
+                 manifest_path: Optional[str] = None,
+                 chunk_chars: int = DEFAULT_CHUNK_CHARS):
+        self.vault_path = Path(vault_path).resolve()
+        self.vector_store = vector_store
+        if embed is None:
+            from memory.embedder import ContextMemory
+            embed = ContextMemory(db_manager=None, vector_store=vector_store).embed_batch
+        self.embed = embed
+        self.chunk_chars = chunk_chars
+        manifest_path = manifest_path or self._default_manifest_path()
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(manifest_path)), exist_ok=True)
+        self._conn = sqlite3.connect(manifest_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS notes (
+                path TEXT PRIMARY KEY,
+                content_hash TEXT,
+                size INTEGER,
+                mtime REAL,
+                deleted INTEGER NOT NULL DEFAULT 0,
+                updated REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS chunks (
+                path TEXT NOT NULL,
+                chunk_hash TEXT NOT NULL,
+                vector_key TEXT NOT NULL,
+                PRIMARY KEY (path, chunk_hash)
+            );
+        """)
+        self._conn.commit()
+
+    def _default_manifest_path(self) -> str:
+        """
+        `<vector store path>.<vault name>.vault_index.db`, or a dot file
+        beside the vault for stores without a path. A manifest left in the
+        vault root by older versions described a different store, so it is
+        dropped and the vault is re-indexed once.
+        """
+        store_path = getattr(self.vector_store, "index_path", None)
+        if store_path:
+            path = f"{store_path}.{self.vault_path.name}.vault_index.db"
+        else:
+            path = str(self.vault_path.parent / f".{self.vault_path.name}.vault_index.db")
+        legacy = self.vault_path / ".vault_index.db"
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(f"{legacy}{suffix}"):
+                os.remove(f"{legacy}{suffix}")
+        return path
+    def _rel(self, path: str) -> str:
+        p = Path(path)
+        if not p.is_absolute():
+            p = self.vault_path / p
+        return p.resolve().relative_to(self.vault_path).as_posix()
+
+    def _is_note(self, path: str) -> bool:
+        return Path(path).suffix.lower() in NOTE_EXTENSIONS
+
+    # -- single-note operations ----------------------------------------------
+
+    def update_note(self, path: str) -> int:
+        """Re-index one note. Returns the number of chunks that were embedded."""
+        rel = self._rel(path)
+        full = self.vault_path / rel
+        try:
+            st = full.stat()
+            text = full.read_text(encoding="utf-8", errors="replace")
+        except FileNotFoundError:
+            self.delete_note(path)
+            return 0
+
+        note_hash = content_hash(text)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash, deleted FROM notes WHERE path = ?", (rel,)
+            ).fetchone()
+            if row and row[0] == note_hash and not row[1]:
+                # Touched but unchanged: just refresh the stat fingerprint
+                self._conn.execute(
+                    "UPDATE notes SET size = ?, mtime = ? WHERE path = ?",
+                    (st.st_size, st.st_mtime, rel),
+                )
+                self._conn.commit()
+                return 0
+            old = dict(self._conn.execute(
+                "SELECT chunk_hash, vector_key FROM chunks WHERE path = ?", (rel,)
+            ).fetchall())
+
+        chunks = {content_hash(c): c for c in chunk_note(text, self.chunk_chars)}
+        new_hashes = [h for h in chunks if h not in old]
+        vectors = self.embed([chunks[h] for h in new_hashes]) if new_hashes else []
+
+        added = [(rel, h, f"{rel}#{h}") for h in new_hashes]
+        if added:
+            self.vector_store.add_vectors(
+                [key for _, _, key in added], vectors,
+                [{"source": rel, "text": chunks[h][:200]} for h in new_hashes],
+            )
+        removed = [(rel, h) for h in old if h not in chunks]
+        for _, h in removed:
+            self.vector_store.remove_vector(old[h])
+
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO chunks VALUES (?, ?, ?)", added)
+            self._conn.executemany("DELETE FROM chunks WHERE path = ? AND chunk_hash = ?", removed)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO notes VALUES (?, ?, ?, ?, 0, ?)",
+                (rel, note_hash, st.st_size, st.st_mtime, time.time()),
+            )
+            self._conn.commit()
+        return len(added)
+
+    def delete_note(self, path: str) -> None:
+        """Drop a note's vectors and tombstone it in the manifest."""
+        rel = self._rel(path)
+        with self._lock:
+            keys = [k for (k,) in self._conn.execute(
+                "SELECT vector_key FROM chunks WHERE path = ?", (rel,))]
+        for key in keys:
+            self.vector_store.remove_vector(key)
+        with self._lock:
+            self._conn.execute("DELETE FROM chunks WHERE path = ?", (rel,))
+            self._conn.execute(
+                "INSERT INTO notes (path, deleted, updated) VALUES (?, 1, ?) "
+                "ON CONFLICT(path) DO UPDATE SET deleted = 1, updated = excluded.updated",
+                (rel, time.time()),
+            )
+            self._conn.commit()
+
+    # -- bulk operations -----------------------------------------------------
+
+    def apply(self, changes) -> int:
+        """Apply a utils.file_events.ChangeSet. Returns chunks embedded."""
+        embedded = 0
+        for path in changes.changed:
+            if self._is_note(path):
+                embedded += self.update_note(path)
+        for path in changes.deleted:
+            if self._is_note(path):
+                self.delete_note(path)
+        return embedded
+
+    def iter_notes(self) -> Iterable[Path]:
+        for dirpath, dirnames, filenames in os.walk(self.vault_path):
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            for name in filenames:
+                if self._is_note(name):
+                    yield Path(dirpath) / name
+
+    def sync(self) -> int:
+        """
+        Reconcile the whole vault with the manifest (e.g. at startup). Notes
+        whose size and mtime match the manifest are skipped without reading.
+        """
+        with self._lock:
+            known = {
+                path: (size, mtime)
+                for path, size, mtime in self._conn.execute(
+                    "SELECT path, size, mtime FROM notes WHERE deleted = 0")
+            }
+        embedded = 0
+        seen = set()
+        for note in self.iter_notes():
+            rel = note.relative_to(self.vault_path).as_posix()
+            seen.add(rel)
+            st = note.stat()
+            if known.get(rel) != (st.st_size, st.st_mtime):
+                embedded += self.update_note(str(note))
+        for rel in set(known) - seen:
+            self.delete_note(rel)
+        return embedded
+
+    def stats(self):
+        with self._lock:
+            notes, tombstones = self._conn.execute(
+                "SELECT SUM(deleted = 0), SUM(deleted = 1) FROM notes").fetchone()
+            chunks = self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+        return {"notes": notes or 0, "tombstones": tombstones or 0, "chunks": chunks}
+
+    def close(self) -> None:
+        self._conn.close()
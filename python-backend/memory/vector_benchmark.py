@@ -0,0 +1,81 @@
+"""
+src/memory/vector_benchmark.py
+
+Benchmark VectorStorage exact vs IVF search and report recall@k.
+
+Usage:
+    python -m memory.vector_benchmark --n 1000000 --dim 768 --queries 100
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from memory.vector_store import VectorStorage
+
+
+def cluster_centers(dim: int, clusters: int, rng) -> np.ndarray:
+    """Random topic centers; draw the data and the queries from the same set."""
+    return rng.standard_normal((clusters, dim)).astype(np.float32)
+
+
+def clustered_vectors(n: int, centers: np.ndarray, rng) -> np.ndarray:
+    """Synthetic embeddings: gaussian blobs around `centers`, like real topics."""
+    dim = centers.shape[1]
+    labels = rng.integers(0, len(centers), size=n)
+    return centers[labels] + 0.5 * rng.standard_normal((n, dim)).astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VectorStorage exact vs ANN benchmark")
+    parser.add_argument("--n", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--n-probe", type=int, default=16)
+    parser.add_argument("--batch", type=int, default=50_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    centers = cluster_centers(args.dim, 256, rng)
+    workdir = tempfile.mkdtemp(prefix="vecbench_")
+    try:
+        store = VectorStorage(os.path.join(workdir, "vectors.db"), dim=args.dim)
+        start = time.perf_counter()
+        for offset in range(0, args.n, args.batch):
+            count = min(args.batch, args.n - offset)
+            store.add_vectors([f"v{offset + i}" for i in range(count)],
+                              clustered_vectors(count, centers, rng))
+        print(f"➕ Inserted {args.n} x {args.dim} in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        store.build_ann()
+        print(f"🔧 Trained IVF ({len(store._ivf.centroids)} lists) in {time.perf_counter() - start:.1f}s")
+
+        queries = clustered_vectors(args.queries, centers, rng)
+        timings = {"exact": [], "ann": []}
+        recalls = []
+        for q in queries:
+            t = time.perf_counter()
+            exact = {h["key"] for h in store.search(q, args.top_k, mode="exact")}
+            timings["exact"].append(time.perf_counter() - t)
+            t = time.perf_counter()
+            approx = {h["key"] for h in store.search(q, args.top_k, mode="ann", n_probe=args.n_probe)}
+            timings["ann"].append(time.perf_counter() - t)
+            recalls.append(len(exact & approx) / len(exact))
+
+        for mode, times in timings.items():
+            ms = np.array(times) * 1000
+            print(f"🔍 {mode:5s}: p50 {np.percentile(ms, 50):.1f} ms, p95 {np.percentile(ms, 95):.1f} ms")
+        print(f"🎯 recall@{args.top_k} (n_probe={args.n_probe}): {np.mean(recalls):.3f}")
+        store.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,55 +3,603 @@
 src/memory/vector_store.py
 
 Handles storing and managing vector embeddings for your ContextMemory.
+
+Vectors live in a memory-mapped float32 matrix (`<index_path>.f32`), one row
+per key; keys, metadata and tombstones live in SQLite (`index_path`). Exact
+search is a single matrix-vector product plus argpartition. For large
+corpora an optional IVF index (k-means coarse quantizer, built in-repo with
+NumPy) narrows the scan to the `n_probe` closest clusters.
+
+rebuild_index() writes a compacted matrix (and IVF index) under new file
+names and switches to them in the same SQLite transaction that renumbers
+the rows; a crash mid-rebuild leaves the old store intact. The store is
+safe to share between processes; see VectorStorage.
 """
 
+import glob
+import json
 import os
-from typing import Any, List
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+INITIAL_CAPACITY = 1024
+REBUILD_CHUNK = 8192  # rows copied per step of rebuild_index
+LOCK_TIMEOUT = 60.0  # seconds a writer waits for another process's transaction
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest scores, best first."""
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    idx = np.argpartition(-scores, k - 1)[:k]
+    return idx[np.argsort(-scores[idx])]
+
+
+class IVFIndex:
+    """
+    Inverted-file index: rows are bucketed by their nearest k-means centroid,
+    and a query only scores rows in the `n_probe` closest buckets.
+    """
+
+    def __init__(self, centroids: np.ndarray, assignments: np.ndarray):
+        self.centroids = centroids.astype(np.float32)
+        self.assignments = assignments.astype(np.int32)
+        self._build_lists()
+
+    def _build_lists(self) -> None:
+        self.order = np.argsort(self.assignments, kind="stable")
+        counts = np.bincount(self.assignments, minlength=len(self.centroids))
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+        self.extra: List[int] = []  # rows assigned after the last build
+
+    @classmethod
+    def train(cls, vectors: np.ndarray, n_lists: int, iterations: int = 10,
+              sample_size: int = 100_000, seed: int = 0) -> "IVFIndex":
+        rng = np.random.default_rng(seed)
+        n = vectors.shape[0]
+        sample = vectors[rng.choice(n, size=min(n, sample_size), replace=False)]
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(n_lists):
+                members = sample[labels == c]
+                if len(members):
+                    centroids[c] = members.mean(axis=0)
+            centroids = _normalize(centroids)
+        return cls(centroids, cls.assign(centroids, vectors))
+
+    @staticmethod
+    def assign(centroids: np.ndarray, vectors: np.ndarray, chunk: int = 65536) -> np.ndarray:
+        out = np.empty(vectors.shape[0], dtype=np.int32)
+        for start in range(0, vectors.shape[0], chunk):
+            out[start:start + chunk] = np.argmax(vectors[start:start + chunk] @ centroids.T, axis=1)
+        return out
+
+    def add(self, rows: Iterable[int]) -> None:
+        self.extra.extend(rows)
+
+    def candidates(self, query: np.ndarray, n_probe: int) -> np.ndarray:
+        probes = _top_k(self.centroids @ query, n_probe)
+        parts = [self.order[self.offsets[c]:self.offsets[c + 1]] for c in probes]
+        if self.extra:
+            parts.append(np.asarray(self.extra, dtype=np.int64))
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    def save(self, path: str) -> None:
+        np.savez(path, centroids=self.centroids, assignments=self.assignments,
+                 extra=np.asarray(self.extra, dtype=np.int64))
+
+    @classmethod
+    def load(cls, path: str) -> "IVFIndex":
+        data = np.load(path)
+        index = cls(data["centroids"], data["assignments"])
+        index.extra = data["extra"].tolist()
+        return index
+
 
 class VectorStorage:
     """
-    A stubbed vector storage engine.
-    All methods here should be replaced by your actual vector-DB logic (e.g., FAISS, Chroma).
+    On-disk vector store with exact (brute-force) and IVF approximate search.
+    Vectors are L2-normalized on insert, so scores are cosine similarities.
+
+    Several processes may open the same store (the API and the vault
+    watcher do). Every write runs inside a SQLite write transaction, which
+    serializes writers, allocates rows from MAX(row) + 1 and stamps what it
+    changed with a new `generation`. Each reader compares that counter with
+    the one it last saw and pulls in the rows that changed; rewrites that
+    renumber rows or move files (rebuild, clear, ANN training, growth on
+    Windows) bump `epoch` instead, and readers reload from scratch.
     """
 
-    def __init__(self, index_path: str = "vectors.db"):
+    def __init__(self, index_path: str = "vectors.db", dim: int = 768,
+                 ann_threshold: int = 200_000, n_probe: int = 16):
         # Path to your on-disk vector index (portable SQLite or similar)
         self.index_path = index_path
-        # TODO: Initialize or load your vector index here
-        # e.g.: self.index = faiss.read_index(self.index_path) if exists
+        self.ann_threshold = ann_threshold
+        self.n_probe = n_probe
+        self._lock = threading.RLock()
+        self._open(dim)
+
+    # -- storage -------------------------------------------------------------
+
+    def _open(self, dim: int) -> None:
+        self._conn = sqlite3.connect(self.index_path, timeout=LOCK_TIMEOUT,
+                                     check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS vectors (
+                    row INTEGER PRIMARY KEY,
+                    key TEXT NOT NULL UNIQUE,
+                    metadata TEXT,
+                    deleted INTEGER NOT NULL DEFAULT 0,
+                    gen INTEGER NOT NULL DEFAULT 0
+                )""")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS store_meta (name TEXT PRIMARY KEY, value TEXT)")
+            columns = {c[1] for c in self._conn.execute("PRAGMA table_info(vectors)")}
+            if "gen" not in columns:
+                self._conn.execute("ALTER TABLE vectors ADD COLUMN gen INTEGER NOT NULL DEFAULT 0")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_vectors_gen ON vectors(gen)")
+            row = self._conn.execute("SELECT value FROM store_meta WHERE name = 'dim'").fetchone()
+            if row:
+                dim = int(row[0])
+            else:
+                self._conn.execute("INSERT INTO store_meta VALUES ('dim', ?)", (str(dim),))
+            self.dim = dim
+            # Growing the matrix file is a write, so it happens under the lock
+            self._load(grow=True)
+            self._conn.commit()
+        except BaseException:
+            self._conn.rollback()
+            self._conn.close()
+            raise
+
+    def _meta(self, *names: str) -> Dict[str, str]:
+        placeholders = ",".join("?" * len(names))
+        return dict(self._conn.execute(
+            f"SELECT name, value FROM store_meta WHERE name IN ({placeholders})", names))
+
+    def _load(self, grow: bool = False) -> None:
+        """(Re)read keys, tombstones, data files and counters from the database."""
+        meta = self._meta("matrix_file", "ivf_file", "generation", "epoch")
+        self._generation = int(meta.get("generation", 0))
+        self._epoch = int(meta.get("epoch", 0))
+        # Rebuilt stores name their own data files; older ones use the defaults.
+        # An empty ivf_file means the store has no IVF index.
+        folder = os.path.dirname(os.path.abspath(self.index_path))
+        self.matrix_path = (os.path.join(folder, meta["matrix_file"]) if "matrix_file" in meta
+                            else f"{self.index_path}.f32")
+        if "ivf_file" in meta:
+            self.ivf_path = os.path.join(folder, meta["ivf_file"]) if meta["ivf_file"] else None
+        else:
+            self.ivf_path = f"{self.index_path}.ivf.npz"
+
+        self._keys: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        for r, key, deleted in self._conn.execute("SELECT row, key, deleted FROM vectors ORDER BY row"):
+            while len(self._keys) < r:
+                self._keys.append(None)
+            self._keys.append(None if deleted else key)
+            if not deleted:
+                self._rows[key] = r
+        self._count = len(self._keys)
+        self._alive = np.array([k is not None for k in self._keys], dtype=bool)
+
+        self._matrix = None
+        capacity = max(INITIAL_CAPACITY, self._count)
+        if os.path.exists(self.matrix_path):
+            capacity = max(capacity, os.path.getsize(self.matrix_path) // (4 * self.dim))
+        self._map(capacity, grow=grow)
+        self._ivf = None
+        if self.ivf_path and os.path.exists(self.ivf_path):
+            self._ivf = IVFIndex.load(self.ivf_path)
+            self._ivf.extra = list(range(len(self._ivf.assignments), self._count))
+
+    def _sync(self) -> None:
+        """Pull in whatever other connections have committed since we last looked."""
+        meta = self._meta("generation", "epoch")
+        if int(meta.get("epoch", 0)) != self._epoch:
+            self._load()
+            return
+        generation = int(meta.get("generation", 0))
+        if generation == self._generation:
+            return
+        changed = self._conn.execute(
+            "SELECT row, key, deleted FROM vectors WHERE gen > ? ORDER BY row",
+            (self._generation,)).fetchall()
+        for r, key, deleted in changed:
+            while len(self._keys) <= r:
+                self._keys.append(None)
+            old = self._keys[r]
+            if old is not None and self._rows.get(old) == r:
+                del self._rows[old]
+            self._keys[r] = None if deleted else key
+            if not deleted:
+                self._rows[key] = r
+        if len(self._keys) > self._count:
+            self._alive = np.concatenate(
+                [self._alive, np.zeros(len(self._keys) - self._count, dtype=bool)])
+            self._count = len(self._keys)
+        for r, _, deleted in changed:
+            self._alive[r] = not deleted
+        if self._count > self._matrix.shape[0]:
+            # The writer grew the file before committing; just map more of it
+            self._map(self._count, grow=False)
+        if self._ivf is not None:
+            self._ivf.extra = list(range(len(self._ivf.assignments), self._count))
+        self._generation = generation
+
+    @contextmanager
+    def _write(self, epoch: bool = False):
+        """
+        Run the body as one SQLite write transaction. Yields the generation
+        the body should stamp on rows it touches; with `epoch` the change is
+        one readers can't apply incrementally and the store is reloaded.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._sync()
+                self._new_epoch = epoch
+                generation = self._generation + 1
+                yield generation
+                updates = [("generation", str(generation))]
+                if self._new_epoch:
+                    updates.append(("epoch", str(self._epoch + 1)))
+                self._conn.executemany("INSERT OR REPLACE INTO store_meta VALUES (?, ?)", updates)
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                # In-memory state may be ahead of what was committed
+                self._load()
+                raise
+            if self._new_epoch:
+                self._load()
+            else:
+                self._generation = generation
+
+    def _map(self, capacity: int, grow: bool = True) -> None:
+        self._matrix = None
+        if grow:
+            size = capacity * self.dim * 4
+            with open(self.matrix_path, "ab") as f:
+                if f.tell() < size:
+                    f.truncate(size)
+        else:
+            capacity = max(capacity, os.path.getsize(self.matrix_path) // (4 * self.dim))
+        self._matrix = np.memmap(self.matrix_path, dtype=np.float32, mode="r+",
+                                 shape=(capacity, self.dim))
+
+    def _ensure_capacity(self, needed: int) -> None:
+        """Grow the matrix file; only called inside a write transaction."""
+        capacity = self._matrix.shape[0]
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        self._matrix.flush()
+        try:
+            self._map(capacity)
+        except OSError:
+            # Windows can't extend a file another process has mapped:
+            # copy into a new, larger file and switch every reader over
+            self._map(self._matrix_capacity(), grow=False)
+            self._move_matrix(np.arange(self._count), capacity)
+
+    def _matrix_capacity(self) -> int:
+        return os.path.getsize(self.matrix_path) // (4 * self.dim)
+
+    def _new_generation_path(self) -> str:
+        return f"{self.index_path}.gen-{uuid.uuid4().hex[:12]}"
+
+    def _copy_rows(self, rows: np.ndarray, capacity: int) -> str:
+        """Write `rows` of the matrix, in order, to a new file with room for `capacity`."""
+        path = f"{self._new_generation_path()}.f32"
+        target = np.memmap(path, dtype=np.float32, mode="w+",
+                           shape=(max(INITIAL_CAPACITY, capacity), self.dim))
+        try:
+            for start in range(0, len(rows), REBUILD_CHUNK):
+                chunk = rows[start:start + REBUILD_CHUNK]
+                target[start:start + len(chunk)] = self._matrix[chunk]
+            target.flush()
+        except BaseException:
+            del target
+            _remove_quietly([path])
+            raise
+        del target
+        return path
+
+    def _move_matrix(self, rows: np.ndarray, capacity: int) -> None:
+        """Inside a write transaction: point the store at a copy of `rows`."""
+        old_path = self.matrix_path
+        self.matrix_path = self._copy_rows(rows, capacity)
+        self._conn.execute("INSERT OR REPLACE INTO store_meta VALUES ('matrix_file', ?)",
+                           (os.path.basename(self.matrix_path),))
+        self._new_epoch = True
+        self._map(capacity, grow=False)
+        self._retired = [old_path]
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._sync()
+            return len(self._rows)
+
+    # -- writes --------------------------------------------------------------
+
+    def add_vector(self, key: str, vector: Any, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Add a single embedding to the store (replacing any existing one for `key`).
+        """
+        self.add_vectors([key], np.asarray(vector, dtype=np.float32)[None, :],
+                         [metadata] if metadata is not None else None)
+
+    def add_vectors(self, keys: Sequence[str], vectors: Any,
+                    metadatas: Optional[Sequence[Optional[Dict[str, Any]]]] = None) -> None:
+        """
+        Bulk insert/replace. `vectors` is an (n, dim) array.
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or vectors.shape != (len(keys), self.dim):
+            raise ValueError(f"Expected vectors of shape ({len(keys)}, {self.dim}), got {vectors.shape}")
+        metadatas = metadatas or [None] * len(keys)
+        vectors = _normalize(vectors)
+
+        self._retired = []
+        with self._write() as generation:
+            next_row = self._conn.execute(
+                "SELECT COALESCE(MAX(row) + 1, 0) FROM vectors").fetchone()[0]
+            next_row = max(next_row, self._count)
+            rows = []
+            new_rows = []
+            for key in keys:
+                r = self._rows.get(key)
+                if r is None:
+                    r = next_row
+                    next_row += 1
+                    self._rows[key] = r
+                    new_rows.append(r)
+                rows.append(r)
+            if new_rows:
+                self._keys.extend([None] * (next_row - len(self._keys)))
+                for key, r in zip(keys, rows):
+                    self._keys[r] = key
+                self._alive = np.concatenate(
+                    [self._alive, np.zeros(next_row - self._count, dtype=bool)])
+                self._alive[new_rows] = True
+                self._count = next_row
+            self._ensure_capacity(self._count)
+            # Vectors land before the rows that point at them are committed
+            self._matrix[np.asarray(rows)] = vectors
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO vectors (row, key, metadata, deleted, gen) VALUES (?, ?, ?, 0, ?)",
+                [(r, k, json.dumps(m) if m is not None else None, generation)
+                 for r, k, m in zip(rows, keys, metadatas)],
+            )
+            if self._ivf is not None and new_rows:
+                self._ivf.add(new_rows)
+        _remove_quietly(self._retired)
+
+    def remove_vector(self, key: str) -> None:
+        """
+        Remove a single embedding from the store (tombstoned until rebuild_index).
+        """
+        with self._write() as generation:
+            r = self._rows.pop(key, None)
+            if r is None:
+                return
+            self._keys[r] = None
+            self._alive[r] = False
+            self._conn.execute("UPDATE vectors SET deleted = 1, gen = ? WHERE row = ?",
+                               (generation, r))
+
+    def remove_prefix(self, prefix: str, keep: Iterable[str] = ()) -> int:
+        """
+        Remove every embedding whose key starts with `prefix`, except those in
+        `keep` (tombstoned until rebuild_index). Returns how many were removed.
+        """
+        if not prefix:
+            raise ValueError("prefix must not be empty")
+        # Range scan on the unique key index: prefix <= key < prefix + 1
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        keep = set(keep)
+        with self._write() as generation:
+            rows = [(r, key) for r, key in self._conn.execute(
+                "SELECT row, key FROM vectors WHERE key >= ? AND key < ? AND deleted = 0",
+                (prefix, upper)) if key not in keep]
+            for r, key in rows:
+                self._rows.pop(key, None)
+                self._keys[r] = None
+                self._alive[r] = False
+            self._conn.executemany("UPDATE vectors SET deleted = 1, gen = ? WHERE row = ?",
+                                   [(generation, r) for r, _ in rows])
+        return len(rows)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._matrix.flush()
 
     def clear_all_vectors(self) -> None:
         """
         Remove all stored vectors, resetting the index.
         """
-        # TODO: implement deletion of the index file or in-memory store
-        if os.path.exists(self.index_path):
-            os.remove(self.index_path)
-        # Reinitialize empty index if needed
-        # e.g.: self.index = faiss.IndexFlatL2(dimension)
+        with self._write(epoch=True):
+            old_ivf = self.ivf_path
+            self._conn.execute("DELETE FROM vectors")
+            self._conn.execute("INSERT OR REPLACE INTO store_meta VALUES ('ivf_file', '')")
+        _remove_quietly([old_ivf] if old_ivf else [])
         print("🔄 Cleared all vectors.")
 
-    def rebuild_index(self) -> None:
+    def _generation_files(self) -> List[str]:
+        return glob.glob(f"{glob.escape(self.index_path)}.gen-*")
+
+    def rebuild_index(self, n_lists: Optional[int] = None) -> None:
         """
-        Rebuild the vector index from scratch, using existing raw data.
+        Compact away removed vectors and (re)train the IVF index if the store
+        is large enough for approximate search to pay off, or if `n_lists` is given.
+
+        The compacted matrix (and IVF index) are written to new
+        `<index_path>.gen-<id>` files, copied REBUILD_CHUNK rows at a time;
+        one SQLite transaction then renumbers the rows and points the store
+        at the new files. Until that commits the live store is untouched, so
+        an exception or crash mid-rebuild loses nothing. Other writers wait
+        for the rebuild (up to LOCK_TIMEOUT seconds).
         """
-        # TODO: load your raw data and re-encode it into the index
-        # placeholder:
-        print("🔧 Rebuilding vector index (stub).")
-        # after rebuilding, save to self.index_path
+        new_files: List[str] = []
+        with self._write(epoch=True):
+            in_use = {os.path.abspath(p) for p in (self.matrix_path, self.ivf_path) if p}
+            # Left behind by an interrupted rebuild, or retired by one another
+            # process still had mapped
+            _remove_quietly([p for p in self._generation_files()
+                             if os.path.abspath(p) not in in_use])
+
+            old_files = [p for p in (self.matrix_path, self.ivf_path) if p]
+            alive = np.flatnonzero(self._alive[:self._count])
+            try:
+                matrix_path = self._copy_rows(alive, len(alive))
+                new_files.append(matrix_path)
+                ivf_file = ""
+                if len(alive) and (n_lists or len(alive) >= self.ann_threshold):
+                    matrix = np.memmap(matrix_path, dtype=np.float32, mode="r",
+                                       shape=(len(alive), self.dim))
+                    ivf = IVFIndex.train(np.asarray(matrix), min(_lists_for(len(alive), n_lists),
+                                                                 len(alive)))
+                    del matrix
+                    ivf_path = f"{matrix_path[:-len('.f32')]}.ivf.npz"
+                    ivf.save(ivf_path)
+                    new_files.append(ivf_path)
+                    ivf_file = os.path.basename(ivf_path)
+
+                self._conn.execute("DELETE FROM vectors WHERE deleted = 1")
+                self._conn.execute("CREATE TEMP TABLE renumber (old INTEGER PRIMARY KEY, new INTEGER)")
+                self._conn.executemany("INSERT INTO renumber VALUES (?, ?)",
+                                       zip(alive.tolist(), range(len(alive))))
+                # Via negative numbers so no intermediate row collides with another
+                self._conn.execute(
+                    "UPDATE vectors SET row = -1 - (SELECT new FROM renumber WHERE old = vectors.row)")
+                self._conn.execute("UPDATE vectors SET row = -1 - row")
+                self._conn.execute("DROP TABLE temp.renumber")
+                self._conn.executemany("INSERT OR REPLACE INTO store_meta VALUES (?, ?)", [
+                    ("matrix_file", os.path.basename(matrix_path)),
+                    ("ivf_file", ivf_file),
+                ])
+            except BaseException:
+                _remove_quietly(new_files)
+                raise
+        _remove_quietly(old_files)
+        print(f"🔧 Rebuilt vector index ({len(alive)} vectors).")
+
+    def build_ann(self, n_lists: Optional[int] = None) -> None:
+        """Train the IVF coarse quantizer over every stored vector."""
+        with self._write(epoch=True):
+            n = self._count
+            old_ivf = self.ivf_path
+            ivf = IVFIndex.train(np.asarray(self._matrix[:n]), min(_lists_for(n, n_lists), n))
+            ivf_path = f"{self._new_generation_path()}.ivf.npz"
+            ivf.save(ivf_path)
+            self._conn.execute("INSERT OR REPLACE INTO store_meta VALUES ('ivf_file', ?)",
+                               (os.path.basename(ivf_path),))
+        if old_ivf and os.path.abspath(old_ivf) != os.path.abspath(self.ivf_path or ""):
+            _remove_quietly([old_ivf])
 
-    def add_vector(self, key: str, vector: Any) -> None:
+    # -- reads ---------------------------------------------------------------
+
+    def search(self, vector: Any, top_k: int = 5, mode: str = "auto",
+               n_probe: Optional[int] = None) -> List[Dict[str, Any]]:
         """
-        Add a single embedding to the store.
+        Return up to top_k matches as {"key", "score", "metadata"} dicts.
+        `mode` is "exact", "ann" or "auto" (ANN once the store passes ann_threshold).
         """
-        # TODO: insert into index with associated key
-        print(f"➕ Added vector for key={key}")
+        q = _normalize(np.asarray(vector, dtype=np.float32).reshape(-1))
+        with self._lock:
+            self._sync()
+            n = self._count
+            if n == 0:
+                return []
+            use_ann = self._ivf is not None and (
+                mode == "ann" or (mode == "auto" and len(self._rows) >= self.ann_threshold))
+            if use_ann:
+                rows = self._ivf.candidates(q, n_probe or self.n_probe)
+                # Sorted rows keep the memmap gather mostly sequential
+                rows = np.sort(rows[self._alive[rows]])
+                scores = self._matrix[rows] @ q
+            else:
+                rows = None
+                scores = np.asarray(self._matrix[:n] @ q)
+                scores[~self._alive[:n]] = -np.inf
+            best = _top_k(scores, top_k)
+            best = best[np.isfinite(scores[best])]
+            hits = rows[best] if rows is not None else best
+            keys = [self._keys[r] for r in hits]
+            meta = {}
+            if keys:
+                placeholders = ",".join("?" * len(keys))
+                meta = dict(self._conn.execute(
+                    f"SELECT key, metadata FROM vectors WHERE key IN ({placeholders})", keys))
+        return [
+            {"key": k, "score": float(scores[b]),
+             "metadata": json.loads(meta[k]) if meta.get(k) else None}
+            for k, b in zip(keys, best)
+        ]
 
     def query(self, vector: Any, top_k: int = 5) -> List[str]:
         """
         Query the index for top_k nearest items to `vector`.
         Returns list of keys (or metadata) for matches.
         """
-        # TODO: perform similarity search
-        print(f"🔍 Querying top {top_k} matches.")
-        return []  # stub
+        return [hit["key"] for hit in self.search(vector, top_k=top_k)]
+
+    def close(self) -> None:
+        self.flush()
+        self._matrix = None
+        self._conn.close()
+
+
+def _lists_for(n: int, n_lists: Optional[int]) -> int:
+    return n_lists or max(1, int(np.sqrt(n) * 2))
+
+
+def _remove_quietly(paths: Iterable[str]) -> None:
+    # Another process may still have an old data file mapped (Windows refuses
+    # to delete it); a later rebuild_index sweeps up what is left
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_vector_store() -> VectorStorage:
+    """Process-wide store at MEMORY_VECTOR_PATH (default ./data/vectors.db)."""
+    global _default_store
+    with _default_store_lock:
+        if _default_store is None:
+            path = os.getenv("MEMORY_VECTOR_PATH", "./data/vectors.db")
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            _default_store = VectorStorage(path)
+        return _default_store
+
+
+def query_memory(query: str, context: Optional[str] = None, top_k: int = 5) -> List[Dict[str, Any]]:
+    """Embed `query` (prefixed with optional `context`) and return the closest stored items."""
+    from memory.embedder import ContextMemory
+    memory = ContextMemory(db_manager=None, vector_store=get_vector_store())
+    text = f"{context}\n\n{query}" if context else query
+    return get_vector_store().search(memory._embed_text(text), top_k=top_k)
@@ -9,6 +9,10 @@ This script will recursively search a directory for PDF files and run OCR on
 them. It will log the results. It runs OCR on every file, even if it already
 has text. OCRmyPDF will detect files that already have text.
 
+Files are processed with ocrmypdf.batch.OcrBatch, which keeps one pool of
+workers for the whole run and works on several files at once, rather than
+calling ocrmypdf.ocr() for each file in turn.
+
 You should edit this script to meet your needs.
 """
 
@@ -23,6 +27,7 @@ import sys
 from pathlib import Path
 
 import ocrmypdf
+from ocrmypdf.batch import OcrBatch
 
 # pylint: disable=logging-format-interpolation
 # pylint: disable=logging-not-lazy
@@ -60,11 +65,13 @@ logging.info(f"Start directory {start_dir}")
 
 ocrmypdf.configure_logging(ocrmypdf.Verbosity.default)
 
-for filename in start_dir.glob("**/*.pdf"):
-    logging.info(f"Processing {filename}")
-    if ocrmypdf.pdfa.file_claims_pdfa(filename)["pass"]:
-        logging.info("Skipped document because it already contained text")
-    else:
+
+def files_to_ocr():
+    for filename in start_dir.glob("**/*.pdf"):
+        logging.info(f"Queueing {filename}")
+        if ocrmypdf.pdfa.file_claims_pdfa(filename)["pass"]:
+            logging.info(f"Skipped {filename} because it already contained text")
+            continue
         archive_filename = archive_dir + str(filename)
         if len(archive_dir) > 0 and not filecompare(filename, archive_filename):
             logging.info(f"Archiving document to {archive_filename}")
@@ -73,19 +80,24 @@ for filename in start_dir.glob("**/*.pdf"):
             except OSError:
                 os.makedirs(posixpath.dirname(archive_filename))
                 shutil.copy2(filename, posixpath.dirname(archive_filename))
-        try:
-            result = ocrmypdf.ocr(filename, filename, deskew=True)
-            logging.info(result)
-        except ocrmypdf.exceptions.EncryptedPdfError:
-            logging.info("Skipped document because it is encrypted")
-        except ocrmypdf.exceptions.PriorOcrFoundError:
-            logging.info("Skipped document because it already contained text")
-        except ocrmypdf.exceptions.DigitalSignatureError:
-            logging.info("Skipped document because it has a digital signature")
-        except ocrmypdf.exceptions.TaggedPDFError:
+        yield filename, filename
+
+
+with OcrBatch(deskew=True) as batch:
+    for result in batch.map(files_to_ocr()):
+        filename = result.input_file
+        if result.error is None:
+            logging.info(f"{filename}: {result.exit_code}")
+        elif isinstance(result.error, ocrmypdf.exceptions.EncryptedPdfError):
+            logging.info(f"Skipped {filename} because it is encrypted")
+        elif isinstance(result.error, ocrmypdf.exceptions.PriorOcrFoundError):
+            logging.info(f"Skipped {filename} because it already contained text")
+        elif isinstance(result.error, ocrmypdf.exceptions.DigitalSignatureError):
+            logging.info(f"Skipped {filename} because it has a digital signature")
+        elif isinstance(result.error, ocrmypdf.exceptions.TaggedPDFError):
             logging.info(
-                "Skipped document because it does not need ocr as it is tagged"
+                f"Skipped {filename} because it does not need ocr as it is tagged"
             )
-        except Exception:
-            logging.error("Unhandled error occured")
-        logging.info("OCR complete")
+        else:
+            logging.error(f"Unhandled error occured on {filename}: {result.error}")
+        logging.info(f"OCR complete for {filename}")
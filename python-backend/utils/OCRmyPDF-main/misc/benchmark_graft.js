@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# SPDX-FileCopyrightText: 2025 James R. Barlow
+# SPDX-License-Identifier: MIT
+
+"""Benchmark grafting OCR layers onto documents of increasing length.
+
+Builds synthetic documents in a temporary folder: a base PDF of N pages, and
+for every page a rasterized image page and a text-only layer, as the OCR
+pipeline would produce. Then times OcrGrafter over all pages and prints the
+time per page, which should stay flat as N grows.
+
+Usage:
+    python misc/benchmark_graft.py 250 500 1000 2000
+    python misc/benchmark_graft.py --max-checkpoint-mb 4 250 500 1000
+
+``--max-checkpoint-mb`` caps how much grafted content is held in memory before
+a checkpoint; a small cap shows the cost of frequent full rewrites.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from types import SimpleNamespace
+
+import pikepdf
+from pikepdf import Dictionary, Name
+
+from ocrmypdf import _graft
+
+TEXT_CONTENT = b'BT /F1 12 Tf 3 Tr 72 720 Td (benchmark) Tj ET'
+
+
+def make_inputs(folder: Path, pages: int, image_bytes: int) -> Path:
+    """Create the base PDF plus one image page and text layer file per page."""
+    base = folder / 'origin.pdf'
+    with pikepdf.new() as pdf:
+        for _ in range(pages):
+            pdf.add_blank_page(page_size=(612, 792))
+        pdf.save(base)
+
+    for n in range(pages):
+        with pikepdf.new() as pdf:
+            page = pdf.add_blank_page(page_size=(612, 792))
+            image = pdf.make_stream(
+                os.urandom(image_bytes),
+                Type=Name.XObject,
+                Subtype=Name.Image,
+                Width=100,
+                Height=image_bytes // 100,
+                ColorSpace=Name.DeviceGray,
+                BitsPerComponent=8,
+            )
+            page.Resources = Dictionary(XObject=Dictionary(Im0=image))
+            page.Contents = pdf.make_stream(b'q 612 0 0 792 0 0 cm /Im0 Do Q')
+            pdf.save(folder / f'{n:06d}_image.pdf')
+        with pikepdf.new() as pdf:
+            page = pdf.add_blank_page(page_size=(612, 792))
+            font = pdf.make_indirect(
+                Dictionary(Type=Name.Font, Subtype=Name.Type1, BaseFont=Name.Helvetica)
+            )
+            page.Resources = Dictionary(Font=Dictionary(F1=font))
+            page.Contents = pdf.make_stream(TEXT_CONTENT)
+            pdf.save(folder / f'{n:06d}_text.pdf')
+    return base
+
+
+def run(pages: int, image_bytes: int) -> tuple[float, int]:
+    with TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        base = make_inputs(folder, pages, image_bytes)
+        context = SimpleNamespace(
+            origin=base,
+            pdfinfo=[SimpleNamespace(rotation=0)] * pages,
+            options=SimpleNamespace(redo_ocr=False, keep_temporary_files=False),
+            get_path=lambda name: folder / name,
+        )
+        start = time.perf_counter()
+        grafter = _graft.OcrGrafter(context)
+        for n in range(pages):
+            grafter.graft_page(
+                pageno=n,
+                image=folder / f'{n:06d}_image.pdf',
+                textpdf=folder / f'{n:06d}_text.pdf',
+                autorotate_correction=0,
+            )
+        grafter.finalize()
+        return time.perf_counter() - start, grafter.interim_count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('pages', type=int, nargs='+', help="Page counts to try")
+    parser.add_argument(
+        '--image-kb', type=int, default=100, help="Image data per page, in KiB"
+    )
+    parser.add_argument(
+        '--max-checkpoint-mb',
+        type=int,
+        default=None,
+        help="Override MAX_CHECKPOINT_BYTES, in MiB",
+    )
+    args = parser.parse_args()
+    if args.max_checkpoint_mb is not None:
+        _graft.MAX_CHECKPOINT_BYTES = args.max_checkpoint_mb * 1024 * 1024
+        _graft.MIN_CHECKPOINT_BYTES = min(
+            _graft.MIN_CHECKPOINT_BYTES, _graft.MAX_CHECKPOINT_BYTES
+        )
+
+    print(f"{'pages':>8} {'seconds':>10} {'ms/page':>10} {'checkpoints':>12}")
+    for pages in args.pages:
+        seconds, checkpoints = run(pages, args.image_kb * 1024)
+        print(
+            f"{pages:>8} {seconds:>10.2f} {seconds / pages * 1000:>10.2f} "
+            f"{checkpoints:>12}"
+        )
+
+
+if __name__ == '__main__':
+    main()
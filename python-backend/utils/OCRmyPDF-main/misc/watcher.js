@@ -8,15 +8,22 @@
 # Do not enable annotations!
 # https://github.com/tiangolo/typer/discussions/598
 
+import functools
+import heapq
+import itertools
 import json
 import logging
+import os
 import shutil
 import sys
+import threading
 import time
+from concurrent.futures import Future
+from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 from pathlib import Path
-from typing import Annotated, Any
+from typing import Annotated
 
 import pikepdf
 import typer
@@ -26,6 +33,7 @@ from watchdog.observers import Observer
 from watchdog.observers.polling import PollingObserver
 
 import ocrmypdf
+from ocrmypdf.batch import OcrBatch
 
 load_dotenv()
 
@@ -61,75 +69,286 @@ def get_output_path(root: Path, basename: str, output_dir_year_month: bool) -> P
     return output_path
 
 
-def wait_for_file_ready(
-    file_path: Path, poll_new_file_seconds: int, retries_loading_file: int
-):
-    # This loop waits to make sure that the file is completely loaded on
-    # disk before attempting to read. Docker sometimes will publish the
-    # watchdog event before the file is actually fully on disk, causing
-    # pikepdf to fail.
+class PriorityEnum(str, Enum):
+    """Order in which ready files are OCRed."""
 
-    tries = retries_loading_file + 1
-    while tries:
-        try:
-            with pikepdf.Pdf.open(file_path) as pdf:
-                log.debug(f"{file_path} ready with {pdf.pages} pages")
-                return True
-        except (FileNotFoundError, OSError) as e:
-            log.info(f"File {file_path} is not ready yet")
-            log.debug("Exception was", exc_info=e)
-            time.sleep(poll_new_file_seconds)
-            tries -= 1
-        except pikepdf.PdfError as e:
-            log.info(f"File {file_path} is not full written yet")
-            log.debug("Exception was", exc_info=e)
-            time.sleep(poll_new_file_seconds)
-            tries -= 1
-
-    return False
-
-
-def execute_ocrmypdf(
-    *,
-    file_path: Path,
-    archive_dir: Path,
-    output_dir: Path,
-    ocrmypdf_kwargs: dict[str, Any],
-    on_success_delete: bool,
-    on_success_archive: bool,
-    poll_new_file_seconds: int,
-    retries_loading_file: int,
-    output_dir_year_month: bool,
-):
-    output_path = get_output_path(output_dir, file_path.name, output_dir_year_month)
+    FIFO = "fifo"
+    SIZE = "size"
+    PAGES = "pages"
 
-    log.info("-" * 20)
-    log.info(f'New file: {file_path}. Waiting until fully written...')
-    if not wait_for_file_ready(file_path, poll_new_file_seconds, retries_loading_file):
-        log.info(f"Gave up waiting for {file_path} to become ready")
-        return
-    log.info(f'Attempting to OCRmyPDF to: {output_path}')
 
-    log.debug(
-        f'OCRmyPDF input_file={file_path} output_file={output_path} '
-        f'kwargs: {ocrmypdf_kwargs}'
-    )
-    exit_code = ocrmypdf.ocr(
-        input_file=file_path,
-        output_file=output_path,
-        **ocrmypdf_kwargs,
-    )
-    if exit_code == 0:
-        if on_success_delete:
+@dataclass
+class QueuedFile:
+    """A file the watcher has seen but not finished OCRing."""
+
+    path: Path
+    queued_at: float
+    size: int = -1
+    mtime_ns: int = -1
+    misses: int = 0
+    started_at: float = 0.0
+
+
+class OcrScheduler:
+    """Queue new files, wait until they are fully written, and OCR them.
+
+    Files move through three stages: waiting (still being written), ready
+    (ordered by priority) and running (submitted to the OcrBatch). At most
+    ``max_concurrent`` files run at once; the rest stay in the ready heap, so
+    a small file that arrives after a large one can still go first.
+
+    A file is ready once its size and modification time have not changed
+    between two polls. Docker sometimes publishes the watchdog event before
+    the file is fully on disk, and checking with ``stat`` avoids reopening
+    the PDF on every poll.
+
+    Every file that has not finished is recorded in ``queue_file``, so a
+    restarted watcher resumes where it left off. Files that were running when
+    the watcher stopped are OCRed again.
+    """
+
+    def __init__(
+        self,
+        *,
+        batch: OcrBatch,
+        queue_file: Path,
+        max_concurrent: int,
+        priority: PriorityEnum,
+        poll_new_file_seconds: float,
+        retries_loading_file: int,
+        output_dir: Path,
+        output_dir_year_month: bool,
+        archive_dir: Path,
+        on_success_delete: bool,
+        on_success_archive: bool,
+    ):
+        self.batch = batch
+        self.queue_file = queue_file
+        self.max_concurrent = max_concurrent
+        self.priority = priority
+        self.poll_seconds = max(poll_new_file_seconds, 0.1)
+        self.retries_loading_file = retries_loading_file
+        self.output_dir = output_dir
+        self.output_dir_year_month = output_dir_year_month
+        self.archive_dir = archive_dir
+        self.on_success_delete = on_success_delete
+        self.on_success_archive = on_success_archive
+
+        self._cond = threading.Condition()
+        self._files: dict[Path, QueuedFile] = {}
+        self._waiting: set[Path] = set()
+        self._ready: list[tuple[float, int, Path]] = []
+        self._running: set[Path] = set()
+        self._seq = itertools.count()
+        self._stopping = False
+        self._thread = threading.Thread(
+            target=self._run, name='ocrmypdf-watcher-scheduler', daemon=True
+        )
+        self.completed = 0
+        self.failed = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def start(self):
+        """Reload the persisted queue and start scheduling."""
+        for path, queued_at in self._load():
+            self.add(path, queued_at=queued_at)
+        self._thread.start()
+
+    def stop(self):
+        """Stop starting new files. Running files are left to the OcrBatch."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def add(self, path: Path, *, queued_at: float | None = None):
+        with self._cond:
+            if path in self._files:
+                return
+            self._files[path] = QueuedFile(path, queued_at or time.time())
+            self._waiting.add(path)
+            self._save()
+            self._cond.notify_all()
+        log.info(f'Queued {path}. {self.describe_depth()}')
+
+    def depth(self) -> dict[str, int]:
+        with self._cond:
+            return {
+                'waiting': len(self._waiting),
+                'ready': len(self._ready),
+                'running': len(self._running),
+            }
+
+    def describe_depth(self) -> str:
+        depth = self.depth()
+        return (
+            f"Queue depth {sum(depth.values())}: {depth['waiting']} waiting, "
+            f"{depth['ready']} ready, {depth['running']} running"
+        )
+
+    def describe_latency(self) -> str:
+        with self._cond:
+            done = self.completed + self.failed
+            mean = self.total_latency / done if done else 0.0
+            return (
+                f"{self.completed} done, {self.failed} failed, "
+                f"latency mean {mean:.1f}s max {self.max_latency:.1f}s"
+            )
+
+    def _load(self) -> list[tuple[Path, float]]:
+        try:
+            entries = json.loads(self.queue_file.read_text())['files']
+        except FileNotFoundError:
+            return []
+        except (ValueError, KeyError) as e:
+            log.warning(f"Ignoring unreadable queue file {self.queue_file}: {e}")
+            return []
+        pending = []
+        for entry in entries:
+            path = Path(entry['path'])
+            if path.exists():
+                pending.append((path, entry['queued_at']))
+            else:
+                log.info(f"Dropping {path} from queue; it no longer exists")
+        if pending:
+            log.info(f"Resuming {len(pending)} queued files from {self.queue_file}")
+        return pending
+
+    def _save(self):
+        # Caller holds self._cond
+        entries = [
+            {'path': str(item.path), 'queued_at': item.queued_at}
+            for item in sorted(self._files.values(), key=lambda f: f.queued_at)
+        ]
+        tmp = self.queue_file.with_name(self.queue_file.name + '.tmp')
+        tmp.write_text(json.dumps({'version': 1, 'files': entries}, indent=2))
+        os.replace(tmp, self.queue_file)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if self._stopping:
+                    return
+                waiting = [self._files[path] for path in self._waiting]
+            ready = [
+                (self._priority(item), item)
+                for item in waiting
+                if self._check_ready(item)
+            ]
+            with self._cond:
+                for priority, item in ready:
+                    self._push_ready(priority, item)
+                self._dispatch()
+                if self._stopping:
+                    return
+                self._cond.wait(timeout=self.poll_seconds if self._waiting else None)
+
+    def _check_ready(self, item: QueuedFile) -> bool:
+        """Return True if the file has stopped changing since the last poll."""
+        try:
+            st = item.path.stat()
+        except OSError as e:
+            return self._miss(item, str(e))
+        if st.st_size == 0:
+            # Never fills in if the writer died; give up like a stat error
+            return self._miss(item, "file is empty")
+        signature = (st.st_size, st.st_mtime_ns)
+        if signature != (item.size, item.mtime_ns):
+            item.size, item.mtime_ns = signature
+            log.debug(f"File {item.path} is still being written")
+            return False
+        return True
+
+    def _miss(self, item: QueuedFile, reason: str) -> bool:
+        item.misses += 1
+        log.debug(f"File {item.path} is not ready yet: {reason}")
+        if item.misses > self.retries_loading_file:
+            log.info(f"Gave up waiting for {item.path} to become ready")
+            with self._cond:
+                self._forget(item.path)
+        return False
+
+    def _priority(self, item: QueuedFile) -> float:
+        if self.priority == PriorityEnum.SIZE:
+            return item.size
+        if self.priority == PriorityEnum.PAGES:
+            try:
+                with pikepdf.open(item.path) as pdf:
+                    return len(pdf.pages)
+            except (OSError, pikepdf.PdfError):
+                # Not readable as a PDF; let OCRmyPDF report the error
+                return 0
+        return item.queued_at
+
+    def _push_ready(self, priority: float, item: QueuedFile):
+        # Caller holds self._cond
+        if item.path not in self._waiting:
+            return  # forgotten while we were polling
+        self._waiting.discard(item.path)
+        heapq.heappush(self._ready, (priority, next(self._seq), item.path))
+
+    def _dispatch(self):
+        # Caller holds self._cond
+        while self._ready and len(self._running) < self.max_concurrent:
+            _, _, path = heapq.heappop(self._ready)
+            item = self._files[path]
+            output_path = get_output_path(
+                self.output_dir, path.name, self.output_dir_year_month
+            )
+            item.started_at = time.time()
+            self._running.add(path)
+            log.info(f'Attempting to OCRmyPDF {path} to: {output_path}')
+            log.debug(
+                f'OCRmyPDF input_file={path} output_file={output_path} '
+                f'kwargs: {self.batch.defaults}'
+            )
+            future = self.batch.submit(input_file=path, output_file=output_path)
+            future.add_done_callback(functools.partial(self._finished, item))
+
+    def _forget(self, path: Path):
+        # Caller holds self._cond
+        self._files.pop(path, None)
+        self._waiting.discard(path)
+        self._running.discard(path)
+        self._save()
+        self._cond.notify_all()
+
+    def _finished(self, item: QueuedFile, future: Future):
+        finished_at = time.time()
+        succeeded = future.exception() is None and future.result() == 0
+        try:
+            if future.exception() is not None:
+                log.error(f'OCR failed for {item.path}', exc_info=future.exception())
+            elif succeeded:
+                self._on_success(item.path)
+        except Exception:  # pylint: disable=broad-except
+            # The output is written; a failed delete/archive must not leave
+            # the file counted as running forever
+            log.exception(f'Post-processing failed for {item.path}')
+        finally:
+            with self._cond:
+                latency = finished_at - item.queued_at
+                if succeeded:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+                self.total_latency += latency
+                self.max_latency = max(self.max_latency, latency)
+                self._forget(item.path)
+        log.info(
+            f'OCR is done for {item.path} in {latency:.1f}s '
+            f'({item.started_at - item.queued_at:.1f}s queued, '
+            f'{finished_at - item.started_at:.1f}s OCR). {self.describe_depth()}'
+        )
+
+    def _on_success(self, file_path: Path):
+        if self.on_success_delete:
             log.info(f'OCR is done. Deleting: {file_path}')
             file_path.unlink()
-        elif on_success_archive:
-            log.info(f'OCR is done. Archiving {file_path.name} to {archive_dir}')
-            shutil.move(file_path, f'{archive_dir}/{file_path.name}')
-        else:
-            log.info('OCR is done')
-    else:
-        log.info('OCR is done')
+        elif self.on_success_archive:
+            log.info(f'OCR is done. Archiving {file_path.name} to {self.archive_dir}')
+            shutil.move(file_path, f'{self.archive_dir}/{file_path.name}')
 
 
 class HandleObserverEvent(PatternMatchingEventHandler):
@@ -139,7 +358,7 @@ class HandleObserverEvent(PatternMatchingEventHandler):
         ignore_patterns=None,
         ignore_directories=False,
         case_sensitive=False,
-        settings={},
+        scheduler: OcrScheduler | None = None,
     ):
         super().__init__(
             patterns=patterns,
@@ -147,11 +366,11 @@ class HandleObserverEvent(PatternMatchingEventHandler):
             ignore_directories=ignore_directories,
             case_sensitive=case_sensitive,
         )
-        self._settings = settings
+        self._scheduler = scheduler
 
     def on_any_event(self, event):
         if event.event_type in ['created']:
-            execute_ocrmypdf(file_path=Path(event.src_path), **self._settings)
+            self._scheduler.add(Path(event.src_path))
 
 
 @app.command()
@@ -261,6 +480,31 @@ def main(
             help='File patterns to watch',
         ),
     ] = '*.pdf,*.PDF',
+    max_concurrent: Annotated[
+        int,
+        typer.Option(
+            envvar='OCR_MAX_CONCURRENT',
+            help='Number of files to OCR at the same time (default: CPU count)',
+            min=1,
+        ),
+    ] = None,
+    priority: Annotated[
+        PriorityEnum,
+        typer.Option(
+            envvar='OCR_PRIORITY',
+            help='Order of ready files: smallest size, fewest pages, or arrival',
+        ),
+    ] = PriorityEnum.SIZE,
+    queue_file: Annotated[
+        Path,
+        typer.Option(
+            envvar='OCR_QUEUE_FILE',
+            dir_okay=False,
+            resolve_path=True,
+            help='File that records queued files so a restart resumes them '
+            '(default: .ocrmypdf-watcher-queue.json in the output directory)',
+        ),
+    ] = None,
 ):
     ocrmypdf.configure_logging(
         verbosity=(
@@ -290,6 +534,9 @@ def main(
         f"POLL_NEW_FILE_SECONDS: {poll_new_file_seconds}\n"
         f"RETRIES_LOADING_FILE: {retries_loading_file}\n"
         f"USE_POLLING: {use_polling}\n"
+        f"MAX_CONCURRENT: {max_concurrent}\n"
+        f"PRIORITY: {priority.value}\n"
+        f"QUEUE_FILE: {queue_file}\n"
         f"LOGLEVEL: {loglevel.value}"
     )
 
@@ -304,19 +551,26 @@ def main(
         )
         sys.exit(1)
 
-    handler = HandleObserverEvent(
-        patterns=patterns.split(','),
-        settings={
-            'archive_dir': archive_dir,
-            'output_dir': output_dir,
-            'ocrmypdf_kwargs': json_settings | {'deskew': deskew},
-            'on_success_delete': on_success_delete,
-            'on_success_archive': on_success_archive,
-            'poll_new_file_seconds': poll_new_file_seconds,
-            'retries_loading_file': retries_loading_file,
-            'output_dir_year_month': output_dir_year_month,
-        },
+    # One warm worker pool serves every file, and pages of files that run
+    # together are OCRed side by side
+    batch = OcrBatch(
+        max_documents=max_concurrent, **(json_settings | {'deskew': deskew})
+    )
+    scheduler = OcrScheduler(
+        batch=batch,
+        queue_file=queue_file or output_dir / '.ocrmypdf-watcher-queue.json',
+        max_concurrent=batch.max_documents,
+        priority=priority,
+        poll_new_file_seconds=poll_new_file_seconds,
+        retries_loading_file=retries_loading_file,
+        output_dir=output_dir,
+        output_dir_year_month=output_dir_year_month,
+        archive_dir=archive_dir,
+        on_success_delete=on_success_delete,
+        on_success_archive=on_success_archive,
     )
+    scheduler.start()
+    handler = HandleObserverEvent(patterns=patterns.split(','), scheduler=scheduler)
     if use_polling:
         observer = PollingObserver()
     else:
@@ -327,9 +581,13 @@ def main(
     try:
         while True:
             time.sleep(30)
+            if sum(scheduler.depth().values()):
+                log.info(f"{scheduler.describe_depth()}; {scheduler.describe_latency()}")
     except KeyboardInterrupt:
         observer.stop()
     observer.join()
+    scheduler.stop()
+    batch.close()
 
 
 if __name__ == "__main__":
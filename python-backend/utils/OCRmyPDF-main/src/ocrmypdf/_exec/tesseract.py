@@ -25,6 +25,8 @@ from ocrmypdf.subprocess import get_version, run
 
 log = logging.getLogger(__name__)
 
+SKIPPED_PAGE_TEXT = '[skipped page]'
+
 
 TESSERACT_THRESHOLDING_METHODS: dict[str, int] = {
     'auto': 0,
@@ -271,7 +273,7 @@ def _generate_null_hocr(output_hocr: Path, output_text: Path, image: Path) -> No
     Ensures page is the same size as the input image.
     """
     output_hocr.write_text('', encoding='utf-8')
-    output_text.write_text('[skipped page]', encoding='utf-8')
+    output_text.write_text(SKIPPED_PAGE_TEXT, encoding='utf-8')
 
 
 def generate_hocr(
@@ -334,7 +336,7 @@ def generate_hocr(
 
 
 def use_skip_page(output_pdf: Path, output_text: Path) -> None:
-    output_text.write_text('[skipped page]', encoding='utf-8')
+    output_text.write_text(SKIPPED_PAGE_TEXT, encoding='utf-8')
 
     # A 0 byte file to the output to indicate a skip
     output_pdf.write_bytes(b'')
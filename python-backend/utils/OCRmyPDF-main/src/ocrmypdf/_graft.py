@@ -32,7 +32,17 @@ class RenderMode(Enum):
 
 
 log = logging.getLogger(__name__)
-MAX_REPLACE_PAGES = 100
+
+# pikepdf copies grafted page content into memory, so the working PDF must be
+# saved and reopened now and then. Each checkpoint rewrites the whole file, so
+# checkpointing every N pages makes total I/O quadratic in the page count.
+# Instead, checkpoint once the grafted content held in memory reaches a
+# fraction of the size already on disk: checkpoint sizes then grow
+# geometrically and total I/O stays linear, while memory is bounded by
+# MAX_CHECKPOINT_BYTES.
+CHECKPOINT_GROWTH = 0.5
+MIN_CHECKPOINT_BYTES = 32 * 1024 * 1024
+MAX_CHECKPOINT_BYTES = 512 * 1024 * 1024
 
 
 def _ensure_dictionary(obj: Dictionary | Stream, name: Name):
@@ -57,6 +67,22 @@ def _update_resources(
         fonts[font_key] = font
 
 
+INHERITABLE_PAGE_KEYS = (Name.Resources, Name.MediaBox, Name.CropBox, Name.Rotate)
+
+
+def _push_inherited_attributes(page: Dictionary):
+    """Copy attributes a page inherits from its page tree onto the page itself.
+
+    Needed before copying a page on its own, without its page tree.
+    """
+    for key in INHERITABLE_PAGE_KEYS:
+        node = page
+        while key not in node and Name.Parent in node:
+            node = node.Parent
+        if key in node and node is not page:
+            page[key] = node[key]
+
+
 def strip_invisible_text(pdf: Pdf, page: Page):
     stream = []
     in_text_obj = False
@@ -105,16 +131,30 @@ class OcrGrafter:
         self.path_base = context.origin
 
         self.pdf_base = Pdf.open(self.path_base)
+        self._pages: list[Page] | None = None
         self.font: Dictionary | None = None
         self.font_key: Name | None = None
 
         self.pdfinfo = context.pdfinfo
         self.output_file = context.get_path('graft_layers.pdf')
 
-        self.emplacements = 1
         self.interim_count = 0
+        self.pending_bytes = 0
+        self.checkpoint_bytes = self.path_base.stat().st_size
         self.render_mode = RenderMode.UNDERNEATH
 
+    @property
+    def pages(self) -> list[Page]:
+        """Pages of the working PDF.
+
+        Indexing ``Pdf.pages`` is linear in the page count, and grafting touches
+        several pages per call, so keep our own list. Emplacement preserves
+        page objects, so it stays valid until the next checkpoint.
+        """
+        if self._pages is None:
+            self._pages = list(self.pdf_base.pages)
+        return self._pages
+
     def graft_page(
         self,
         *,
@@ -133,15 +173,16 @@ class OcrGrafter:
             # We are updating the old page with a rasterized PDF of the new
             # page (without changing objgen, to preserve references)
             log.debug("Emplacement update")
+            self.pending_bytes += path_image.stat().st_size
             with Pdf.open(path_image) as pdf_image:
-                self.emplacements += 1
+                # Copy the page object directly rather than appending it to the
+                # page list and deleting it again, which costs O(pages) each
                 foreign_image_page = pdf_image.pages[0]
-                self.pdf_base.pages.append(foreign_image_page)
-                local_image_page = self.pdf_base.pages[-1]
-                self.pdf_base.pages[pageno].emplace(
-                    local_image_page, retain=(Name.Parent,)
+                _push_inherited_attributes(foreign_image_page.obj)
+                local_image_page = Page(
+                    self.pdf_base.copy_foreign(foreign_image_page.obj)
                 )
-                del self.pdf_base.pages[-1]
+                self.pages[pageno].emplace(local_image_page, retain=(Name.Parent,))
             emplaced_page = True
 
         # Calculate if the text is misaligned compared to the content
@@ -161,6 +202,7 @@ class OcrGrafter:
             # Graft the text layer onto this page, whether new or old, possibly
             # rotating the text layer by the amount is misaligned.
             strip_old = self.context.options.redo_ocr
+            self.pending_bytes += Path(textpdf).stat().st_size
             self._graft_text_layer(
                 page_num=pageno + 1,
                 textpdf=textpdf,
@@ -173,22 +215,27 @@ class OcrGrafter:
         # Correct the overall page rotation if needed, now that the text and content
         # are aligned
         page_rotation = (content_rotation - autorotate_correction) % 360
-        self.pdf_base.pages[pageno].Rotate = page_rotation
+        self.pages[pageno].Rotate = page_rotation
         log.debug(
             f"Page rotation: (content, auto) -> page = "
             f"({content_rotation}, {autorotate_correction}) -> {page_rotation}"
         )
-        if self.emplacements % MAX_REPLACE_PAGES == 0:
+        if self.pending_bytes >= self._checkpoint_threshold():
             self.save_and_reload()
 
+    def _checkpoint_threshold(self) -> int:
+        """Bytes of grafted content to accumulate before the next checkpoint."""
+        threshold = int(self.checkpoint_bytes * CHECKPOINT_GROWTH)
+        return min(max(threshold, MIN_CHECKPOINT_BYTES), MAX_CHECKPOINT_BYTES)
+
     def save_and_reload(self) -> None:
         """Save and reload the Pdf.
 
         This will keep a lid on our memory usage for very large files. Attach
         the font to page 1 even if page 1 doesn't use it, so we have a way to get it
-        back.
+        back. See ``CHECKPOINT_GROWTH`` for how often this happens.
         """
-        page0 = self.pdf_base.pages[0]
+        page0 = self.pages[0]
         _update_resources(obj=page0.obj, font=self.font, font_key=self.font_key)
 
         # We cannot read and write the same file, that will corrupt it
@@ -208,8 +255,14 @@ class OcrGrafter:
         self.pdf_base.close()
 
         self.pdf_base = Pdf.open(next_file)
+        self._pages = None
         self.font, self.font_key = None, None  # Ensure we reacquire this information
         self.interim_count += 1
+        self.checkpoint_bytes = next_file.stat().st_size
+        self.pending_bytes = 0
+        log.debug(
+            "Grafting checkpoint %d: %d bytes", self.interim_count, self.checkpoint_bytes
+        )
 
     def finalize(self):
         self.pdf_base.save(self.output_file)
@@ -268,7 +321,7 @@ class OcrGrafter:
         with Pdf.open(textpdf) as pdf_text:
             pdf_text_contents = pdf_text.pages[0].Contents.read_bytes()
 
-            base_page = self.pdf_base.pages.p(page_num)
+            base_page = self.pages[page_num - 1]
 
             # The text page always will be oriented up by this stage but the original
             # content may have a rotation applied. Wrap the text stream with a rotation
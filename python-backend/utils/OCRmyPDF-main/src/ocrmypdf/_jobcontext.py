@@ -7,7 +7,8 @@ from __future__ import annotations
 
 import os
 from argparse import Namespace
-from collections.abc import Iterator
+from collections.abc import Iterable, Iterator
+from contextlib import suppress
 from copy import copy
 from pathlib import Path
 
@@ -80,6 +81,7 @@ class PageContext:
         self.pageno = pageno
         self.pageinfo = pdf_context.pdfinfo[pageno]
         self.plugin_manager = pdf_context.plugin_manager
+        self.intermediate_paths: set[Path] = set()
 
     def get_path(self, name: str) -> Path:
         """Generate a ``Path`` for a file that is part of processing this page.
@@ -87,7 +89,22 @@ class PageContext:
         The path will be based in a common temporary folder and have a prefix based
         on the page number.
         """
-        return self.work_folder / f"{(self.pageno + 1):06d}_{name}"
+        path = self.work_folder / f"{(self.pageno + 1):06d}_{name}"
+        self.intermediate_paths.add(path)
+        return path
+
+    def remove_intermediates(self, keep: Iterable[Path | None] = ()) -> None:
+        """Delete the files this page created with ``get_path``.
+
+        Args:
+            keep: Paths that are still needed, usually the ones handed back to
+                the parent process in the page's result.
+        """
+        keep_paths = {Path(p) for p in keep if p is not None}
+        for path in self.intermediate_paths - keep_paths:
+            with suppress(FileNotFoundError, IsADirectoryError):
+                path.unlink()
+        self.intermediate_paths &= keep_paths
 
     def __getstate__(self):
         state = self.__dict__.copy()
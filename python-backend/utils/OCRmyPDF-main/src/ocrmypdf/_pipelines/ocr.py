@@ -10,6 +10,7 @@ import argparse
 import logging
 import logging.handlers
 from collections.abc import Sequence
+from contextlib import suppress
 from functools import partial
 from pathlib import Path
 from tempfile import mkdtemp
@@ -79,6 +80,11 @@ def _exec_page_sync(page_context: PageContext) -> PageResult:
         page_context
     )
     ocr_out, text_out = _image_to_ocr_text(page_context, ocr_image_out)
+    if not page_context.options.keep_temporary_files:
+        # Rasterized and preprocessed images are not needed past this point
+        page_context.remove_intermediates(
+            keep=(pdf_page_from_image_out, ocr_out, text_out)
+        )
     return PageResult(
         pageno=page_context.pageno,
         pdf_page_from_image=pdf_page_from_image_out,
@@ -88,6 +94,20 @@ def _exec_page_sync(page_context: PageContext) -> PageResult:
     )
 
 
+def _remove_grafted_files(result: PageResult, context: PdfContext) -> None:
+    """Delete a page's image and text layer PDFs once they are grafted.
+
+    The sidecar text is kept until all pages are merged.
+    """
+    if context.options.keep_temporary_files:
+        return
+    origin = Path(context.origin).resolve()
+    for path in (result.pdf_page_from_image, result.ocr):
+        if path is not None and Path(path).resolve() != origin:
+            with suppress(FileNotFoundError):
+                Path(path).unlink()
+
+
 def exec_concurrent(context: PdfContext, executor: Executor) -> Sequence[str]:
     """Execute the OCR pipeline concurrently."""
     options = context.options
@@ -110,6 +130,7 @@ def exec_concurrent(context: PdfContext, executor: Executor) -> Sequence[str]:
                 textpdf=result.ocr,
                 autorotate_correction=result.orientation_correction,
             )
+            _remove_grafted_files(result, context)
             pbar.update(0.5)
         finally:
             set_thread_pageno(None)
@@ -152,6 +173,7 @@ def exec_concurrent(context: PdfContext, executor: Executor) -> Sequence[str]:
 def _run_pipeline(
     options: argparse.Namespace,
     plugin_manager: OcrmypdfPluginManager,
+    executor: Executor | None = None,
 ) -> ExitCode:
     with (
         manage_work_folder(
@@ -161,7 +183,9 @@ def _run_pipeline(
         ) as work_folder,
         manage_debug_log_handler(options=options, work_folder=work_folder),
     ):
-        executor = setup_pipeline(options, plugin_manager)
+        default_executor = setup_pipeline(options, plugin_manager)
+        if executor is None:
+            executor = default_executor
         check_requested_output_file(options)
         start_input_file, original_filename = create_input_file(options, work_folder)
 
@@ -203,6 +227,7 @@ def run_pipeline(
     options: argparse.Namespace,
     *,
     plugin_manager: OcrmypdfPluginManager,
+    executor: Executor | None = None,
 ) -> ExitCode:
     """Run the OCR pipeline without command line exception handling.
 
@@ -210,5 +235,7 @@ def run_pipeline(
         options: The parsed command line options.
         plugin_manager: The plugin manager to use. If not provided, one will be
             created.
+        executor: The executor to use, for example one shared by a batch of
+            documents. If not provided, the plugin manager's executor is used.
     """
-    return _run_pipeline(options, plugin_manager)
+    return _run_pipeline(options, plugin_manager, executor)
@@ -0,0 +1,200 @@
+# SPDX-FileCopyrightText: 2025 James R. Barlow
+# SPDX-License-Identifier: MPL-2.0
+
+"""Run OCRmyPDF on many documents with one long-lived worker pool."""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from ocrmypdf._pipelines._common import worker_init
+from ocrmypdf._pipelines.ocr import run_pipeline
+from ocrmypdf._plugin_manager import get_plugin_manager
+from ocrmypdf._validation import check_options
+from ocrmypdf.api import PathOrIO, _api_lock, create_options
+from ocrmypdf.builtin_plugins.concurrency import SharedPoolExecutor, submit_windowed
+from ocrmypdf.cli import get_parser
+from ocrmypdf.exceptions import ExitCode
+from ocrmypdf.helpers import available_cpu_count
+
+log = logging.getLogger(__name__)
+
+
+class BatchResult(NamedTuple):
+    """Outcome of one document in a batch."""
+
+    input_file: PathOrIO
+    output_file: PathOrIO
+    exit_code: ExitCode | None
+    """Exit code, or ``None`` if the document raised an exception."""
+    error: BaseException | None = None
+    """The exception raised while processing the document, if any."""
+
+    @property
+    def ok(self) -> bool:
+        return self.exit_code == ExitCode.ok
+
+
+class OcrBatch:
+    """Run OCR on many documents, reusing one warm worker pool.
+
+    Each call to :func:`ocrmypdf.ocr` sets up a plugin manager, starts a pool of
+    worker processes and a log listener, and tears them down when the document
+    is done. For a stream of small documents such as 1-3 page receipts, that
+    startup dominates, and a short document cannot use more workers than it
+    has pages. An ``OcrBatch`` creates the plugin manager and worker pool once.
+    Several documents are processed at a time, and their pages interleave in
+    the shared pool, so all workers stay busy.
+
+    Documents are processed in threads of the calling process. Page processing
+    runs in the shared pool; scanning the input file, grafting, and
+    postprocessing run in each document's thread as they do for ``ocr()``.
+    Process-wide settings such as ``max_image_mpixels`` should be the same for
+    every document in a batch.
+
+    Example:
+        >>> with OcrBatch(language=['eng'], deskew=True) as batch:  # doctest: +SKIP
+        ...     for result in batch.map([('a.pdf', 'a_ocr.pdf')]):
+        ...         print(result.input_file, result.exit_code)
+
+    Args:
+        jobs: Number of workers in the shared pool. Defaults to the number of
+            CPUs.
+        use_threads: Use worker threads instead of processes.
+        max_documents: How many documents may be in progress at once. Defaults
+            to ``jobs``, which is enough to keep every worker busy even when
+            each document has one page.
+        plugins: Plugins to load, as for :func:`ocrmypdf.ocr`.
+        **ocr_kwargs: Default arguments for every document, as for
+            :func:`ocrmypdf.ocr`. They may be overridden per document.
+    """
+
+    def __init__(
+        self,
+        *,
+        jobs: int | None = None,
+        use_threads: bool = False,
+        max_documents: int | None = None,
+        plugins: Iterable[Path | str] | None = None,
+        **ocr_kwargs: Any,
+    ):
+        if isinstance(plugins, str | Path):
+            plugins = [plugins]
+        plugins = list(plugins or [])
+        self.jobs = jobs or available_cpu_count()
+        self.defaults = dict(ocr_kwargs)
+        self.defaults.update(
+            jobs=self.jobs, use_threads=use_threads, plugins=plugins
+        )
+        self.defaults.setdefault('progress_bar', False)
+
+        self._options_lock = threading.Lock()
+        with _api_lock:
+            self.plugin_manager = get_plugin_manager(plugins)
+            self._parser = get_parser()
+            self.plugin_manager.hook.add_options(  # pylint: disable=no-member
+                parser=self._parser
+            )
+
+        # Documents share the workers, so one Tesseract thread per worker avoids
+        # oversubscribing the CPUs. Set it before the workers are started.
+        if not os.environ.get('OMP_THREAD_LIMIT', '').isnumeric():
+            os.environ['OMP_THREAD_LIMIT'] = '1'
+        self.executor = SharedPoolExecutor(
+            max_workers=self.jobs,
+            use_threads=use_threads,
+            shareable_initializers=(worker_init,),
+        )
+        self.max_documents = max_documents or self.jobs
+        self._documents = ThreadPoolExecutor(
+            max_workers=self.max_documents, thread_name_prefix='ocrmypdf-batch'
+        )
+
+    def __enter__(self) -> OcrBatch:
+        return self
+
+    def __exit__(self, *_exc_info) -> None:
+        self.close()
+
+    def _run(
+        self, input_file: PathOrIO, output_file: PathOrIO, kwargs: dict[str, Any]
+    ) -> ExitCode:
+        with self._options_lock:
+            options = create_options(
+                input_file=input_file,
+                output_file=output_file,
+                parser=self._parser,
+                **(self.defaults | kwargs),
+            )
+        check_options(options, self.plugin_manager)
+        return run_pipeline(
+            options=options, plugin_manager=self.plugin_manager, executor=self.executor
+        )
+
+    def _run_result(
+        self, input_file: PathOrIO, output_file: PathOrIO, kwargs: dict[str, Any]
+    ) -> BatchResult:
+        try:
+            exit_code = self._run(input_file, output_file, kwargs)
+        except Exception as e:  # pylint: disable=broad-except
+            log.debug("Batch document %s failed", input_file, exc_info=True)
+            return BatchResult(input_file, output_file, None, e)
+        return BatchResult(input_file, output_file, exit_code)
+
+    def submit(
+        self, input_file: PathOrIO, output_file: PathOrIO, **kwargs: Any
+    ) -> Future[ExitCode]:
+        """Queue one document.
+
+        Returns:
+            A future that resolves to the document's :class:`ExitCode`, or raises
+            the same exceptions :func:`ocrmypdf.ocr` would.
+        """
+        return self._documents.submit(self._run, input_file, output_file, kwargs)
+
+    def map(
+        self, files: Iterable[tuple[PathOrIO, PathOrIO]], **kwargs: Any
+    ) -> Iterator[BatchResult]:
+        """Process ``(input_file, output_file)`` pairs, yielding results as each
+        document finishes.
+
+        Results arrive in completion order, not input order. ``files`` is read
+        lazily, so it may be a generator over a large folder. Exceptions are
+        reported in :attr:`BatchResult.error` rather than raised.
+        """
+        for future in submit_windowed(
+            self._documents,
+            self._run_result,
+            ((input_file, output_file, kwargs) for input_file, output_file in files),
+            2 * self.max_documents,
+        ):
+            yield future.result()
+
+    def close(self) -> None:
+        """Wait for queued documents, then stop the worker pool."""
+        self._documents.shutdown(wait=True)
+        self.executor.shutdown()
+
+
+def ocr_batch(
+    files: Iterable[tuple[PathOrIO, PathOrIO]], **kwargs: Any
+) -> Iterator[BatchResult]:
+    """Run OCR on ``(input_file, output_file)`` pairs with a shared worker pool.
+
+    A convenience wrapper around :class:`OcrBatch`. Arguments are as for
+    :class:`OcrBatch` and apply to every document.
+
+    Yields:
+        A :class:`BatchResult` as each document finishes.
+    """
+    with OcrBatch(**kwargs) as batch:
+        yield from batch.map(files)
+
+
+__all__ = ['BatchResult', 'OcrBatch', 'ocr_batch']
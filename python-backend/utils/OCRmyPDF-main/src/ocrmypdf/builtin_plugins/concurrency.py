@@ -12,14 +12,23 @@ import queue
 import signal
 import sys
 import threading
-from collections.abc import Callable, Iterable
-from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
-from contextlib import suppress
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor as FuturesExecutor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from contextlib import nullcontext, suppress
+from itertools import islice
 from typing import Union
 
 from rich.console import Console as RichConsole
 
 from ocrmypdf import Executor, hookimpl
+from ocrmypdf._concurrent import _task_noop
 from ocrmypdf._logging import RichLoggingHandler
 from ocrmypdf._progressbar import RichProgressBar
 from ocrmypdf.exceptions import InputFileError
@@ -96,8 +105,53 @@ def thread_init(q: Queue, user_init: UserInit, loglevel) -> None:
     return
 
 
+def submit_windowed(
+    executor: FuturesExecutor,
+    task: Callable,
+    task_arguments: Iterable,
+    max_pending: int | None,
+) -> Iterator[Future]:
+    """Submit tasks to executor and yield their futures as they complete.
+
+    At most ``max_pending`` tasks are in flight at any time; as tasks complete,
+    the window is refilled from ``task_arguments``. The arguments are pulled
+    lazily, so for a 10,000 page file only a window's worth of page contexts
+    exist at once, and intermediate files cannot pile up faster than the caller
+    consumes results.
+    If ``max_pending`` is ``None``, every task is submitted up front.
+    """
+    arguments = iter(task_arguments)
+    pending = {
+        executor.submit(task, *args) for args in islice(arguments, max_pending)
+    }
+    try:
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            # Refill before handing results back, so workers stay busy while the
+            # caller processes them
+            pending.update(
+                executor.submit(task, *args) for args in islice(arguments, len(done))
+            )
+            yield from done
+    finally:
+        # If the caller gave up early, don't leave its queued tasks behind in
+        # what may be a shared executor
+        for future in pending:
+            future.cancel()
+
+
 class StandardExecutor(Executor):
-    """Standard OCRmyPDF concurrent task executor."""
+    """Standard OCRmyPDF concurrent task executor.
+
+    Tasks are submitted through a window of ``tasks_per_worker`` tasks per
+    worker, which keeps every worker busy while bounding the number of pages
+    in flight, and so memory and temporary disk use, regardless of the page
+    count. Set ``tasks_per_worker`` to ``None`` to submit all tasks at once.
+    """
+
+    def __init__(self, *, pbar_class=None, tasks_per_worker: int | None = 2):
+        super().__init__(pbar_class=pbar_class)
+        self.tasks_per_worker = tasks_per_worker
 
     def _execute(
         self,
@@ -138,9 +192,13 @@ class StandardExecutor(Executor):
                 initargs=(log_queue, worker_initializer, logging.getLogger("").level),
             ) as executor,
         ):
-            futures = [executor.submit(task, *args) for args in task_arguments]
+            max_pending = (
+                max_workers * self.tasks_per_worker if self.tasks_per_worker else None
+            )
             try:
-                for future in as_completed(futures):
+                for future in submit_windowed(
+                    executor, task, task_arguments, max_pending
+                ):
                     result = future.result()
                     task_finished(result, pbar)
             except KeyboardInterrupt:
@@ -165,6 +223,113 @@ class StandardExecutor(Executor):
         listener.join()
 
 
+def _run_initialized(initializer: Callable, task: Callable, *args):
+    initializer()
+    return task(*args)
+
+
+class SharedPoolExecutor(StandardExecutor):
+    """Executor that keeps one warm worker pool across many pipeline runs.
+
+    StandardExecutor creates a worker pool and log listener for every call and
+    serializes calls with ``pool_lock``. When many small documents are
+    processed, pool startup dominates and each document can only use as many
+    workers as it has pages. This executor starts its pool once, and any number
+    of threads may call it concurrently, so tasks from different documents
+    interleave in the same workers.
+
+    Because the workers already exist, a call's ``worker_initializer`` is run
+    before each of its tasks instead, which is only correct for initializers
+    that are cheap and idempotent; those are listed in
+    ``shareable_initializers``. Calls with any other initializer (pdfinfo opens
+    the input file once per worker, for example) or with a different
+    ``use_threads`` get a private pool, as StandardExecutor would give them.
+    """
+
+    pool_lock = nullcontext()  # type: ignore[assignment]
+
+    def __init__(
+        self,
+        *,
+        max_workers: int,
+        use_threads: bool = False,
+        shareable_initializers: Iterable[Callable] = (),
+        pbar_class=None,
+        tasks_per_worker: int | None = 2,
+    ):
+        super().__init__(pbar_class=pbar_class, tasks_per_worker=tasks_per_worker)
+        self.max_workers = max_workers
+        self.use_threads = use_threads
+        self.shareable_initializers = {_task_noop, *shareable_initializers}
+
+        if use_threads:
+            self._log_queue: Queue = queue.Queue(-1)
+            executor_class: FuturesExecutorClass = ThreadPoolExecutor
+            initializer: WorkerInit = thread_init
+        else:
+            self._log_queue = multiprocessing.Queue(-1)
+            executor_class = ProcessPoolExecutor
+            initializer = process_init
+        self._pool = executor_class(
+            max_workers=max_workers,
+            initializer=initializer,
+            initargs=(self._log_queue, _task_noop, logging.getLogger("").level),
+        )
+        # Start every worker now, before the caller starts any threads of its own
+        wait([self._pool.submit(_task_noop) for _ in range(max_workers)])
+        self._listener = threading.Thread(
+            target=log_listener, args=(self._log_queue,), daemon=True
+        )
+        self._listener.start()
+
+    def _is_shareable(self, use_threads: bool, worker_initializer: Callable) -> bool:
+        func = getattr(worker_initializer, 'func', worker_initializer)  # partial
+        return use_threads == self.use_threads and func in self.shareable_initializers
+
+    def _execute(
+        self,
+        *,
+        use_threads: bool,
+        max_workers: int,
+        progress_kwargs: dict,
+        worker_initializer: Callable,
+        task: Callable,
+        task_arguments: Iterable,
+        task_finished: Callable,
+    ):
+        if not self._is_shareable(use_threads, worker_initializer):
+            super()._execute(
+                use_threads=use_threads,
+                max_workers=max_workers,
+                progress_kwargs=progress_kwargs,
+                worker_initializer=worker_initializer,
+                task=task,
+                task_arguments=task_arguments,
+                task_finished=task_finished,
+            )
+            return
+
+        max_pending = (
+            min(max_workers, self.max_workers) * self.tasks_per_worker
+            if self.tasks_per_worker
+            else None
+        )
+        with self.pbar_class(**progress_kwargs) as pbar:
+            for future in submit_windowed(
+                self._pool,
+                _run_initialized,
+                ((worker_initializer, task, *args) for args in task_arguments),
+                max_pending,
+            ):
+                task_finished(future.result(), pbar)
+
+    def shutdown(self) -> None:
+        """Stop the worker pool and log listener."""
+        self._pool.shutdown(wait=True, cancel_futures=True)
+        self._log_queue.put_nowait(None)
+        self._listener.join()
+
+
 @hookimpl
 def get_executor(progressbar_class):
     """Return the default executor."""
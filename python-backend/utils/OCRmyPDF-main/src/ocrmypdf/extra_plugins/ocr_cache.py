@@ -0,0 +1,326 @@
+# SPDX-FileCopyrightText: 2025 James R. Barlow
+# SPDX-License-Identifier: MPL-2.0
+"""Persistent per-page OCR result cache.
+
+Re-running OCRmyPDF on a document whose pages have not changed (``--redo-ocr``,
+a different ``--output-type``, or a resubmission after a crash) normally OCRs
+every page again. This plugin wraps the Tesseract OCR engine and keeps its
+results in an on-disk store, so a page is only OCRed once.
+
+Entries are keyed by a hash of the exact image handed to the OCR engine, plus
+the engine version and every option that changes what the engine produces
+(languages, engine mode, page segmentation mode, thresholding, config files,
+user words and patterns). A page that rasterizes to the same image under the
+same settings is a hit; anything else is a miss. The hOCR, text-only PDF and
+sidecar text are stored, as are orientation and deskew results.
+
+The store is a single SQLite database in WAL mode, which is safe to share
+between the worker processes of one run and between concurrent runs. It is
+capped in size; when the cap is exceeded, the least recently used entries are
+evicted. Pages that timed out or were skipped are never cached, so they are
+OCRed again on the next run (for instance with a longer ``--tesseract-timeout``);
+the timeout itself is therefore not part of the key.
+
+Usage::
+
+    ocrmypdf --plugin ocrmypdf.extra_plugins.ocr_cache input.pdf output.pdf
+
+The cache lives in ``--ocr-cache-dir`` (default: ``$XDG_CACHE_HOME/ocrmypdf``
+or ``~/.cache/ocrmypdf``) and is limited by ``--ocr-cache-max-size``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from ocrmypdf import hookimpl
+from ocrmypdf._exec.tesseract import SKIPPED_PAGE_TEXT
+from ocrmypdf.builtin_plugins.tesseract_ocr import TesseractOcrEngine
+from ocrmypdf.cli import numeric
+from ocrmypdf.pluginspec import OrientationConfidence
+
+log = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+HASH_CHUNK = 1024 * 1024
+
+
+def default_cache_dir() -> Path:
+    """Return the default cache folder, honoring ``XDG_CACHE_HOME``."""
+    base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'ocrmypdf'
+
+
+@hookimpl
+def add_options(parser):
+    cache = parser.add_argument_group(
+        "OCR cache", "Reuse OCR results for pages that have not changed"
+    )
+    cache.add_argument(
+        '--ocr-cache-dir',
+        metavar='DIR',
+        default=None,
+        help="Folder for the persistent OCR cache (default: ~/.cache/ocrmypdf).",
+    )
+    cache.add_argument(
+        '--ocr-cache-max-size',
+        metavar='MiB',
+        type=numeric(int, 1),
+        default=1024,
+        help="Evict least recently used OCR results above this size in MiB.",
+    )
+
+
+@hookimpl
+def check_options(options):
+    if options.ocr_cache_dir is None:
+        options.ocr_cache_dir = str(default_cache_dir())
+    Path(options.ocr_cache_dir).mkdir(parents=True, exist_ok=True)
+
+
+class OcrCache:
+    """Size-capped LRU store of OCR outputs in SQLite.
+
+    One instance is used per process and database; connections are not shared
+    across threads.
+    """
+
+    _instances: dict[tuple[int, str], OcrCache] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, db_path: Path, max_bytes: int):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS ocr_cache (
+                    key TEXT PRIMARY KEY,
+                    output BLOB NOT NULL,
+                    text BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_ocr_cache_access "
+                "ON ocr_cache(last_access)"
+            )
+
+    @classmethod
+    def for_options(cls, options) -> OcrCache:
+        """Return this process's cache instance for the configured folder."""
+        db_path = Path(options.ocr_cache_dir) / f'ocr_cache_v{SCHEMA_VERSION}.sqlite'
+        key = (os.getpid(), str(db_path))
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(
+                    db_path, options.ocr_cache_max_size * 1024 * 1024
+                )
+            return cls._instances[key]
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            # Workers of the same run write concurrently; let them queue
+            conn = sqlite3.connect(str(self.db_path), timeout=60)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> tuple[bytes, bytes] | None:
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT output, text FROM ocr_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        with conn:
+            conn.execute(
+                "UPDATE ocr_cache SET last_access = ? WHERE key = ?",
+                (time.time(), key),
+            )
+        return bytes(row[0]), bytes(row[1])
+
+    def put(self, key: str, output: bytes, text: bytes) -> None:
+        size = len(output) + len(text)
+        if size > self.max_bytes:
+            return
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO ocr_cache (key, output, text, size, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, output, text, size, time.time()),
+            )
+            total = conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM ocr_cache"
+            ).fetchone()[0]
+            if total > self.max_bytes:
+                self._evict(conn, total - int(self.max_bytes * 0.9))
+
+    @staticmethod
+    def _evict(conn: sqlite3.Connection, excess: int) -> None:
+        """Drop least recently used entries until `excess` bytes are freed."""
+        freed = 0
+        victims = []
+        for key, size in conn.execute(
+            "SELECT key, size FROM ocr_cache ORDER BY last_access"
+        ):
+            if freed >= excess:
+                break
+            victims.append((key,))
+            freed += size
+        conn.executemany("DELETE FROM ocr_cache WHERE key = ?", victims)
+        log.debug("OCR cache evicted %d entries (%d bytes)", len(victims), freed)
+
+
+def _hash_file(hasher, path) -> None:
+    with open(path, 'rb') as f:
+        while chunk := f.read(HASH_CHUNK):
+            hasher.update(chunk)
+
+
+def _optional_file_digest(path) -> str | None:
+    """Digest of a user-supplied file, or its name if it is not a readable file.
+
+    Tesseract config arguments may be names of its built-in configs rather than
+    paths, so an unreadable file is keyed by name.
+    """
+    if not path:
+        return None
+    try:
+        hasher = hashlib.sha256()
+        _hash_file(hasher, path)
+        return hasher.hexdigest()
+    except OSError:
+        return str(path)
+
+
+def is_skipped_page(output_file, output_text) -> bool:
+    """Whether the engine gave up on a page rather than recognizing it.
+
+    On a timeout, an oversized image or an empty page, Tesseract's wrappers
+    write a placeholder output (a null hOCR or a 0-byte PDF) with the
+    sidecar text ``[skipped page]``.
+    """
+    text = Path(output_text).read_text(encoding='utf-8', errors='replace')
+    return text == SKIPPED_PAGE_TEXT or Path(output_file).stat().st_size == 0
+
+
+def cache_key(kind: str, input_file, options) -> str:
+    """Key for one OCR engine call on `input_file`.
+
+    Args:
+        kind: Which engine call the result belongs to ('hocr', 'pdf',
+            'orientation', 'deskew').
+        input_file: The image given to the OCR engine.
+        options: The OCRmyPDF options for this run.
+    """
+    settings = {
+        'kind': kind,
+        'engine': TesseractOcrEngine.version(),
+        'languages': list(options.languages),
+        'oem': options.tesseract_oem,
+    }
+    if kind in ('hocr', 'pdf'):
+        settings.update(
+            psm=options.tesseract_pagesegmode,
+            thresholding=options.tesseract_thresholding,
+            config=[_optional_file_digest(cfg) for cfg in options.tesseract_config],
+            user_words=_optional_file_digest(options.user_words),
+            user_patterns=_optional_file_digest(options.user_patterns),
+        )
+    elif kind == 'orientation':
+        del settings['languages']  # orientation detection uses osd only
+    hasher = hashlib.sha256(json.dumps(settings, sort_keys=True).encode())
+    _hash_file(hasher, input_file)
+    return hasher.hexdigest()
+
+
+class CachingOcrEngine(TesseractOcrEngine):
+    """Tesseract OCR engine that consults the OCR cache before running."""
+
+    def __str__(self):
+        return f"{super().__str__()} (cached)"
+
+    @staticmethod
+    def _cached_outputs(kind, input_file, output_file, output_text, options, run):
+        cache = OcrCache.for_options(options)
+        key = cache_key(kind, input_file, options)
+        hit = cache.get(key)
+        if hit is not None:
+            log.debug("OCR cache hit for %s", Path(input_file).name)
+            Path(output_file).write_bytes(hit[0])
+            Path(output_text).write_bytes(hit[1])
+            return
+        run()
+        if is_skipped_page(output_file, output_text):
+            return  # timeout, image too large, empty page; try again next time
+        cache.put(key, Path(output_file).read_bytes(), Path(output_text).read_bytes())
+
+    @staticmethod
+    def generate_hocr(input_file, output_hocr, output_text, options):
+        CachingOcrEngine._cached_outputs(
+            'hocr',
+            input_file,
+            output_hocr,
+            output_text,
+            options,
+            lambda: TesseractOcrEngine.generate_hocr(
+                input_file, output_hocr, output_text, options
+            ),
+        )
+
+    @staticmethod
+    def generate_pdf(input_file, output_pdf, output_text, options):
+        CachingOcrEngine._cached_outputs(
+            'pdf',
+            input_file,
+            output_pdf,
+            output_text,
+            options,
+            lambda: TesseractOcrEngine.generate_pdf(
+                input_file, output_pdf, output_text, options
+            ),
+        )
+
+    @staticmethod
+    def get_orientation(input_file, options) -> OrientationConfidence:
+        cache = OcrCache.for_options(options)
+        key = cache_key('orientation', input_file, options)
+        hit = cache.get(key)
+        if hit is not None:
+            return OrientationConfidence(*json.loads(hit[0]))
+        result = TesseractOcrEngine.get_orientation(input_file, options)
+        if result.confidence > 0:  # zero confidence may be a timeout
+            cache.put(key, json.dumps(list(result)).encode(), b'')
+        return result
+
+    @staticmethod
+    def get_deskew(input_file, options) -> float:
+        cache = OcrCache.for_options(options)
+        key = cache_key('deskew', input_file, options)
+        hit = cache.get(key)
+        if hit is not None:
+            return float(json.loads(hit[0]))
+        result = TesseractOcrEngine.get_deskew(input_file, options)
+        if result:  # 0.0 is also what a timeout returns
+            cache.put(key, json.dumps(result).encode(), b'')
+        return result
+
+
+@hookimpl
+def get_ocr_engine():
+    return CachingOcrEngine()
@@ -5,10 +5,14 @@ from __future__ import annotations
 
 import os
 import platform
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import pytest
 
 from ocrmypdf import ExitCode
+from ocrmypdf.builtin_plugins.concurrency import submit_windowed
 
 from .conftest import run_ocrmypdf_api
 
@@ -27,3 +31,50 @@ def test_simulate_oom_killer(multipage, no_outpdf):
         'tests/plugins/tesseract_simulate_oom_killer.py',
     )
     assert exitcode == ExitCode.child_process_error
+
+
+class _CountingExecutor(ThreadPoolExecutor):
+    """Tracks how many submitted futures have not completed yet."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+
+    def submit(self, fn, /, *args, **kwargs):
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        future = super().submit(fn, *args, **kwargs)
+        future.add_done_callback(self._completed)
+        return future
+
+    def _completed(self, _future):
+        with self._lock:
+            self.in_flight -= 1
+
+
+def test_submit_windowed_bounds_pending_tasks():
+    max_pending = 8
+    generated = 0
+
+    def task(n):
+        time.sleep(0.002)
+        return n
+
+    def arguments():
+        nonlocal generated
+        for n in range(200):
+            generated += 1
+            yield (n,)
+
+    results = []
+    with _CountingExecutor(max_workers=4) as executor:
+        for future in submit_windowed(executor, task, arguments(), max_pending):
+            results.append(future.result())
+            # Arguments are consumed lazily, one window ahead of the results
+            assert generated - len(results) < 2 * max_pending
+    assert sorted(results) == list(range(200))
+    # Workers are slower than submission, so the window fills but never overflows
+    assert executor.peak == max_pending
@@ -20,7 +20,7 @@ def test_no_glyphless_graft(resources, outdir):
         pdf.pages.extend(pdf_cmyk.pages)
         pdf.save(outdir / 'test.pdf')
 
-    with patch('ocrmypdf._graft.MAX_REPLACE_PAGES', 2):
+    with patch('ocrmypdf._graft.MAX_CHECKPOINT_BYTES', 1):
         ocrmypdf.ocr(
             outdir / 'test.pdf',
             outdir / 'out.pdf',
@@ -0,0 +1,126 @@
+# SPDX-FileCopyrightText: 2025 James R. Barlow
+# SPDX-License-Identifier: MPL-2.0
+
+from __future__ import annotations
+
+from argparse import Namespace
+from subprocess import TimeoutExpired
+
+import pytest
+
+from ocrmypdf._exec import tesseract
+from ocrmypdf.builtin_plugins.tesseract_ocr import TesseractOcrEngine
+from ocrmypdf.extra_plugins import ocr_cache
+from ocrmypdf.extra_plugins.ocr_cache import CachingOcrEngine, OcrCache, cache_key
+
+
+@pytest.fixture
+def cache_options(tmp_path):
+    return Namespace(
+        ocr_cache_dir=str(tmp_path / 'cache'),
+        ocr_cache_max_size=1,
+        languages=['eng'],
+        tesseract_oem=None,
+        tesseract_pagesegmode=None,
+        tesseract_thresholding=0,
+        tesseract_config=[],
+        tesseract_timeout=1.0,
+        user_words=None,
+        user_patterns=None,
+    )
+
+
+@pytest.fixture
+def fake_tesseract(monkeypatch):
+    calls = []
+
+    def generate_hocr(input_file, output_hocr, output_text, options):
+        calls.append(input_file)
+        output_hocr.write_bytes(b'<html>hocr</html>')
+        output_text.write_bytes(b'text')
+
+    monkeypatch.setattr(TesseractOcrEngine, 'version', staticmethod(lambda: '5.3.0'))
+    monkeypatch.setattr(
+        TesseractOcrEngine, 'generate_hocr', staticmethod(generate_hocr)
+    )
+    return calls
+
+
+def test_store_roundtrip(tmp_path):
+    cache = OcrCache(tmp_path / 'cache.sqlite', max_bytes=1024)
+    assert cache.get('a') is None
+    cache.put('a', b'output', b'text')
+    assert cache.get('a') == (b'output', b'text')
+
+
+def test_store_evicts_least_recently_used(tmp_path):
+    cache = OcrCache(tmp_path / 'cache.sqlite', max_bytes=100)
+    cache.put('old', b'x' * 40, b'')
+    cache.put('used', b'y' * 40, b'')
+    assert cache.get('old') is not None  # now more recent than 'used'
+    cache.put('new', b'z' * 40, b'')
+    assert cache.get('used') is None
+    assert cache.get('old') is not None
+    assert cache.get('new') is not None
+
+
+def test_key_depends_on_image_and_options(tmp_path, cache_options, fake_tesseract):
+    img1 = tmp_path / 'a.png'
+    img1.write_bytes(b'image one')
+    img2 = tmp_path / 'b.png'
+    img2.write_bytes(b'image two')
+
+    key = cache_key('hocr', img1, cache_options)
+    assert key == cache_key('hocr', img1, cache_options)
+    assert key != cache_key('hocr', img2, cache_options)
+    assert key != cache_key('pdf', img1, cache_options)
+    cache_options.languages = ['deu']
+    assert key != cache_key('hocr', img1, cache_options)
+
+
+def test_engine_reuses_results(tmp_path, cache_options, fake_tesseract):
+    image = tmp_path / 'page.png'
+    image.write_bytes(b'page image')
+    for n in range(2):
+        hocr = tmp_path / f'{n}.hocr'
+        text = tmp_path / f'{n}.txt'
+        CachingOcrEngine.generate_hocr(image, hocr, text, cache_options)
+        assert hocr.read_bytes() == b'<html>hocr</html>'
+        assert text.read_bytes() == b'text'
+    assert len(fake_tesseract) == 1
+
+
+def test_engine_skips_timed_out_page(tmp_path, cache_options, monkeypatch):
+    def timed_out(args, **kwargs):
+        raise TimeoutExpired(args, kwargs['timeout'])
+
+    monkeypatch.setattr(TesseractOcrEngine, 'version', staticmethod(lambda: '5.3.0'))
+    monkeypatch.setattr(tesseract, 'run', timed_out)
+    image = tmp_path / 'page.png'
+    image.write_bytes(b'page image')
+    hocr, text = tmp_path / 'out.hocr', tmp_path / 'out.txt'
+    CachingOcrEngine.generate_hocr(image, hocr, text, cache_options)
+
+    assert ocr_cache.is_skipped_page(hocr, text)
+    cache = OcrCache.for_options(cache_options)
+    assert cache.get(cache_key('hocr', image, cache_options)) is None
+
+    # A longer timeout on the next run OCRs the page again
+    def recognized(args, **kwargs):
+        prefix = tmp_path / 'out'
+        prefix.with_suffix('.hocr').write_bytes(b'<html>hocr</html>')
+        prefix.with_suffix('.txt').write_bytes(b'text')
+        return Namespace(stdout=b'')
+
+    monkeypatch.setattr(tesseract, 'run', recognized)
+    cache_options.tesseract_timeout = 10.0
+    CachingOcrEngine.generate_hocr(image, hocr, text, cache_options)
+    assert cache.get(cache_key('hocr', image, cache_options)) == (
+        b'<html>hocr</html>',
+        b'text',
+    )
+
+
+def test_default_cache_dir(monkeypatch, tmp_path):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+    assert ocr_cache.default_cache_dir() == tmp_path / 'ocrmypdf'
@@ -0,0 +1,251 @@
+"""
+Debounced, coalescing file-system event layer shared by the watchers.
+
+Scanners and sync clients raise several watchdog events per file while they
+write it. DebouncedEventHandler folds those into one entry per path, waits
+until that path has been quiet for `quiet_seconds`, confirms the file is
+stable (size and mtime unchanged since its last event, and it can be opened
+exclusively), then hands every path that settled together to a callback as
+one ChangeSet. Each path has its own window, so a bulk dump that keeps the
+folder busy still releases its finished files while later ones arrive.
+Files that are still being written stay pending for another window.
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+from watchdog.events import FileSystemEventHandler
+
+CREATED = "created"
+MODIFIED = "modified"
+DELETED = "deleted"
+
+
+@dataclass
+class ChangeSet:
+    """Coalesced changes for one quiet window."""
+    created: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+    events: int = 0  # raw watchdog events folded into this set
+
+    @property
+    def changed(self) -> List[str]:
+        return self.created + self.modified
+
+    def __bool__(self) -> bool:
+        return bool(self.created or self.modified or self.deleted)
+
+    def __len__(self) -> int:
+        return len(self.created) + len(self.modified) + len(self.deleted)
+
+
+def _stat_key(path: str) -> Optional[Tuple[int, float]]:
+    try:
+        st = os.stat(path)
+        return st.st_size, st.st_mtime
+    except OSError:
+        return None
+
+
+# Windows: the file is open elsewhere with a share mode that excludes us
+ERROR_SHARING_VIOLATION = 32
+
+
+def _open_for_probe(path: str):
+    """
+    Open `path` for read/write, which a writer's share mode refuses on Windows
+    even when it lets readers in. Read-only files can't be opened that way,
+    and nobody is writing them, so those fall back to a plain read.
+    """
+    try:
+        return open(path, "rb+")
+    except PermissionError as e:
+        if getattr(e, "winerror", None) == ERROR_SHARING_VIOLATION or os.access(path, os.W_OK):
+            raise
+    return open(path, "rb")
+
+
+def can_open_exclusive(path: str) -> bool:
+    """
+    True if no other process appears to hold `path` open for writing.
+    On Windows a writer's share mode makes the open fail; on POSIX we also
+    try a non-blocking exclusive flock, which catches cooperative writers.
+    """
+    try:
+        f = _open_for_probe(path)
+    except OSError:
+        return False
+    with f:
+        try:
+            import fcntl
+        except ImportError:
+            return True
+        try:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        except OSError:
+            return False
+    return True
+
+
+def _merge(previous: Optional[str], current: str) -> Optional[str]:
+    """Fold a new event kind into the pending one. None means 'forget the path'."""
+    if previous is None:
+        return current
+    if current == DELETED:
+        return None if previous == CREATED else DELETED
+    if previous == CREATED:
+        return CREATED
+    if previous == DELETED:
+        return MODIFIED  # deleted then re-created: net effect is a change
+    return current
+
+
+class DebouncedEventHandler(FileSystemEventHandler):
+    """
+    watchdog handler that emits a ChangeSet whenever pending paths settle.
+
+    `on_batch(changes)` runs on the handler's own thread, never on the
+    watchdog observer thread, so slow work doesn't drop events.
+    `ignore(path)` can filter out temp files and the like.
+    """
+
+    def __init__(self, on_batch: Callable[[ChangeSet], None], quiet_seconds: float = 2.0,
+                 check_exclusive: bool = True,
+                 ignore: Optional[Callable[[str], bool]] = None):
+        super().__init__()
+        self.on_batch = on_batch
+        self.quiet_seconds = quiet_seconds
+        self.check_exclusive = check_exclusive
+        self.ignore = ignore
+        self._pending: Dict[str, str] = {}
+        self._stats: Dict[str, Optional[Tuple[int, float]]] = {}
+        # Last event time per pending path, oldest first (re-touched paths move to the end)
+        self._touched: Dict[str, float] = {}
+        self._event_count = 0
+        self._cv = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="debounced-events", daemon=True)
+        self._thread.start()
+
+    # -- watchdog callbacks ------------------------------------------------
+
+    def on_any_event(self, event):
+        if event.is_directory:
+            return
+        if event.event_type == "moved":
+            self._record(event.src_path, DELETED)
+            self._record(event.dest_path, CREATED)
+        elif event.event_type in (CREATED, MODIFIED, DELETED):
+            self._record(event.src_path, event.event_type)
+        elif event.event_type == "closed":
+            self._record(event.src_path, MODIFIED)
+
+    def _record(self, path: str, kind: str) -> None:
+        if self.ignore and self.ignore(path):
+            return
+        stat = None if kind == DELETED else _stat_key(path)
+        with self._cv:
+            merged = _merge(self._pending.get(path), kind)
+            self._touched.pop(path, None)
+            if merged is None:
+                self._pending.pop(path, None)
+                self._stats.pop(path, None)
+            else:
+                self._pending[path] = merged
+                self._stats[path] = stat
+                self._touched[path] = time.monotonic()
+            self._event_count += 1
+            self._cv.notify()
+
+    # -- flushing ----------------------------------------------------------
+
+    def _is_stable(self, path: str, seen: Optional[Tuple[int, float]]) -> bool:
+        now = _stat_key(path)
+        if now is None or now != seen:
+            return False
+        return not self.check_exclusive or can_open_exclusive(path)
+
+    def _take(self, force: bool) -> Tuple[Dict[str, str], Dict[str, Optional[Tuple[int, float]]]]:
+        """Remove and return the paths whose quiet window has passed (all with `force`)."""
+        if force:
+            settled = list(self._touched)
+        else:
+            cutoff = time.monotonic() - self.quiet_seconds
+            settled = []
+            for path, touched in self._touched.items():
+                if touched > cutoff:
+                    break
+                settled.append(path)
+        pending, stats = {}, {}
+        for path in settled:
+            del self._touched[path]
+            pending[path] = self._pending.pop(path)
+            stats[path] = self._stats.pop(path)
+        return pending, stats
+
+    def flush(self, force: bool = False) -> ChangeSet:
+        """
+        Emit every pending path that has been quiet for `quiet_seconds` and
+        is ready. With `force`, the quiet window and stability checks are
+        skipped and everything pending is emitted.
+        """
+        with self._cv:
+            pending, stats = self._take(force)
+            events = self._event_count
+            self._event_count = 0
+
+        changes = ChangeSet(events=events)
+        retry = {}
+        for path, kind in pending.items():
+            if kind == DELETED:
+                changes.deleted.append(path)
+            elif force or self._is_stable(path, stats.get(path)):
+                (changes.created if kind == CREATED else changes.modified).append(path)
+            elif os.path.exists(path):
+                retry[path] = kind
+            # else: vanished without a delete event; nothing to report
+
+        if retry:
+            with self._cv:
+                for path, kind in retry.items():
+                    # Newer events for the same path win over the retry
+                    if path not in self._pending:
+                        self._pending[path] = kind
+                        self._stats[path] = _stat_key(path)
+                        self._touched[path] = time.monotonic()
+
+        if changes:
+            try:
+                self.on_batch(changes)
+            except Exception as e:
+                print(f"⚠️ Change handler failed: {e}")
+        return changes
+
+    def _run(self) -> None:
+        while True:
+            with self._cv:
+                while not self._pending and not self._stopped:
+                    self._cv.wait()
+                if self._stopped:
+                    return
+                # The oldest pending path is the next one due to settle
+                oldest = next(iter(self._touched.values()))
+                wait = oldest + self.quiet_seconds - time.monotonic()
+                if wait > 0:
+                    self._cv.wait(wait)
+                    continue
+            self.flush()
+
+    def stop(self, flush: bool = True) -> None:
+        """Stop the flush thread, optionally emitting whatever is still pending."""
+        with self._cv:
+            self._stopped = True
+            self._cv.notify()
+        self._thread.join()
+        if flush:
+            self.flush(force=True)
@@ -0,0 +1,368 @@
+"""
+Persistent file-metadata index shared by the scanning tools.
+
+The index keeps one row per file (path, size, mtime, inode and an optional
+content hash) and one row per directory (its mtime when it was last listed)
+in SQLite. refresh() walks the tree but only lists directories whose mtime
+changed since the previous scan -- adding, removing or renaming an entry
+bumps the directory's mtime, so an unchanged directory costs one stat()
+instead of a listing plus a stat() per file. Queries (total size, counts
+by extension, listings, largest files) then come straight from SQLite.
+
+Editing a file in place does not touch its directory's mtime, so sizes of
+files modified in place are only picked up by refresh(full=True) or when
+something else in the same directory changes. Content hashes and image
+perceptual hashes are cached against (size, mtime) and recomputed whenever
+either differs.
+"""
+
+import os
+import sqlite3
+import stat as stat_module
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+_NEXT_SEP = chr(ord(os.sep) + 1)
+
+
+@dataclass
+class RefreshStats:
+    root: str
+    dirs_listed: int = 0
+    dirs_skipped: int = 0
+    files_statted: int = 0
+    files_changed: int = 0
+    files_removed: int = 0
+    errors: int = 0
+    seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, object]:
+        return {**self.__dict__, "seconds": round(self.seconds, 4)}
+
+
+def _norm(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _under(column: str) -> str:
+    """SQL matching `column` equal to ? or strictly below it (range scan)."""
+    return f"({column} = ? OR ({column} >= ? AND {column} < ?))"
+
+
+def _under_args(path: str) -> Tuple[str, str, str]:
+    prefix = path.rstrip(os.sep) + os.sep
+    return path, prefix, prefix[:-1] + _NEXT_SEP
+
+
+class FileIndex:
+    def __init__(self, db_path: str = "./data/file_index.db"):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._init_database()
+
+    def _init_database(self):
+        with self._lock, self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS dirs (
+                    path TEXT PRIMARY KEY,
+                    parent TEXT,
+                    name TEXT NOT NULL,
+                    mtime_ns INTEGER,
+                    error TEXT,
+                    scanned_at REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_dirs_parent ON dirs(parent);
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    dir TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    ext TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    inode INTEGER,
+                    hash TEXT,
+                    hash_algo TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_files_dir ON files(dir);
+                CREATE TABLE IF NOT EXISTS image_hashes (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    ahash INTEGER NOT NULL,
+                    dhash INTEGER NOT NULL,
+                    phash INTEGER NOT NULL
+                );
+            """)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------------
+
+    def refresh(self, root: str, full: bool = False, max_depth: Optional[int] = None,
+                prune: Optional[Callable[[str], bool]] = None) -> RefreshStats:
+        """
+        Bring the index for `root` up to date. Directories whose mtime is
+        unchanged are not listed again; full=True lists and re-stats all.
+
+        max_depth limits how many directory levels are listed (1 = `root`
+        only), and subdirectories for which prune(path) is true are not
+        descended into. Directories left out this way keep whatever the
+        index already has for them.
+        """
+        root = _norm(root)
+        stats = RefreshStats(root)
+        start = time.perf_counter()
+        with self._lock, self._conn:
+            known = {
+                path: (mtime_ns, error)
+                for path, mtime_ns, error in self._conn.execute(
+                    f"SELECT path, mtime_ns, error FROM dirs WHERE {_under('path')}",
+                    _under_args(root))
+            }
+            seen = set()
+            parent = os.path.dirname(root)
+            stack = [(root, parent if parent != root else None, os.path.basename(root) or root, 0)]
+            while stack:
+                path, parent, name, depth = stack.pop()
+                seen.add(path)
+                if path != root and ((max_depth is not None and depth >= max_depth)
+                                     or (prune is not None and prune(path))):
+                    # Still listed by its parent, but its subtree is left alone
+                    if path not in known:
+                        self._record_dir(path, parent, name, None, None)
+                    seen.update(p for (p,) in self._conn.execute(
+                        f"SELECT path FROM dirs WHERE {_under('path')}", _under_args(path)))
+                    continue
+                try:
+                    mtime_ns = os.stat(path).st_mtime_ns
+                except OSError as e:
+                    self._record_dir(path, parent, name, None, type(e).__name__)
+                    stats.errors += 1
+                    continue
+                previous = known.get(path)
+                if not full and previous is not None and previous == (mtime_ns, None):
+                    stats.dirs_skipped += 1
+                    stack.extend((child, path, child_name, depth + 1)
+                                 for child, child_name in self._conn.execute(
+                                     "SELECT path, name FROM dirs WHERE parent = ?", (path,)))
+                    continue
+                stats.dirs_listed += 1
+                error = self._list_dir(path, depth, stats, stack)
+                self._record_dir(path, parent, name, mtime_ns, error)
+            # Directories that disappeared take their files with them
+            for path in set(known) - seen:
+                self._conn.execute("DELETE FROM dirs WHERE path = ?", (path,))
+                stats.files_removed += self._conn.execute(
+                    "DELETE FROM files WHERE dir = ?", (path,)).rowcount
+        stats.seconds = time.perf_counter() - start
+        return stats
+
+    def _record_dir(self, path: str, parent: Optional[str], name: str,
+                    mtime_ns: Optional[int], error: Optional[str]) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO dirs (path, parent, name, mtime_ns, error, scanned_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (path, parent, name, mtime_ns, error, time.time()))
+
+    def _list_dir(self, path: str, depth: int, stats: RefreshStats,
+                  stack: List[Tuple[str, str, str, int]]) -> Optional[str]:
+        """Re-list one directory: upsert changed files, drop vanished ones."""
+        try:
+            entries = list(os.scandir(path))
+        except OSError as e:
+            stats.errors += 1
+            return type(e).__name__
+        existing = {
+            name: (size, mtime_ns, inode)
+            for name, size, mtime_ns, inode in self._conn.execute(
+                "SELECT name, size, mtime_ns, inode FROM files WHERE dir = ?", (path,))
+        }
+        present = set()
+        changed = []
+        for entry in entries:
+            try:
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                stats.errors += 1
+                continue
+            if stat_module.S_ISDIR(st.st_mode):
+                stack.append((_norm(entry.path), path, entry.name, depth + 1))
+                continue
+            if not stat_module.S_ISREG(st.st_mode):
+                continue
+            stats.files_statted += 1
+            present.add(entry.name)
+            row = (st.st_size, st.st_mtime_ns, st.st_ino)
+            if existing.get(entry.name) != row:
+                changed.append((os.path.normcase(os.path.join(path, entry.name)), path, entry.name,
+                                os.path.splitext(entry.name)[1].lower(), *row))
+        if changed:
+            # Hashes survive only if the content signature is unchanged
+            self._conn.executemany(
+                "INSERT INTO files (path, dir, name, ext, size, mtime_ns, inode) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(path) DO UPDATE SET size = excluded.size, "
+                "mtime_ns = excluded.mtime_ns, inode = excluded.inode, "
+                "hash = NULL, hash_algo = NULL",
+                changed)
+            stats.files_changed += len(changed)
+        gone = [(os.path.normcase(os.path.join(path, name)),)
+                for name in existing.keys() - present]
+        if gone:
+            self._conn.executemany("DELETE FROM files WHERE path = ?", gone)
+            stats.files_removed += len(gone)
+        return None
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def total_size(self, root: str) -> int:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT COALESCE(SUM(size), 0) FROM files WHERE {_under('dir')}",
+                _under_args(_norm(root))).fetchone()
+        return row[0]
+
+    def count_files(self, root: str, extensions: Optional[Sequence[str]] = None) -> int:
+        """Number of files under `root`; `extensions` like {".pdf", ".jpg"}."""
+        sql = f"SELECT COUNT(*) FROM files WHERE {_under('dir')}"
+        args = list(_under_args(_norm(root)))
+        if extensions is not None:
+            exts = [e.lower() for e in extensions]
+            if not exts:
+                return 0
+            sql += f" AND ext IN ({','.join('?' * len(exts))})"
+            args += exts
+        with self._lock:
+            return self._conn.execute(sql, args).fetchone()[0]
+
+    def iter_files(self, root: str) -> Iterator[Tuple[str, int, int]]:
+        """
+        (path, size, mtime_ns) for every indexed file under `root`. Paths
+        keep the case found on disk (the `path` keys are normcased), joined
+        onto `root` as given.
+        """
+        root_key = _norm(root)
+        with self._lock:
+            dirs = self._conn.execute(
+                f"SELECT path, parent, name FROM dirs WHERE {_under('path')}",
+                _under_args(root_key)).fetchall()
+            rows = self._conn.execute(
+                f"SELECT dir, name, size, mtime_ns FROM files WHERE {_under('dir')} ORDER BY path",
+                _under_args(root_key)).fetchall()
+        # Parents sort before their children, so each parent is resolved first
+        shown = {root_key: os.path.abspath(root)}
+        for path, parent, name in sorted(dirs, key=lambda row: len(row[0])):
+            if path != root_key and parent in shown:
+                shown[path] = os.path.join(shown[parent], name)
+        for directory, name, size, mtime_ns in rows:
+            yield os.path.join(shown.get(directory, directory), name), size, mtime_ns
+
+    def largest_files(self, root: str, limit: int = 10) -> List[Tuple[str, int]]:
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT path, size FROM files WHERE {_under('dir')} "
+                "ORDER BY size DESC LIMIT ?",
+                (*_under_args(_norm(root)), limit)).fetchall()
+
+    def listdir(self, path: str) -> Tuple[List[str], List[str], Optional[str]]:
+        """(subdirectory names, file names, listing error) for one directory."""
+        path = _norm(path)
+        with self._lock:
+            row = self._conn.execute("SELECT error FROM dirs WHERE path = ?", (path,)).fetchone()
+            dirs = [name for (name,) in self._conn.execute(
+                "SELECT name FROM dirs WHERE parent = ?", (path,))]
+            files = [name for (name,) in self._conn.execute(
+                "SELECT name FROM files WHERE dir = ?", (path,))]
+        return dirs, files, (row[0] if row else "FileNotFoundError")
+
+    def get_hash(self, path: str, hasher: Callable[[str], Optional[str]],
+                 algo: str = "md5") -> Optional[str]:
+        """Cached content hash; recomputed when size or mtime changed."""
+        path = _norm(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, hash, hash_algo FROM files WHERE path = ?",
+                (path,)).fetchone()
+        if row and row[:2] == (st.st_size, st.st_mtime_ns) and row[2] and row[3] == algo:
+            return row[2]
+        digest = hasher(path)
+        if digest is not None:
+            with self._lock, self._conn:
+                directory, name = os.path.split(path)
+                self._conn.execute(
+                    "INSERT INTO files (path, dir, name, ext, size, mtime_ns, inode, hash, hash_algo) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(path) DO UPDATE SET size = excluded.size, "
+                    "mtime_ns = excluded.mtime_ns, inode = excluded.inode, "
+                    "hash = excluded.hash, hash_algo = excluded.hash_algo",
+                    (path, directory, name, os.path.splitext(name)[1].lower(),
+                     st.st_size, st.st_mtime_ns, st.st_ino, digest, algo))
+        return digest
+
+    def get_image_hashes(self, signatures: Dict[str, Tuple[int, int]]
+                         ) -> Dict[str, Tuple[int, int, int]]:
+        """
+        Cached (aHash, dHash, pHash) for each path whose (size, mtime_ns)
+        still matches `signatures`; stale or unknown paths are left out.
+        """
+        keys = {os.path.normcase(path): path for path in signatures}
+        found = {}
+        with self._lock:
+            chunks = list(keys)
+            for i in range(0, len(chunks), 500):
+                chunk = chunks[i:i + 500]
+                for key, size, mtime_ns, a, d, p in self._conn.execute(
+                        "SELECT path, size, mtime_ns, ahash, dhash, phash FROM image_hashes "
+                        f"WHERE path IN ({','.join('?' * len(chunk))})", chunk):
+                    path = keys[key]
+                    if (size, mtime_ns) == tuple(signatures[path]):
+                        found[path] = (_unsigned(a), _unsigned(d), _unsigned(p))
+        return found
+
+    def put_image_hashes(self, rows: Sequence[Tuple[str, int, int, int, int, int]]) -> None:
+        """Store (path, size, mtime_ns, ahash, dhash, phash) rows."""
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO image_hashes (path, size, mtime_ns, ahash, dhash, phash) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(os.path.normcase(path), size, mtime_ns, _signed(a), _signed(d), _signed(p))
+                 for path, size, mtime_ns, a, d, p in rows])
+
+
+def _signed(value: int) -> int:
+    """64-bit hashes go into SQLite's signed INTEGER column."""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def _unsigned(value: int) -> int:
+    return value + (1 << 64) if value < 0 else value
+
+
+_shared: Optional[FileIndex] = None
+_shared_lock = threading.Lock()
+
+
+def get_file_index() -> FileIndex:
+    """Process-wide FileIndex (FILE_INDEX_DB, default ./data/file_index.db)"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = FileIndex(os.getenv("FILE_INDEX_DB", "./data/file_index.db"))
+        return _shared
@@ -6,6 +6,8 @@ from typing import Optional, Dict, Any
 from datetime import datetime
 import mimetypes
 
+from utils.file_index import get_file_index
+
 class FileUtils:
     """Utility functions for file operations"""
     
@@ -15,7 +17,7 @@ class FileUtils:
         try:
             hash_md5 = hashlib.md5()
             with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
                     hash_md5.update(chunk)
             return hash_md5.hexdigest()
         except Exception:
@@ -139,17 +141,11 @@ class FileUtils:
     
     @staticmethod
     def get_directory_size(directory_path: str) -> int:
-        """Get total size of directory in bytes"""
+        """Get total size of directory in bytes (from the incremental file index)"""
         try:
-            total_size = 0
-            for dirpath, dirnames, filenames in os.walk(directory_path):
-                for filename in filenames:
-                    filepath = os.path.join(dirpath, filename)
-                    try:
-                        total_size += os.path.getsize(filepath)
-                    except (OSError, IOError):
-                        continue
-            return total_size
+            index = get_file_index()
+            index.refresh(directory_path)
+            return index.total_size(directory_path)
         except Exception:
             return 0
     
@@ -157,16 +153,9 @@ class FileUtils:
     def count_files_in_directory(directory_path: str, extensions: set = None) -> int:
         """Count files in directory, optionally filtered by extensions"""
         try:
-            count = 0
-            for root, dirs, files in os.walk(directory_path):
-                for file in files:
-                    if extensions is None:
-                        count += 1
-                    else:
-                        file_ext = Path(file).suffix.lower()
-                        if file_ext in extensions:
-                            count += 1
-            return count
+            index = get_file_index()
+            index.refresh(directory_path)
+            return index.count_files(directory_path, extensions)
         except Exception:
             return 0
     
@@ -0,0 +1,137 @@
+"""
+Load test: is the API still responsive while heavy jobs run?
+
+Starts the FastAPI app with uvicorn on a free port, fills a throwaway vector
+store so /memory/query does real work, then fires a mix of concurrent
+memory queries and async (wait=false) job submissions while timing /health
+from separate clients. Prints /health latency percentiles and job
+throughput; --max-health-p95 turns it into a pass/fail check.
+
+    python utils/job_load_test.py --vectors 200000 --clients 16 --seconds 10
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _request(url: str, method: str = "GET") -> dict:
+    req = urllib.request.Request(url, method=method, data=b"" if method == "POST" else None)
+    with urllib.request.urlopen(req, timeout=60) as resp:
+        return json.loads(resp.read())
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+def _seed_vectors(path: str, count: int, dim: int) -> None:
+    import numpy as np
+    from memory.vector_store import VectorStorage
+
+    store = VectorStorage(path, dim=dim)
+    rng = np.random.default_rng(0)
+    for start in range(0, count, 50_000):
+        n = min(50_000, count - start)
+        store.add_vectors([f"v{start + i}" for i in range(n)],
+                          rng.standard_normal((n, dim), dtype=np.float32))
+    store.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--vectors", type=int, default=200_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--clients", type=int, default=16, help="concurrent heavy-request clients")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--max-health-p95", type=float, default=None,
+                        help="fail if /health p95 latency (ms) exceeds this")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="qilife-loadtest-")
+    os.environ["MEMORY_VECTOR_PATH"] = os.path.join(workdir, "vectors.db")
+    os.environ.setdefault("LOG_DB_PATH", os.path.join(workdir, "activity.db"))
+    os.environ.setdefault("MEMORY_EMBED_DIM", str(args.dim))
+    print(f"📦 Seeding {args.vectors} vectors (dim {args.dim}) in {workdir}")
+    _seed_vectors(os.environ["MEMORY_VECTOR_PATH"], args.vectors, args.dim)
+
+    import uvicorn
+    from main import app
+
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    server_thread = threading.Thread(target=server.run, daemon=True)
+    server_thread.start()
+    base = f"http://127.0.0.1:{port}"
+    while not server.started:
+        time.sleep(0.05)
+
+    stop = time.monotonic() + args.seconds
+    health_ms, query_ms, submit_ms = [], [], []
+
+    def heavy_client(i: int) -> None:
+        while time.monotonic() < stop:
+            start = time.perf_counter()
+            if i % 4 == 0:
+                # Fire-and-forget job; the handler must return immediately
+                _request(f"{base}/memory/query?query=load+{i}&wait=false", "POST")
+                submit_ms.append((time.perf_counter() - start) * 1000)
+                time.sleep(0.05)
+            else:
+                _request(f"{base}/memory/query?query=load+{i}", "POST")
+                query_ms.append((time.perf_counter() - start) * 1000)
+
+    def health_client() -> None:
+        while time.monotonic() < stop:
+            start = time.perf_counter()
+            _request(f"{base}/health")
+            health_ms.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.02)
+
+    with ThreadPoolExecutor(max_workers=args.clients + 2) as pool:
+        futures = [pool.submit(heavy_client, i) for i in range(args.clients)]
+        futures += [pool.submit(health_client) for _ in range(2)]
+        for f in futures:
+            f.result()
+
+    jobs = _request(f"{base}/jobs?type=memory_query")["jobs"]
+    done = sum(1 for j in jobs if j["status"] == "succeeded")
+    server.should_exit = True
+    server_thread.join()
+
+    health_p95 = _percentile(health_ms, 0.95)
+    print(f"🩺 /health: {len(health_ms)} requests, p50 {statistics.median(health_ms):.1f} ms, "
+          f"p95 {health_p95:.1f} ms, max {max(health_ms):.1f} ms")
+    print(f"🧠 /memory/query: {len(query_ms)} requests, p50 {statistics.median(query_ms):.1f} ms, "
+          f"p95 {_percentile(query_ms, 0.95):.1f} ms (wait=true)")
+    print(f"🚀 async submissions: {len(submit_ms)}, p50 {statistics.median(submit_ms):.1f} ms, "
+          f"p95 {_percentile(submit_ms, 0.95):.1f} ms")
+    print(f"📊 memory_query jobs succeeded: {done}/{len(jobs)} ({done / args.seconds:.1f}/s)")
+
+    if args.max_health_p95 is not None and health_p95 > args.max_health_p95:
+        print(f"❌ /health p95 {health_p95:.1f} ms exceeds {args.max_health_p95} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,394 @@
+"""
+Background job subsystem for the FastAPI backend.
+
+Handlers submit long-running work to a JobManager and return a job id
+immediately; the event loop never runs the work itself. Each job type has
+its own concurrency cap, jobs beyond the cap wait in a per-type FIFO, and
+clients poll status, stream progress, or cancel.
+
+Job functions are plain callables. If they accept a `job` keyword they get
+a JobContext for progress reports and cooperative cancellation:
+
+    def scan(roots, job=None):
+        for i, root in enumerate(roots):
+            job.check_cancelled()
+            job.report(i / len(roots), f"Scanning {root}")
+"""
+
+import asyncio
+import inspect
+import itertools
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, Union
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+DEFAULT_LIMITS = {
+    "duplicate_cleaner": 1,
+    "fileflow": 2,
+    "transcribe": 1,
+    "memory_query": 4,
+}
+
+
+class JobCancelled(Exception):
+    """Raised inside a job by JobContext.check_cancelled()."""
+
+
+@dataclass
+class Job:
+    id: str
+    type: str
+    status: str = QUEUED
+    progress: float = 0.0
+    message: str = ""
+    result: Any = None
+    error: Optional[str] = None
+    created: float = field(default_factory=time.time)
+    started: Optional[float] = None
+    finished: Optional[float] = None
+    version: int = 0  # bumped on every change, for pollers and SSE streams
+    cancel_requested: bool = False
+
+    def to_dict(self, include_result: bool = True) -> Dict[str, Any]:
+        data = {
+            "id": self.id,
+            "type": self.type,
+            "status": self.status,
+            "progress": round(self.progress, 4),
+            "message": self.message,
+            "error": self.error,
+            "created": self.created,
+            "started": self.started,
+            "finished": self.finished,
+            "cancel_requested": self.cancel_requested,
+        }
+        if include_result:
+            data["result"] = self.result
+        return data
+
+
+class JobContext:
+    """Handed to job functions that take a `job` keyword."""
+
+    def __init__(self, manager: "JobManager", job: Job):
+        self._manager = manager
+        self._job = job
+
+    @property
+    def id(self) -> str:
+        return self._job.id
+
+    @property
+    def cancelled(self) -> bool:
+        return self._job.cancel_requested
+
+    def check_cancelled(self) -> None:
+        if self._job.cancel_requested:
+            raise JobCancelled(self._job.id)
+
+    def report(self, progress: Optional[float] = None, message: Optional[str] = None) -> None:
+        self._manager._update(self._job, progress=progress, message=message)
+
+
+@dataclass
+class _Pending:
+    job: Job
+    fn: Callable
+    args: tuple
+    kwargs: dict
+
+
+class JobManager:
+    """
+    Runs jobs on a shared thread pool (or a process pool for types listed in
+    `process_types`) with per-type concurrency caps.
+
+    Process-pool jobs can't report progress or be interrupted once started;
+    they can still be cancelled while queued.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, int]] = None, default_limit: int = 2,
+                 max_workers: Optional[int] = None, process_types: Optional[List[str]] = None,
+                 process_workers: Optional[int] = None, max_history: int = 500):
+        self.limits = dict(DEFAULT_LIMITS if limits is None else limits)
+        self.default_limit = default_limit
+        self.process_types = set(process_types or ())
+        max_workers = max_workers or max(sum(self.limits.values()) + default_limit, 4)
+        self._threads = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._process_workers = process_workers or os.cpu_count() or 2
+        self._processes: Optional[ProcessPoolExecutor] = None
+        self.max_history = max_history
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._pending: Dict[str, Deque[_Pending]] = {}
+        self._running: Dict[str, int] = {}
+        self._futures: Dict[str, Future] = {}
+        self._async_waiters: Dict[str, List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]]] = {}
+        self._closed = False
+        # Reentrant: future callbacks can fire synchronously while we hold it
+        self._lock = threading.RLock()
+        self._changed = threading.Condition(self._lock)
+        self._ids = itertools.count(1)
+
+    # -- submission --------------------------------------------------------
+
+    def limit_for(self, job_type: str) -> int:
+        return self.limits.get(job_type, self.default_limit)
+
+    def submit(self, job_type: str, fn: Callable, *args, **kwargs) -> Job:
+        """Queue `fn(*args, **kwargs)` as a `job_type` job and return it at once."""
+        job = Job(id=f"{job_type}-{next(self._ids)}-{uuid.uuid4().hex[:8]}", type=job_type)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("JobManager is shut down")
+            self._jobs[job.id] = job
+            self._pending.setdefault(job_type, deque()).append(_Pending(job, fn, args, kwargs))
+            self._trim_history()
+            self._dispatch(job_type)
+        return job
+
+    def _dispatch(self, job_type: str) -> None:
+        # Caller holds self._lock
+        queue = self._pending.get(job_type)
+        while queue and self._running.get(job_type, 0) < self.limit_for(job_type):
+            item = queue.popleft()
+            if item.job.status != QUEUED:
+                continue  # cancelled while waiting
+            try:
+                if self._closed:
+                    raise RuntimeError("JobManager is shut down")
+                if job_type in self.process_types:
+                    future = self._process_pool().submit(item.fn, *item.args, **item.kwargs)
+                else:
+                    future = self._threads.submit(self._run_in_thread, item)
+            except RuntimeError:
+                # Pool gone (shutdown or interpreter exit): the job will never run
+                item.job.status = CANCELLED
+                item.job.finished = time.time()
+                self._touch(item.job)
+                continue
+            self._running[job_type] = self._running.get(job_type, 0) + 1
+            item.job.status = RUNNING
+            item.job.started = time.time()
+            self._touch(item.job)
+            self._futures[item.job.id] = future
+            future.add_done_callback(lambda f, job=item.job: self._finish(job, f))
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        if self._processes is None:
+            self._processes = ProcessPoolExecutor(max_workers=self._process_workers)
+        return self._processes
+
+    def _run_in_thread(self, item: _Pending) -> Any:
+        kwargs = dict(item.kwargs)
+        if _accepts_job(item.fn):
+            kwargs["job"] = JobContext(self, item.job)
+        return item.fn(*item.args, **kwargs)
+
+    def _finish(self, job: Job, future: Future) -> None:
+        with self._lock:
+            error = future.exception() if not future.cancelled() else None
+            if future.cancelled() or isinstance(error, JobCancelled):
+                job.status = CANCELLED
+            elif error is not None:
+                job.status = FAILED
+                job.error = f"{type(error).__name__}: {error}"
+            else:
+                job.status = SUCCEEDED
+                job.result = future.result()
+                job.progress = 1.0
+            job.finished = time.time()
+            self._touch(job)
+            self._futures.pop(job.id, None)
+            self._running[job.type] -= 1
+            self._dispatch(job.type)
+
+    def _update(self, job: Job, progress: Optional[float] = None,
+                message: Optional[str] = None) -> None:
+        with self._lock:
+            if progress is not None:
+                job.progress = min(max(float(progress), 0.0), 1.0)
+            if message is not None:
+                job.message = message
+            self._touch(job)
+    
+    def _touch(self, job: Job) -> None:
+        # Caller holds self._lock: record a change and wake every waiter
+        job.version += 1
+        self._changed.notify_all()
+        for loop, waiter in self._async_waiters.pop(job.id, ()):
+            loop.call_soon_threadsafe(_resolve, waiter)
+
+    def _trim_history(self) -> None:
+        # Caller holds self._lock; forget the oldest finished jobs
+        excess = len(self._jobs) - self.max_history
+        if excess <= 0:
+            return
+        for job_id in [j.id for j in self._jobs.values() if j.status in FINISHED_STATES][:excess]:
+            del self._jobs[job_id]
+
+    # -- queries and control -----------------------------------------------
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self, job_type: Optional[str] = None, status: Optional[str] = None) -> List[Job]:
+        with self._lock:
+            return [j for j in self._jobs.values()
+                    if (job_type is None or j.type == job_type)
+                    and (status is None or j.status == status)]
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Cancel a job. Queued jobs are dropped at once; running thread jobs are
+        asked to stop and finish as cancelled at their next check_cancelled().
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in FINISHED_STATES:
+                return job
+            job.cancel_requested = True
+            if job.status == QUEUED:
+                job.status = CANCELLED
+                job.finished = time.time()
+            else:
+                future = self._futures.get(job_id)
+                if future is not None:
+                    future.cancel()  # only succeeds if the pool hasn't started it
+            self._touch(job)
+            return job
+
+    def _resolve_job(self, job: Union[Job, str]) -> Optional[Job]:
+        # Waiters hold the Job itself so history trimming can't lose it
+        return self.get(job) if isinstance(job, str) else job
+
+    def wait(self, job: Union[Job, str], version: int = -1,
+             timeout: Optional[float] = None) -> Optional[Job]:
+        """Block until the job changes past `version` (or finishes), or `timeout`."""
+        job = self._resolve_job(job)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._changed:
+            while job is not None and job.version <= version and job.status not in FINISHED_STATES:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+        return job
+
+    async def wait_async(self, job: Union[Job, str], version: int = -1,
+                         timeout: Optional[float] = None) -> Optional[Job]:
+        """wait() for async code: parks on a loop future, not on a thread."""
+        job = self._resolve_job(job)
+        if job is None:
+            return None
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if job.version > version or job.status in FINISHED_STATES:
+                return job
+            waiter = loop.create_future()
+            self._async_waiters.setdefault(job.id, []).append((loop, waiter))
+        try:
+            await asyncio.wait_for(waiter, timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                waiters = self._async_waiters.get(job.id, [])
+                if (loop, waiter) in waiters:
+                    waiters.remove((loop, waiter))
+                if not waiters:
+                    self._async_waiters.pop(job.id, None)
+        return job
+
+    async def result(self, job: Union[Job, str], timeout: Optional[float] = None) -> Optional[Job]:
+        """Await a job's completion from async code."""
+        job = self._resolve_job(job)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while job is not None and job.status not in FINISHED_STATES:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                break
+            await self.wait_async(job, job.version, remaining)
+        return job
+
+    async def events(self, job: Union[Job, str], heartbeat: float = 15.0):
+        """Async generator of job snapshots, one per change, ending when the job finishes."""
+        job = self._resolve_job(job)
+        version = -1
+        while job is not None:
+            await self.wait_async(job, version, heartbeat)
+            if job.version == version:
+                yield None  # heartbeat
+                continue
+            version = job.version
+            yield job.to_dict(include_result=job.status in FINISHED_STATES)
+            if job.status in FINISHED_STATES:
+                return
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                job_type: {
+                    "limit": self.limit_for(job_type),
+                    "running": self._running.get(job_type, 0),
+                    "queued": sum(1 for p in self._pending.get(job_type, ()) if p.job.status == QUEUED),
+                }
+                for job_type in set(self.limits) | set(self._pending)
+            }
+
+    def shutdown(self, wait: bool = False) -> None:
+        with self._lock:
+            self._closed = True
+            for job in self._jobs.values():
+                if job.status not in FINISHED_STATES:
+                    job.cancel_requested = True
+        self._threads.shutdown(wait=wait, cancel_futures=True)
+        if self._processes is not None:
+            self._processes.shutdown(wait=wait, cancel_futures=True)
+
+
+def _resolve(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+def _accepts_job(fn: Callable) -> bool:
+    try:
+        params = inspect.signature(fn).parameters
+    except (TypeError, ValueError):
+        return False
+    return "job" in params
+
+
+def _parse_limits(spec: str) -> Dict[str, int]:
+    """'duplicate_cleaner=1,fileflow=2' -> {'duplicate_cleaner': 1, 'fileflow': 2}"""
+    limits = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, value = part.partition("=")
+        limits[name.strip()] = int(value)
+    return limits
+
+
+_manager: Optional[JobManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """Process-wide JobManager. JOB_LIMITS overrides per-type caps."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            limits = dict(DEFAULT_LIMITS)
+            limits.update(_parse_limits(os.getenv("JOB_LIMITS", "")))
+            _manager = JobManager(limits)
+        return _manager
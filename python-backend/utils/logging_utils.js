@@ -1,69 +1,274 @@
+import atexit
+import csv
+import io
 import json
+import os
 import sqlite3
+import time
+from collections import deque
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import IO, Dict, Any, Iterator, Optional, Union
 import threading
 import logging
 
+from utils.metrics import get_metrics
+
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "block")
+SLOW_LEVELS = ("slow", "very_slow")
+# Rollup bucket -> length of the ISO timestamp prefix that identifies it
+ROLLUP_GRANULARITIES = {"hour": 13, "day": 10}
+EXPORT_FIELDS = ['timestamp', 'activity_type', 'description', 'metadata']
+
+
 class LoggingUtils:
-    """Centralized logging utility for the Second Brain system"""
+    """Centralized logging utility for the Second Brain system
+
+    log_activity() only timestamps the event and appends it to an in-memory
+    queue. A background writer thread owns one WAL-mode connection and
+    commits queued rows with executemany, either when `batch_size` rows are
+    waiting or `flush_interval` seconds after the oldest one arrived. If the
+    queue reaches `max_queue` the `overflow` policy applies: drop_oldest
+    (default), drop_newest, or block until the writer catches up.
+    """
     
-    def __init__(self, db_path: str = "./data/second_brain.db"):
+    def __init__(self, db_path: str = "./data/second_brain.db",
+                 batch_size: int = 500, flush_interval: float = 0.25,
+                 max_queue: int = 50_000, overflow: str = "drop_oldest",
+                 echo: Optional[bool] = None):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}")
         self.db_path = Path(db_path)
         self.db_path.parent.mkdir(exist_ok=True)
-        self._lock = threading.Lock()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.overflow = overflow
+        if echo is None:
+            echo = os.getenv("LOG_ECHO", "1") not in ("0", "false", "no")
+        self.echo = echo
+        self._lock = threading.Lock()  # guards the writer's connection
+        # deque.append/popleft are atomic, so producers never take a lock
+        self._queue: deque = deque()
+        self._wake = threading.Event()
+        self._written = 0
+        self._dropped = 0
+        self._stopped = False
+        self._conn: Optional[sqlite3.Connection] = None
         self._ensure_log_table()
+        self._writer = threading.Thread(target=self._writer_loop, name="activity-log-writer",
+                                        daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
     
     def _ensure_log_table(self):
         """Ensure the activity_log table exists"""
         try:
-            with sqlite3.connect(str(self.db_path)) as conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS activity_log (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        activity_type TEXT NOT NULL,
-                        description TEXT NOT NULL,
-                        metadata TEXT,
-                        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                conn.commit()
+            self._conn = self._connect()
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS activity_log (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    activity_type TEXT NOT NULL,
+                    description TEXT NOT NULL,
+                    metadata TEXT,
+                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            self._conn.executescript("""
+                CREATE INDEX IF NOT EXISTS idx_activity_log_timestamp
+                    ON activity_log (timestamp);
+                CREATE INDEX IF NOT EXISTS idx_activity_log_type_timestamp
+                    ON activity_log (activity_type, timestamp);
+                CREATE TABLE IF NOT EXISTS activity_rollup (
+                    granularity TEXT NOT NULL,
+                    bucket TEXT NOT NULL,
+                    activity_type TEXT NOT NULL,
+                    count INTEGER NOT NULL DEFAULT 0,
+                    slow_count INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (granularity, bucket, activity_type)
+                );
+                CREATE TABLE IF NOT EXISTS metrics_rollup (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    window_start TEXT NOT NULL,
+                    window_seconds REAL NOT NULL,
+                    kind TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    labels TEXT,
+                    count REAL NOT NULL,
+                    sum REAL,
+                    min REAL,
+                    max REAL,
+                    p50 REAL,
+                    p95 REAL,
+                    p99 REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_metrics_rollup_name_window
+                    ON metrics_rollup (name, window_start);
+            """)
+            self._conn.commit()
         except Exception:
             # If database operations fail, we'll continue without logging
-            pass
+            self._conn = None
     
     def log_activity(self, activity_type: str, description: str, 
                     metadata: Optional[Dict[str, Any]] = None):
-        """Log an activity to the database and console"""
+        """Queue an activity for the database and console"""
+        try:
+            row = (
+                activity_type,
+                description,
+                json.dumps(metadata, default=str) if metadata else None,
+                datetime.now().isoformat(),
+            )
+        except Exception as e:
+            print(f"[{datetime.now().isoformat()}] LOGGING_ERROR: Failed to log activity: {str(e)}")
+            print(f"  Original activity: {activity_type} - {description}")
+            return
+        
+        if len(self._queue) >= self.max_queue and not self._make_room():
+            return
+        self._queue.append(row)
+        if len(self._queue) >= self.batch_size and not self._wake.is_set():
+            self._wake.set()
+    
+    def _make_room(self) -> bool:
+        """Apply the overflow policy. False means drop the incoming event."""
+        if self.overflow == "drop_newest":
+            self._dropped += 1
+            return False
+        if self.overflow == "drop_oldest":
+            try:
+                oldest = self._queue.popleft()
+                if isinstance(oldest, threading.Event):
+                    # Never drop a flush() marker; evict the row behind it
+                    self._queue.appendleft(oldest)
+                    del self._queue[1]
+                self._dropped += 1
+            except IndexError:
+                pass
+            return True
+        # block: let the writer drain, unless we *are* the writer or it is gone
+        if threading.current_thread() is self._writer or not self._writer.is_alive():
+            self._dropped += 1
+            return False
+        while len(self._queue) >= self.max_queue and self._writer.is_alive():
+            self._wake.set()
+            time.sleep(0.001)
+        return True
+    
+    # -- background writer -------------------------------------------------
+    
+    def _writer_loop(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            while self._queue:
+                self._write_batch()
+            if self._stopped and not self._queue:
+                return
+    
+    def _write_batch(self):
+        batch = []
+        markers = []
+        try:
+            while len(batch) < self.batch_size:
+                item = self._queue.popleft()
+                if isinstance(item, threading.Event):
+                    markers.append(item)
+                    break
+                batch.append(item)
+        except IndexError:
+            pass
+        if batch:
+            self._commit(batch)
+        for marker in markers:
+            marker.set()
+    
+    def _commit(self, batch):
+        if self.echo:
+            for activity_type, description, metadata, timestamp in batch:
+                print(f"[{timestamp}] {activity_type.upper()}: {description}")
+                if metadata:
+                    print(f"  Metadata: {metadata}")
+        
         try:
-            timestamp = datetime.now().isoformat()
-            
-            # Console logging for immediate visibility
-            print(f"[{timestamp}] {activity_type.upper()}: {description}")
-            if metadata:
-                print(f"  Metadata: {json.dumps(metadata, indent=2)}")
-            
-            # Database logging
             with self._lock:
-                with sqlite3.connect(str(self.db_path)) as conn:
-                    cursor = conn.cursor()
-                    cursor.execute("""
+                if self._conn is None:
+                    self._ensure_log_table()
+                with self._conn:
+                    self._conn.executemany("""
                         INSERT INTO activity_log (activity_type, description, metadata, timestamp)
                         VALUES (?, ?, ?, ?)
-                    """, (
-                        activity_type,
-                        description,
-                        json.dumps(metadata) if metadata else None,
-                        timestamp
-                    ))
-                    conn.commit()
-                    
+                    """, batch)
+                    self._conn.executemany("""
+                        INSERT INTO activity_rollup (granularity, bucket, activity_type, count, slow_count)
+                        VALUES (?, ?, ?, ?, ?)
+                        ON CONFLICT (granularity, bucket, activity_type) DO UPDATE SET
+                            count = count + excluded.count,
+                            slow_count = slow_count + excluded.slow_count
+                    """, self._rollup_rows(batch))
         except Exception as e:
             # Fallback to console only if database logging fails
-            print(f"[{datetime.now().isoformat()}] LOGGING_ERROR: Failed to log activity: {str(e)}")
-            print(f"  Original activity: {activity_type} - {description}")
+            print(f"[{datetime.now().isoformat()}] LOGGING_ERROR: Failed to write {len(batch)} activities: {str(e)}")
+        else:
+            self._written += len(batch)
+    
+    @staticmethod
+    def _rollup_rows(batch) -> list:
+        """Per-hour and per-day counts for a batch, ready to upsert"""
+        counts: Dict[tuple, list] = {}
+        for activity_type, _, metadata, timestamp in batch:
+            slow = 0
+            if activity_type == "performance" and metadata:
+                try:
+                    details = json.loads(metadata)
+                except ValueError:
+                    details = None
+                if isinstance(details, dict):
+                    slow = int(details.get("performance_level") in SLOW_LEVELS)
+            for granularity, width in ROLLUP_GRANULARITIES.items():
+                entry = counts.setdefault((granularity, timestamp[:width], activity_type), [0, 0])
+                entry[0] += 1
+                entry[1] += slow
+        return [key + tuple(value) for key, value in counts.items()]
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every event queued before this call is committed."""
+        if not self._writer.is_alive() or threading.current_thread() is self._writer:
+            return False
+        marker = threading.Event()
+        self._queue.append(marker)
+        self._wake.set()
+        return marker.wait(timeout)
+    
+    def get_writer_stats(self) -> Dict[str, Any]:
+        """Queue depth and counters for the background writer"""
+        return {
+            "queued": len(self._queue),
+            "written": self._written,
+            "dropped": self._dropped,
+            "overflow": self.overflow,
+        }
+    
+    def close(self):
+        """Drain the queue, stop the writer and close the connection"""
+        if self._stopped:
+            return
+        self._stopped = True
+        self._wake.set()
+        self._writer.join()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+        if self._dropped:
+            print(f"⚠️ Activity log dropped {self._dropped} event(s) under load")
     
     def log_error(self, error_type: str, error_message: str, 
                   context: Optional[Dict[str, Any]] = None):
@@ -77,6 +282,7 @@ class LoggingUtils:
     def log_performance(self, operation: str, duration_seconds: float, 
                        additional_info: Optional[Dict[str, Any]] = None):
         """Log performance metrics"""
+        get_metrics().observe(operation, duration_seconds)
         metadata = {
             "operation": operation,
             "duration_seconds": duration_seconds,
@@ -92,6 +298,24 @@ class LoggingUtils:
             metadata
         )
     
+    def write_metrics_rollup(self, rows: list):
+        """Persist Metrics.rollup() rows; used as the metrics flusher's sink"""
+        with self._lock:
+            if self._conn is None:
+                self._ensure_log_table()
+            with self._conn:
+                self._conn.executemany("""
+                    INSERT INTO metrics_rollup (window_start, window_seconds, kind, name, labels,
+                                                count, sum, min, max, p50, p95, p99)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, [
+                    (row["window_start"], row["window_seconds"], row["kind"], row["name"],
+                     json.dumps(row["labels"]) if row["labels"] else None, row["count"],
+                     row.get("sum"), row.get("min"), row.get("max"),
+                     row.get("p50"), row.get("p95"), row.get("p99"))
+                    for row in rows
+                ])
+    
     def _get_performance_level(self, duration: float) -> str:
         """Categorize performance based on duration"""
         if duration < 1.0:
@@ -153,77 +377,130 @@ class LoggingUtils:
         
         self.log_activity("user_action", f"User {action}: {details}", metadata)
     
+    # -- queries -----------------------------------------------------------
+    
+    def _read_connection(self) -> sqlite3.Connection:
+        # Readers get their own connection; WAL lets them run beside the writer
+        return sqlite3.connect(str(self.db_path))
+    
+    @staticmethod
+    def _cutoff(hours: float) -> str:
+        return datetime.fromtimestamp(datetime.now().timestamp() - hours * 3600).isoformat()
+    
+    @staticmethod
+    def _where(cutoff_iso: str, activity_types: Optional[list]):
+        clause = "timestamp >= ?"
+        params: list = [cutoff_iso]
+        if activity_types:
+            placeholders = ','.join(['?' for _ in activity_types])
+            clause += f" AND activity_type IN ({placeholders})"
+            params += list(activity_types)
+        return clause, params
+    
+    @staticmethod
+    def _row_to_log(row) -> Dict[str, Any]:
+        return {
+            'activity_type': row[0],
+            'description': row[1],
+            'metadata': json.loads(row[2]) if row[2] else {},
+            'timestamp': row[3]
+        }
+    
+    def iter_logs(self, hours: int = 24, activity_types: Optional[list] = None,
+                  chunk_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Stream recent log entries, newest first, `chunk_size` rows at a time"""
+        self.flush(timeout=5)
+        clause, params = self._where(self._cutoff(hours), activity_types)
+        conn = self._read_connection()
+        try:
+            cursor = conn.execute(f"""
+                SELECT activity_type, description, metadata, timestamp
+                FROM activity_log
+                WHERE {clause}
+                ORDER BY timestamp DESC
+            """, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield self._row_to_log(row)
+        finally:
+            conn.close()
+    
     def get_recent_logs(self, hours: int = 24, 
                        activity_types: Optional[list] = None) -> list:
         """Retrieve recent log entries"""
         try:
-            cutoff_time = datetime.now().timestamp() - (hours * 3600)
-            cutoff_iso = datetime.fromtimestamp(cutoff_time).isoformat()
-            
-            with sqlite3.connect(str(self.db_path)) as conn:
-                cursor = conn.cursor()
-                
-                if activity_types:
-                    placeholders = ','.join(['?' for _ in activity_types])
-                    query = f"""
-                        SELECT activity_type, description, metadata, timestamp
-                        FROM activity_log
-                        WHERE timestamp >= ? AND activity_type IN ({placeholders})
-                        ORDER BY timestamp DESC
-                    """
-                    cursor.execute(query, [cutoff_iso] + activity_types)
-                else:
-                    cursor.execute("""
-                        SELECT activity_type, description, metadata, timestamp
-                        FROM activity_log
-                        WHERE timestamp >= ?
-                        ORDER BY timestamp DESC
-                    """, (cutoff_iso,))
-                
-                rows = cursor.fetchall()
-                logs = []
-                
-                for row in rows:
-                    logs.append({
-                        'activity_type': row[0],
-                        'description': row[1],
-                        'metadata': json.loads(row[2]) if row[2] else {},
-                        'timestamp': row[3]
-                    })
-                
-                return logs
-                
+            return list(self.iter_logs(hours, activity_types))
         except Exception as e:
             self.log_error("log_retrieval_error", f"Failed to retrieve logs: {str(e)}")
             return []
     
+    def get_logs_page(self, hours: int = 24, activity_types: Optional[list] = None,
+                      limit: int = 100, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        One page of recent logs, newest first. Pass the returned
+        `next_cursor` back to get the following page; it is None on the last.
+        Raises ValueError for a cursor this method didn't hand out.
+        Keyset pagination on (timestamp, id) stays fast however deep you page.
+        """
+        self.flush(timeout=5)
+        clause, params = self._where(self._cutoff(hours), activity_types)
+        if cursor:
+            ts, _, last_id = cursor.rpartition("|")
+            if not ts or not last_id.isdigit():
+                raise ValueError(f"Malformed cursor: {cursor!r}")
+            clause += " AND (timestamp < ? OR (timestamp = ? AND id < ?))"
+            params += [ts, ts, int(last_id)]
+        conn = self._read_connection()
+        try:
+            rows = conn.execute(f"""
+                SELECT activity_type, description, metadata, timestamp, id
+                FROM activity_log
+                WHERE {clause}
+                ORDER BY timestamp DESC, id DESC
+                LIMIT ?
+            """, params + [limit + 1]).fetchall()
+        finally:
+            conn.close()
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = f"{rows[-1][3]}|{rows[-1][4]}"
+        return {"logs": [self._row_to_log(row) for row in rows], "next_cursor": next_cursor}
+    
     def get_log_summary(self, hours: int = 24) -> Dict[str, Any]:
         """Get a summary of log activities"""
+        self.flush(timeout=5)
         try:
-            logs = self.get_recent_logs(hours)
+            cutoff_iso = self._cutoff(hours)
+            conn = self._read_connection()
+            try:
+                breakdown = dict(conn.execute("""
+                    SELECT activity_type, COUNT(*)
+                    FROM activity_log
+                    WHERE timestamp >= ?
+                    GROUP BY activity_type
+                """, (cutoff_iso,)).fetchall())
+                performance_issues = conn.execute("""
+                    SELECT COUNT(*)
+                    FROM activity_log
+                    WHERE activity_type = 'performance' AND timestamp >= ?
+                      AND json_extract(metadata, '$.performance_level') IN ('slow', 'very_slow')
+                """, (cutoff_iso,)).fetchone()[0]
+            finally:
+                conn.close()
             
-            summary = {
-                'total_activities': len(logs),
-                'activity_breakdown': {},
-                'error_count': 0,
-                'performance_issues': 0,
+            return {
+                'total_activities': sum(breakdown.values()),
+                'activity_breakdown': breakdown,
+                'error_count': breakdown.get('error', 0),
+                'performance_issues': performance_issues,
                 'time_range_hours': hours
             }
             
-            for log in logs:
-                activity_type = log['activity_type']
-                summary['activity_breakdown'][activity_type] = \
-                    summary['activity_breakdown'].get(activity_type, 0) + 1
-                
-                if activity_type == 'error':
-                    summary['error_count'] += 1
-                elif activity_type == 'performance':
-                    metadata = log.get('metadata', {})
-                    if metadata.get('performance_level') in ['slow', 'very_slow']:
-                        summary['performance_issues'] += 1
-            
-            return summary
-            
         except Exception as e:
             return {
                 'total_activities': 0,
@@ -234,33 +511,91 @@ class LoggingUtils:
                 'summary_error': str(e)
             }
     
+    def get_rollups(self, granularity: str = "hour", hours: int = 24,
+                    activity_types: Optional[list] = None) -> list:
+        """
+        Pre-aggregated counts per time bucket from activity_rollup, oldest
+        first. Dashboards should use this rather than scanning activity_log.
+        Rollups are kept when clear_old_logs prunes raw rows.
+        """
+        if granularity not in ROLLUP_GRANULARITIES:
+            raise ValueError(f"granularity must be one of {tuple(ROLLUP_GRANULARITIES)}")
+        self.flush(timeout=5)
+        since = self._cutoff(hours)[:ROLLUP_GRANULARITIES[granularity]]
+        query = """
+            SELECT bucket, activity_type, count, slow_count
+            FROM activity_rollup
+            WHERE granularity = ? AND bucket >= ?
+        """
+        params: list = [granularity, since]
+        if activity_types:
+            query += f" AND activity_type IN ({','.join(['?' for _ in activity_types])})"
+            params += list(activity_types)
+        conn = self._read_connection()
+        try:
+            rows = conn.execute(query + " ORDER BY bucket, activity_type", params).fetchall()
+        finally:
+            conn.close()
+        return [
+            {'bucket': bucket, 'activity_type': activity_type, 'count': count, 'slow_count': slow}
+            for bucket, activity_type, count, slow in rows
+        ]
+    
+    # -- export ------------------------------------------------------------
+    
+    def iter_export(self, format_type: str = 'jsonl', hours: int = 24,
+                    activity_types: Optional[list] = None) -> Iterator[str]:
+        """
+        Yield the export as text chunks (one JSON line or CSV row each), so it
+        can be written to a file or handed to a streaming HTTP response.
+        """
+        format_type = format_type.lower()
+        if format_type not in ('jsonl', 'csv'):
+            raise ValueError(f"Unsupported export format: {format_type}")
+        
+        logs = self.iter_logs(hours, activity_types)
+        if format_type == 'jsonl':
+            for log in logs:
+                yield json.dumps(log, default=str) + "\n"
+            return
+        
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+        writer.writeheader()
+        for log in logs:
+            writer.writerow({
+                'timestamp': log['timestamp'],
+                'activity_type': log['activity_type'],
+                'description': log['description'],
+                'metadata': json.dumps(log['metadata']) if log['metadata'] else ''
+            })
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    
+    def export_logs_to(self, destination: Union[str, Path, IO[str]],
+                       format_type: str = 'jsonl', hours: int = 24) -> int:
+        """Stream an export into a path or open text file. Returns chunks written."""
+        if isinstance(destination, (str, Path)):
+            with open(destination, "w", encoding="utf-8", newline="") as f:
+                return self.export_logs_to(f, format_type, hours)
+        written = 0
+        for chunk in self.iter_export(format_type, hours):
+            destination.write(chunk)
+            written += 1
+        return written
+    
     def export_logs(self, format_type: str = 'json', 
                    hours: int = 24) -> Optional[str]:
         """Export logs in specified format"""
         try:
-            logs = self.get_recent_logs(hours)
-            
-            if format_type.lower() == 'json':
-                return json.dumps(logs, indent=2, default=str)
-            elif format_type.lower() == 'csv':
-                import csv
-                import io
-                
-                output = io.StringIO()
-                if logs:
-                    fieldnames = ['timestamp', 'activity_type', 'description', 'metadata']
-                    writer = csv.DictWriter(output, fieldnames=fieldnames)
-                    writer.writeheader()
-                    
-                    for log in logs:
-                        writer.writerow({
-                            'timestamp': log['timestamp'],
-                            'activity_type': log['activity_type'],
-                            'description': log['description'],
-                            'metadata': json.dumps(log['metadata']) if log['metadata'] else ''
-                        })
-                
-                return output.getvalue()
+            format_type = format_type.lower()
+            if format_type == 'json':
+                return json.dumps(list(self.iter_logs(hours)), default=str)
+            elif format_type in ('jsonl', 'csv'):
+                return "".join(self.iter_export(format_type, hours))
             else:
                 return None
                 
@@ -270,26 +605,38 @@ class LoggingUtils:
     
     def clear_old_logs(self, days_to_keep: int = 30):
         """Clear old log entries to manage database size"""
+        self.flush(timeout=5)
         try:
             cutoff_time = datetime.now().timestamp() - (days_to_keep * 24 * 3600)
             cutoff_iso = datetime.fromtimestamp(cutoff_time).isoformat()
             
             with self._lock:
-                with sqlite3.connect(str(self.db_path)) as conn:
-                    cursor = conn.cursor()
-                    cursor.execute("""
+                conn = self._conn or self._connect()
+                with conn:
+                    cursor = conn.execute("""
                         DELETE FROM activity_log
                         WHERE timestamp < ?
                     """, (cutoff_iso,))
-                    
                     deleted_count = cursor.rowcount
-                    conn.commit()
-                    
-                    self.log_activity(
-                        "maintenance",
-                        f"Cleared {deleted_count} old log entries",
-                        {"days_to_keep": days_to_keep, "deleted_count": deleted_count}
-                    )
+            
+            self.log_activity(
+                "maintenance",
+                f"Cleared {deleted_count} old log entries",
+                {"days_to_keep": days_to_keep, "deleted_count": deleted_count}
+            )
                     
         except Exception as e:
             self.log_error("log_cleanup_error", f"Failed to clear old logs: {str(e)}")
+
+
+_shared: Optional[LoggingUtils] = None
+_shared_lock = threading.Lock()
+
+
+def get_logging_utils() -> LoggingUtils:
+    """Process-wide LoggingUtils (LOG_DB_PATH, default ./data/second_brain.db)"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = LoggingUtils(os.getenv("LOG_DB_PATH", "./data/second_brain.db"))
+        return _shared
@@ -0,0 +1,300 @@
+"""
+In-process metrics: latency histograms, counters and a Prometheus view.
+
+    from utils.metrics import get_metrics
+    metrics = get_metrics()
+
+    with metrics.timer("ocr_extract", ext=".pdf"):
+        ...
+
+    @metrics.timed("llm_request")
+    def call_model(...): ...
+
+Histograms are HDR-style: log-linear buckets (SUB_BUCKETS per power of two)
+so recording is O(1), memory stays small whatever the range, and
+percentiles are accurate to a few percent. A flusher thread periodically
+hands the last window's rollups (count/sum/min/max/p50/p95/p99 per series)
+to a sink, normally LoggingUtils.write_metrics_rollup.
+"""
+
+import asyncio
+import functools
+import math
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+SUB_BUCKETS = 32  # per power of two -> ~1.6% worst-case relative error
+QUANTILES = (0.5, 0.95, 0.99)
+
+LabelSet = Tuple[Tuple[str, str], ...]
+SeriesKey = Tuple[str, LabelSet]
+
+
+class Histogram:
+    """Log-linear histogram of positive values (seconds, bytes, ...)."""
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _index(value: float) -> int:
+        if value <= 0:
+            return -(1 << 30)  # everything <= 0 shares one bottom bucket
+        mantissa, exponent = math.frexp(value)  # value = mantissa * 2**exponent, 0.5 <= mantissa < 1
+        return exponent * SUB_BUCKETS + int((mantissa - 0.5) * 2 * SUB_BUCKETS)
+
+    @staticmethod
+    def _value(index: int) -> float:
+        if index == -(1 << 30):
+            return 0.0
+        exponent, sub = divmod(index, SUB_BUCKETS)
+        return math.ldexp(0.5 + (sub + 0.5) / (2 * SUB_BUCKETS), exponent)
+
+    def record(self, value: float) -> None:
+        index = self._index(value)
+        with self._lock:
+            self.counts[index] = self.counts.get(index, 0) + 1
+            self.count += 1
+            self.sum += value
+            if value < self.min:
+                self.min = value
+            if value > self.max:
+                self.max = value
+
+    def percentiles(self, quantiles=QUANTILES) -> Dict[float, float]:
+        with self._lock:
+            if not self.count:
+                return {q: 0.0 for q in quantiles}
+            items = sorted(self.counts.items())
+            count, lo, hi = self.count, self.min, self.max
+        result = {}
+        for q in quantiles:
+            rank = max(1, math.ceil(q * count))
+            seen = 0
+            for index, n in items:
+                seen += n
+                if seen >= rank:
+                    result[q] = min(max(self._value(index), lo), hi)
+                    break
+        return result
+
+    def summary(self) -> Dict[str, float]:
+        p = self.percentiles()
+        with self._lock:
+            return {
+                "count": self.count,
+                "sum": self.sum,
+                "min": self.min if self.count else 0.0,
+                "max": self.max,
+                "p50": p[0.5],
+                "p95": p[0.95],
+                "p99": p[0.99],
+            }
+
+
+def _labels(labels: Dict[str, Any]) -> LabelSet:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+class Metrics:
+    """
+    Registry of histograms and counters keyed by (name, labels).
+
+    Each series keeps a cumulative histogram for /metrics and a window
+    histogram that rollup() swaps out, so persisted rollups describe only
+    the interval since the previous flush.
+    """
+
+    def __init__(self, prefix: str = "qilife"):
+        self.prefix = prefix
+        self._histograms: Dict[SeriesKey, Histogram] = {}
+        self._window: Dict[SeriesKey, Histogram] = {}
+        self._counters: Dict[SeriesKey, float] = {}
+        self._window_counters: Dict[SeriesKey, float] = {}
+        self._window_start = time.time()
+        self._lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # -- recording ---------------------------------------------------------
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        key = (name, _labels(labels))
+        cumulative = self._histograms.get(key)
+        window = self._window.get(key)
+        if cumulative is None or window is None:
+            with self._lock:
+                cumulative = self._histograms.setdefault(key, Histogram())
+                window = self._window.setdefault(key, Histogram())
+        cumulative.record(seconds)
+        window.record(seconds)
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+            self._window_counters[key] = self._window_counters.get(key, 0) + value
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[None]:
+        """Time the block; failures also bump `<name>_errors`."""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.inc(f"{name}_errors", **labels)
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timed(self, name: Optional[str] = None, **labels) -> Callable:
+        """Decorator form of timer(); works on plain and async functions."""
+        def decorator(fn: Callable) -> Callable:
+            metric = name or fn.__qualname__
+
+            if asyncio.iscoroutinefunction(fn):
+                @functools.wraps(fn)
+                async def async_wrapper(*args, **kwargs):
+                    with self.timer(metric, **labels):
+                        return await fn(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.timer(metric, **labels):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    # -- reading -----------------------------------------------------------
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Cumulative summaries and counters as plain dicts."""
+        with self._lock:
+            histograms = list(self._histograms.items())
+            counters = list(self._counters.items())
+        return {
+            "histograms": [
+                {"name": name, "labels": dict(labels), **hist.summary()}
+                for (name, labels), hist in histograms
+            ],
+            "counters": [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in counters
+            ],
+        }
+
+    def rollup(self) -> List[Dict[str, Any]]:
+        """Summaries for the window since the last rollup, then start a new window."""
+        with self._lock:
+            window, self._window = self._window, {}
+            counters, self._window_counters = self._window_counters, {}
+            start, self._window_start = self._window_start, time.time()
+        window_start = datetime.fromtimestamp(start).isoformat()
+        window_seconds = round(time.time() - start, 3)
+        rows = []
+        for (name, labels), hist in window.items():
+            summary = hist.summary()
+            if summary["count"]:
+                rows.append({"window_start": window_start, "window_seconds": window_seconds,
+                             "kind": "histogram", "name": name, "labels": dict(labels), **summary})
+        for (name, labels), value in counters.items():
+            rows.append({"window_start": window_start, "window_seconds": window_seconds,
+                         "kind": "counter", "name": name, "labels": dict(labels),
+                         "count": value})
+        return rows
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition (histograms as summaries, counters as _total)."""
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+
+        lines: List[str] = []
+        declared = set()
+        for (name, labels), hist in histograms:
+            metric = f"{self.prefix}_{_metric_name(name)}_seconds"
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f"# TYPE {metric} summary")
+            summary = hist.summary()
+            for q, key in zip(QUANTILES, ("p50", "p95", "p99")):
+                lines.append(f"{metric}{_render_labels(labels + (('quantile', str(q)),))} {summary[key]:.6g}")
+            lines.append(f"{metric}_sum{_render_labels(labels)} {summary['sum']:.6g}")
+            lines.append(f"{metric}_count{_render_labels(labels)} {summary['count']}")
+        for (name, labels), value in counters:
+            metric = f"{self.prefix}_{_metric_name(name)}_total"
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{_render_labels(labels)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    # -- periodic flush ----------------------------------------------------
+
+    def start_flusher(self, sink: Callable[[List[Dict[str, Any]]], None],
+                      interval: float = 60.0) -> None:
+        """Every `interval` seconds pass rollup() to `sink` on a daemon thread."""
+        if self._flusher and self._flusher.is_alive():
+            return
+        self._stop.clear()
+
+        def run():
+            while not self._stop.wait(interval):
+                self._flush_to(sink)
+            self._flush_to(sink)
+
+        self._flusher = threading.Thread(target=run, name="metrics-flusher", daemon=True)
+        self._flusher.start()
+
+    def _flush_to(self, sink) -> None:
+        rows = self.rollup()
+        if not rows:
+            return
+        try:
+            sink(rows)
+        except Exception as e:
+            print(f"⚠️ Metrics flush failed: {e}")
+
+    def stop_flusher(self) -> None:
+        self._stop.set()
+        if self._flusher:
+            self._flusher.join()
+            self._flusher = None
+
+
+def _metric_name(name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9_]", "_", name).strip("_").lower()
+
+
+def _render_labels(labels: LabelSet) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels:
+        value = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{_metric_name(key)}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+_metrics: Optional[Metrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> Metrics:
+    """Process-wide registry (prefix from METRICS_PREFIX, default 'qilife')."""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = Metrics(os.getenv("METRICS_PREFIX", "qilife"))
+        return _metrics
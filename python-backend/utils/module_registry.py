@@ -0,0 +1,179 @@
+"""
+Warm-start registry for the backend's optional subsystems.
+
+Each subsystem (fileflow, memory, voice, ...) is registered with the
+modules it needs and an optional warm-up hook. At startup the registry
+imports the eager ones in parallel threads, waits at most `budget_seconds`
+for them, and lets the rest finish in the background. Lazy subsystems are
+imported on first require(). Either way every subsystem ends up with a
+measured import time and an availability state for /health, and an import
+error is reported once, at load time, instead of inside a request.
+"""
+
+import importlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+PENDING = "pending"
+LOADING = "loading"
+AVAILABLE = "available"
+UNAVAILABLE = "unavailable"
+
+
+class ModuleUnavailable(RuntimeError):
+    """A subsystem failed to import or warm up."""
+
+
+@dataclass
+class Subsystem:
+    name: str
+    imports: Sequence[str]
+    warm: Optional[Callable[[], Any]] = None
+    lazy: bool = False
+    implemented: bool = True
+    state: str = PENDING
+    error: Optional[str] = None
+    import_seconds: Optional[float] = None
+    warm_seconds: Optional[float] = None
+    module_seconds: Dict[str, float] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "status": self.state,
+            "lazy": self.lazy,
+            "implemented": self.implemented,
+            "import_seconds": _round(self.import_seconds),
+            "warm_seconds": _round(self.warm_seconds),
+            "modules": {name: _round(t) for name, t in self.module_seconds.items()},
+            "error": self.error,
+        }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 4)
+
+
+class ModuleRegistry:
+    def __init__(self):
+        self._subsystems: Dict[str, Subsystem] = {}
+        self.startup_seconds: Optional[float] = None
+
+    def register(self, name: str, imports: Sequence[str],
+                 warm: Optional[Callable[[], Any]] = None, lazy: bool = False) -> None:
+        """`imports` are module paths, or "module:attr" to also require an attribute."""
+        self._subsystems[name] = Subsystem(name, list(imports), warm, lazy)
+
+    def register_unimplemented(self, name: str, reason: str) -> None:
+        """A subsystem with an endpoint but no backend code yet: always unavailable."""
+        self._subsystems[name] = Subsystem(name, [], lazy=True, implemented=False,
+                                           state=UNAVAILABLE, error=reason)
+
+    def names(self) -> List[str]:
+        return list(self._subsystems)
+
+    def load(self, name: str) -> Subsystem:
+        """Import (and warm) one subsystem once; concurrent callers share the work."""
+        sub = self._subsystems[name]
+        with sub._lock:
+            if sub.state in (AVAILABLE, UNAVAILABLE):
+                return sub
+            sub.state = LOADING
+            start = time.perf_counter()
+            try:
+                for spec in sub.imports:
+                    t = time.perf_counter()
+                    _resolve(spec)
+                    sub.module_seconds[spec] = time.perf_counter() - t
+                sub.import_seconds = time.perf_counter() - start
+                if sub.warm is not None:
+                    t = time.perf_counter()
+                    sub.warm()
+                    sub.warm_seconds = time.perf_counter() - t
+                sub.state = AVAILABLE
+            except Exception as e:
+                sub.import_seconds = time.perf_counter() - start
+                sub.error = f"{type(e).__name__}: {e}"
+                sub.state = UNAVAILABLE
+                print(f"⚠️ Subsystem '{name}' unavailable: {sub.error}")
+        return sub
+
+    def require(self, name: str) -> None:
+        """Make sure `name` is loaded; raise ModuleUnavailable if it can't be."""
+        sub = self.load(name)
+        if sub.state != AVAILABLE:
+            raise ModuleUnavailable(f"{name} is unavailable: {sub.error}")
+
+    def is_unavailable(self, name: str) -> bool:
+        """True only once a load attempt has actually failed (never blocks)."""
+        sub = self._subsystems.get(name)
+        return sub is not None and sub.state == UNAVAILABLE
+
+    def preload(self, names: Optional[Sequence[str]] = None, max_workers: int = 4,
+                budget_seconds: Optional[float] = None) -> Dict[str, str]:
+        """
+        Load eager subsystems in parallel threads. Returns after all finish or
+        `budget_seconds`, whichever is first; stragglers keep loading in the
+        background and are reported as "loading" until they finish.
+        """
+        if names is None:
+            names = [n for n, sub in self._subsystems.items() if not sub.lazy]
+        start = time.perf_counter()
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="preload")
+        futures = [executor.submit(self.load, name) for name in names]
+        wait(futures, timeout=budget_seconds)
+        executor.shutdown(wait=False)
+        self.startup_seconds = time.perf_counter() - start
+        late = [n for n in names if self._subsystems[n].state == LOADING]
+        if late:
+            print(f"⏳ Startup budget {budget_seconds}s spent; still loading: {', '.join(late)}")
+        return {name: self._subsystems[name].state for name in names}
+
+    def status(self) -> Dict[str, Any]:
+        return {name: sub.to_dict() for name, sub in self._subsystems.items()}
+
+
+def _resolve(spec: str) -> Any:
+    """Import "pkg.module" or "pkg.module:attr" (the attribute must exist)."""
+    module_name, _, attr = spec.partition(":")
+    module = importlib.import_module(module_name)
+    return getattr(module, attr) if attr else module
+
+
+def _warm_memory() -> None:
+    from memory.vector_store import get_vector_store
+    get_vector_store()
+
+
+_registry: Optional[ModuleRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> ModuleRegistry:
+    """
+    The backend's registry. BACKEND_LAZY_MODULES lists subsystems to load on
+    first use instead of at startup ("all" makes every one lazy).
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            lazy_env = os.getenv("BACKEND_LAZY_MODULES", "")
+            lazy = {n.strip() for n in lazy_env.split(",") if n.strip()}
+            registry = ModuleRegistry()
+            for name, imports, warm in (
+                ("fileflow", ["fileflow.analyzer:analyze_file", "fileflow.batcher:process_batch"], None),
+                ("duplicate_cleaner",
+                 ["fileflow.duplicate_cleaner.duplicateCleaner:run_duplicate_cleaner"], None),
+                ("memory", ["memory.vector_store:query_memory", "memory.embedder"], _warm_memory),
+            ):
+                registry.register(name, imports, warm, lazy="all" in lazy or name in lazy)
+            registry.register_unimplemented(
+                "voice", "voice.voice_transcriber has no transcribe_audio_file yet")
+            registry.register_unimplemented(
+                "quick_receipt", "quick receipts only exist in the Electron mini app")
+            _registry = registry
+        return _registry
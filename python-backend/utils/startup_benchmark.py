@@ -0,0 +1,76 @@
+"""
+Benchmark backend cold start: eager preload vs lazy loading.
+
+Each run happens in a fresh interpreter so nothing is cached in
+sys.modules. For every mode it reports the time to import main.py, the
+startup preload time, and what the first use of each subsystem costs
+afterwards (near zero when it was preloaded).
+
+    python utils/startup_benchmark.py --runs 3 --budget 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+_CHILD = r"""
+import json, sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, {backend!r})
+import main
+from utils.module_registry import get_registry
+t1 = time.perf_counter()
+registry = get_registry()
+registry.preload(budget_seconds={budget!r})
+t2 = time.perf_counter()
+first_use = {{}}
+for name in registry.names():
+    t = time.perf_counter()
+    try:
+        registry.require(name)
+    except Exception:
+        pass
+    first_use[name] = time.perf_counter() - t
+print(json.dumps({{
+    "import_main": t1 - t0,
+    "preload": t2 - t1,
+    "first_use": first_use,
+    "status": {{n: s["status"] for n, s in registry.status().items()}},
+}}))
+"""
+
+
+def run_once(lazy: str, budget) -> dict:
+    env = dict(os.environ, BACKEND_LAZY_MODULES=lazy, METRICS_FLUSH_SECONDS="0")
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD.format(backend=BACKEND_DIR, budget=budget)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--budget", type=float, default=None,
+                        help="startup preload budget in seconds")
+    args = parser.parse_args()
+
+    for label, lazy in (("eager", ""), ("lazy", "all")):
+        runs = [run_once(lazy, args.budget) for _ in range(args.runs)]
+        preload = statistics.median(r["preload"] for r in runs)
+        imports = statistics.median(r["import_main"] for r in runs)
+        print(f"\n📊 {label}: import main {imports * 1000:.0f} ms, "
+              f"startup preload {preload * 1000:.0f} ms (median of {args.runs})")
+        for name, state in runs[-1]["status"].items():
+            first = statistics.median(r["first_use"][name] for r in runs)
+            print(f"   {name:<18} {state:<12} first use {first * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,35 +1,63 @@
 import os
+import sys
 import argparse
 from datetime import datetime
 
-def print_directory_tree(root_dir, show_files=True, max_depth=None, current_depth=0, prefix='', log_file=None, include_hidden=True, exclude_dirs=None):
+# The shared file index lives in python-backend/utils
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'python-backend'))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from utils.file_index import FileIndex
+
+INDEX_DB = os.getenv("FILE_INDEX_DB", os.path.join(BACKEND_DIR, "data", "file_index.db"))
+
+DEFAULT_EXCLUDE_DIRS = [
+    'venv', '__pycache__', 'data', 'logs',
+    '.git', '.vscode', '.idea', '.pytest_cache',
+    '.venv', '.DS_Store', '.env', '.env.local',
+    '.env.development.local', '.env.test.local',
+    '.env.production.local', 'Empty_Folders',
+    '.docusaurus', '.docusaurus-plugin-content-docs-current',
+    # Node / frontend bloat
+    'node_modules', '.node_modules',
+    # Tools/programs we don’t want
+    'mpc-hc', 'losslesscut', 'OCR', 'pdf-main', 'my-pdf-main',
+    # Tests (ignore any folder containing these patterns)
+    'test', 'tests', '__tests__',
+    # Plugins and cache
+    'plugins', '.local'
+]
+
+def is_excluded(name, exclude_dirs=None):
+    """True if a directory name matches or contains any exclude pattern."""
+    if exclude_dirs is None:
+        exclude_dirs = DEFAULT_EXCLUDE_DIRS
+    return any(ex.lower() in name.lower() for ex in exclude_dirs)
+
+def print_directory_tree(root_dir, show_files=True, max_depth=None, current_depth=0, prefix='', log_file=None, include_hidden=True, exclude_dirs=None, file_index=None):
     """
     Recursively prints the directory tree structure up to the specified depth and writes to a log file.
+    Listings come from `file_index` (a refreshed FileIndex) when given, otherwise from the disk.
     """
     if exclude_dirs is None:
-        exclude_dirs = [
-            'venv', '__pycache__', 'data', 'logs',
-            '.git', '.vscode', '.idea', '.pytest_cache',
-            '.venv', '.DS_Store', '.env', '.env.local',
-            '.env.development.local', '.env.test.local',
-            '.env.production.local', 'Empty_Folders',
-            '.docusaurus', '.docusaurus-plugin-content-docs-current',
-            # Node / frontend bloat
-            'node_modules', '.node_modules',
-            # Tools/programs we don’t want
-            'mpc-hc', 'losslesscut', 'OCR', 'pdf-main', 'my-pdf-main',
-            # Tests (ignore any folder containing these patterns)
-            'test', 'tests', '__tests__',
-            # Plugins and cache
-            'plugins', '.local'
-        ]
+        exclude_dirs = DEFAULT_EXCLUDE_DIRS
 
     if max_depth is not None and current_depth >= max_depth:
         return
 
     try:
         # Get the list of items in the directory
-        items = os.listdir(root_dir)
+        if file_index is not None:
+            directories, files, error = file_index.listdir(root_dir)
+            if error == "PermissionError":
+                raise PermissionError(root_dir)
+            if error:
+                raise FileNotFoundError(root_dir)
+        else:
+            items = os.listdir(root_dir)
+            directories = [item for item in items if os.path.isdir(os.path.join(root_dir, item))]
+            files = [item for item in items if not os.path.isdir(os.path.join(root_dir, item))]
     except PermissionError:
         message = prefix + "└── [Permission Denied]"
         print(message)
@@ -44,15 +72,11 @@ def print_directory_tree(root_dir, show_files=True, max_depth=None, current_dept
         return
 
     # Sort items: directories first, then files
-    items = sorted(items, key=lambda s: s.lower())
-    directories = [item for item in items if os.path.isdir(os.path.join(root_dir, item))]
-    files = [item for item in items if not os.path.isdir(os.path.join(root_dir, item))]
+    directories = sorted(directories, key=lambda s: s.lower())
+    files = sorted(files, key=lambda s: s.lower())
 
     # Exclude directories that match or contain any exclude pattern
-    directories = [
-        item for item in directories
-        if not any(ex.lower() in item.lower() for ex in exclude_dirs)
-    ]
+    directories = [item for item in directories if not is_excluded(item, exclude_dirs)]
 
     # Show files or just folders
     items = directories if not show_files else directories + files
@@ -77,9 +101,9 @@ def print_directory_tree(root_dir, show_files=True, max_depth=None, current_dept
             log_file.write(message + "\n")
 
         # Recurse into directories
-        if os.path.isdir(path):
+        if index < len(directories):
             print_directory_tree(path, show_files, max_depth, current_depth + 1,
-                                 prefix + extension, log_file, include_hidden, exclude_dirs)
+                                 prefix + extension, log_file, include_hidden, exclude_dirs, file_index)
 
 def parse_arguments():
     """Parses command-line arguments."""
@@ -169,7 +193,16 @@ def main(root_dir):
         print(f"Resolved path: {root_dir}")
         log_file_tree.write(f"Resolved path: {root_dir}\n")
 
-        print_directory_tree(root_dir, show_files, max_depth, log_file=log_file_tree)
+        # Only directories changed since the last run are listed again, and
+        # only as deep (and outside the excluded folders) as the tree shows
+        file_index = FileIndex(INDEX_DB)
+        stats = file_index.refresh(root_dir, max_depth=max_depth,
+                                   prune=lambda path: is_excluded(os.path.basename(path)))
+        print(f"Index refreshed in {stats.seconds:.2f}s "
+              f"({stats.dirs_listed} folders rescanned, {stats.dirs_skipped} unchanged)")
+        print_directory_tree(root_dir, show_files, max_depth, log_file=log_file_tree,
+                             file_index=file_index)
+        file_index.close()
         log_file_tree.close()
         print(f"Directory structure logged in: {log_file_tree.name}")
 
@@ -1,10 +1,18 @@
 #!/usr/bin/env python3
-import os, re, json, yaml, datetime
+import os, re, sys, json, yaml, datetime
+
+# The shared file index lives in python-backend/utils
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'python-backend'))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from utils.file_index import FileIndex
 
 # ====== CONFIG ======
 VAULT_PATH = r"C:\Path\To\Your\Vault"     # <-- set your vault path
 MEDIA_PATH = r"C:\Path\To\MediaArchive"   # <-- external media folder
 REPORT_FOLDER = "_VaultHealth"            # folder inside vault for reports
+INDEX_DB = os.getenv("FILE_INDEX_DB", os.path.join(BACKEND_DIR, "data", "file_index.db"))
 # ====================
 
 def safe_yaml(content):
@@ -14,7 +22,9 @@ def safe_yaml(content):
     except:
         return False
 
-def scan_vault(vault_path):
+def scan_vault(vault_path, index=None):
+    index = index or FileIndex(INDEX_DB)
+    index.refresh(vault_path)
     report = {
         "invalid_filenames": [],
         "duplicate_filenames": [],
@@ -26,35 +36,36 @@ def scan_vault(vault_path):
     }
 
     all_files = []
+    sizes = {}
     filename_map = {}
 
-    # 1. Walk vault
-    for root, _, files in os.walk(vault_path):
-        for file in files:
-            path = os.path.join(root, file)
-            rel_path = os.path.relpath(path, vault_path)
-            all_files.append(rel_path)
-
-            # Check invalid characters
-            if re.search(r'[<>:"/\\|?*]', file):
-                report["invalid_filenames"].append(rel_path)
-
-            # Track duplicates
-            name_no_ext = os.path.splitext(file)[0].lower()
-            filename_map.setdefault(name_no_ext, []).append(rel_path)
-
-            # Check empty files
-            if os.path.getsize(path) == 0:
-                report["empty_files"].append(rel_path)
-
-            # Check YAML/frontmatter errors
-            if file.endswith(".md"):
-                with open(path, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                    if content.startswith('---'):
-                        yaml_block = content.split('---')[1]
-                        if not safe_yaml(yaml_block):
-                            report["yaml_errors"].append(rel_path)
+    # 1. Walk vault (from the file index; unchanged folders aren't re-listed)
+    for path, size, _ in index.iter_files(vault_path):
+        file = os.path.basename(path)
+        rel_path = os.path.relpath(path, os.path.abspath(vault_path))
+        all_files.append(rel_path)
+        sizes[rel_path] = size
+
+        # Check invalid characters
+        if re.search(r'[<>:"/\\|?*]', file):
+            report["invalid_filenames"].append(rel_path)
+
+        # Track duplicates
+        name_no_ext = os.path.splitext(file)[0].lower()
+        filename_map.setdefault(name_no_ext, []).append(rel_path)
+
+        # Check empty files
+        if size == 0:
+            report["empty_files"].append(rel_path)
+
+        # Check YAML/frontmatter errors
+        if file.endswith(".md"):
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                content = f.read()
+                if content.startswith('---'):
+                    yaml_block = content.split('---')[1]
+                    if not safe_yaml(yaml_block):
+                        report["yaml_errors"].append(rel_path)
 
     # 2. Duplicates
     report["duplicate_filenames"] = [
@@ -85,23 +96,19 @@ def scan_vault(vault_path):
                     report["plugin_errors"].append(plugin)
     
     # 5. Largest files
-    largest = sorted(
-        [(f, os.path.getsize(os.path.join(vault_path, f))) for f in all_files],
-        key=lambda x: x[1], reverse=True
-    )[:10]
+    largest = sorted(sizes.items(), key=lambda x: x[1], reverse=True)[:10]
     report["largest_files"] = [f"{f} - {s/1024:.1f} KB" for f,s in largest]
 
     return report
 
-def generate_media_index(media_path, vault_path):
+def generate_media_index(media_path, vault_path, index=None):
+    index = index or FileIndex(INDEX_DB)
+    index.refresh(media_path)
     lines = ["# Media Index\n"]
-    for root, _, files in os.walk(media_path):
-        for file in files:
-            rel_dir = os.path.relpath(root, media_path)
-            rel_path = os.path.join(rel_dir, file).replace("\\", "/")
-            abs_path = os.path.join(root, file)
-            size = os.path.getsize(abs_path) / (1024*1024)
-            lines.append(f"- **{file}** ({size:.1f} MB) – [{rel_path}]({abs_path})")
+    for abs_path, size, _ in index.iter_files(media_path):
+        file = os.path.basename(abs_path)
+        rel_path = os.path.relpath(abs_path, os.path.abspath(media_path)).replace("\\", "/")
+        lines.append(f"- **{file}** ({size / (1024*1024):.1f} MB) – [{rel_path}]({abs_path})")
     return "\n".join(lines)
 
 def save_report(vault_path, report, media_index):
@@ -130,6 +137,7 @@ def save_report(vault_path, report, media_index):
     print(f"Report saved to {file_path}")
 
 if __name__ == "__main__":
-    vault_report = scan_vault(VAULT_PATH)
-    media_index = generate_media_index(MEDIA_PATH, VAULT_PATH)
+    file_index = FileIndex(INDEX_DB)
+    vault_report = scan_vault(VAULT_PATH, file_index)
+    media_index = generate_media_index(MEDIA_PATH, VAULT_PATH, file_index)
     save_report(VAULT_PATH, vault_report, media_index)
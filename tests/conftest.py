@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Same import roots python-backend/main.py sets up: the backend and file_ops/
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "python-backend"))
+for path in (BACKEND_DIR, os.path.join(BACKEND_DIR, "file_ops")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
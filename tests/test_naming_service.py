@@ -0,0 +1,99 @@
+import json
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from fileflow.analysis_cache import AnalysisCache
+from fileflow.naming_service import NamingService
+
+
+class FakeClient:
+    """OpenAI-style client that names each file after its text, failing the first `failures` calls."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = []
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, **kwargs):
+        prompt = messages[-1]["content"]
+        files = json.loads(prompt.split("Files (JSON):\n", 1)[1].split("\n", 1)[0])
+        with self._lock:
+            self.calls.append([f["id"] for f in files])
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError("server unavailable")
+        names = {f["id"]: f"named_{f['extracted_text']}" for f in files}
+        content = json.dumps({"names": names})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def items(n):
+    return [(f"/inbox/scan{i}.pdf", {"text": f"doc{i}", "original_filename": f"scan{i}.pdf"})
+            for i in range(n)]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = AnalysisCache(str(tmp_path / "cache.db"))
+    yield cache
+    cache.close()
+
+
+def service(client, cache, **kwargs):
+    options = dict(batch_size=5, linger_seconds=0.5, requests_per_second=1000.0,
+                   backoff_seconds=0.0)
+    options.update(kwargs)
+    return NamingService(client=client, cache=cache, **options)
+
+
+def test_name_many_batches_and_caches(cache):
+    client = FakeClient()
+    naming = service(client, cache)
+    names = naming.name_many(items(12))
+    assert names == [f"named_doc{i}.pdf" for i in range(12)]
+    assert sorted(len(ids) for ids in client.calls) == [2, 5, 5]
+
+    # A second pass is answered from the cache
+    assert naming.name_many(items(12)) == names
+    assert len(client.calls) == 3
+    assert naming.get_stats()["cache_hits"] == 12
+
+
+def test_concurrent_name_calls_share_a_request(cache):
+    client = FakeClient()
+    naming = service(client, cache)
+    results = {}
+
+    def worker(path, metadata):
+        results[path] = naming.name(path, metadata)
+
+    threads = [threading.Thread(target=worker, args=item) for item in items(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == {f"/inbox/scan{i}.pdf": f"named_doc{i}.pdf" for i in range(5)}
+    assert len(client.calls) == 1
+
+
+def test_failed_requests_are_retried(cache):
+    client = FakeClient(failures=2)
+    naming = service(client, cache, max_retries=3)
+    assert naming.name_many(items(3)) == [f"named_doc{i}.pdf" for i in range(3)]
+    stats = naming.get_stats()
+    assert (stats["requests"], stats["retries"], stats["fallbacks"]) == (3, 2, 0)
+
+
+def test_exhausted_retries_fall_back_to_slugs(cache):
+    client = FakeClient(failures=10)
+    naming = service(client, cache, max_retries=1)
+    names = naming.name_many(items(2))
+    assert all(name and not name.startswith("named_") for name in names)
+    stats = naming.get_stats()
+    assert (stats["requests"], stats["retries"], stats["fallbacks"]) == (2, 1, 2)
+    # Fallback names are not cached, so the next call asks the model again
+    client.failures = 0
+    assert naming.name_many(items(2)) == ["named_doc0.pdf", "named_doc1.pdf"]
@@ -0,0 +1,51 @@
+import multiprocessing
+
+import pytest
+
+import memory.vector_store as vector_store
+
+
+def _watcher_side(vault, store_path):
+    # What Vault_Watcher_Bundle/vault_watcher.py does, in its own process
+    import os
+    os.environ["MEMORY_VECTOR_PATH"] = store_path
+    from memory.vault_indexer import VaultIndexer
+    from memory.vector_store import get_vector_store
+    VaultIndexer(vault, get_vector_store()).sync()
+    get_vector_store().close()
+
+
+@pytest.fixture
+def api_store(tmp_path, monkeypatch):
+    path = str(tmp_path / "data" / "vectors.db")
+    monkeypatch.setenv("MEMORY_VECTOR_PATH", path)
+    monkeypatch.setattr(vector_store, "_default_store", None)
+    yield path
+    if vector_store._default_store is not None:
+        vector_store._default_store.close()
+
+
+def run_watcher(vault, store_path):
+    proc = multiprocessing.get_context("spawn").Process(
+        target=_watcher_side, args=(str(vault), store_path))
+    proc.start()
+    proc.join(60)
+    assert proc.exitcode == 0
+
+
+def test_api_sees_notes_indexed_by_watcher_process(tmp_path, api_store):
+    vault = tmp_path / "vault"
+    vault.mkdir()
+    (vault / "boat.md").write_text("Notes on sanding and varnishing the sailboat hull.")
+    # The API has the store open before the watcher writes to it
+    assert vector_store.query_memory("sailboat hull varnish") == []
+
+    run_watcher(vault, api_store)
+    hits = vector_store.query_memory("sailboat hull varnish")
+    assert hits and hits[0]["metadata"]["source"] == "boat.md"
+
+    (vault / "boat.md").unlink()
+    (vault / "garden.md").write_text("Tomato seedlings need hardening off before planting out.")
+    run_watcher(vault, api_store)
+    sources = {hit["metadata"]["source"] for hit in vector_store.query_memory("tomato seedlings")}
+    assert sources == {"garden.md"}
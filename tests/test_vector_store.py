@@ -0,0 +1,99 @@
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from memory.vector_store import VectorStorage
+
+DIM = 16
+
+
+def unit(i, jitter=0.0):
+    v = np.zeros(DIM, dtype=np.float32)
+    v[i % DIM] = 1.0
+    v[(i + 1) % DIM] = jitter
+    return v
+
+
+@pytest.fixture
+def store_path(tmp_path):
+    return str(tmp_path / "vectors.db")
+
+
+def test_second_instance_sees_writes(store_path):
+    writer = VectorStorage(store_path, dim=DIM)
+    reader = VectorStorage(store_path, dim=DIM)
+    writer.add_vector("a", unit(0))
+    assert len(reader) == 1
+    assert reader.query(unit(0), top_k=1) == ["a"]
+
+    writer.remove_vector("a")
+    assert reader.query(unit(0), top_k=1) == []
+
+
+def test_two_writers_get_distinct_rows(store_path):
+    one = VectorStorage(store_path, dim=DIM)
+    two = VectorStorage(store_path, dim=DIM)
+    one.add_vector("a", unit(0))
+    two.add_vector("b", unit(1))
+    one.add_vector("c", unit(2))
+
+    for store in (one, two):
+        assert len(store) == 3
+        assert store.query(unit(0), top_k=1) == ["a"]
+        assert store.query(unit(1), top_k=1) == ["b"]
+        assert store.query(unit(2), top_k=1) == ["c"]
+
+
+def test_reader_follows_growth_and_rebuild(store_path):
+    writer = VectorStorage(store_path, dim=DIM)
+    reader = VectorStorage(store_path, dim=DIM)
+    keys = [f"k{i}" for i in range(3000)]
+    writer.add_vectors(keys, np.stack([unit(i, 0.001 * i) for i in range(3000)]))
+    writer.remove_prefix("k1")
+    assert reader.query(unit(5, 0.005), top_k=1) == ["k5"]
+
+    writer.rebuild_index(n_lists=8)
+    assert len(reader) == len(writer)
+    assert reader.query(unit(5, 0.005), top_k=1) == ["k5"]
+    assert reader.search(unit(5, 0.005), top_k=1, mode="ann")[0]["key"] == "k5"
+
+
+def test_failed_rebuild_leaves_store_intact(store_path, monkeypatch):
+    store = VectorStorage(store_path, dim=DIM)
+    store.add_vectors(["a", "b"], np.stack([unit(0), unit(1)]))
+    store.remove_vector("a")
+
+    def boom(*args, **kwargs):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr("memory.vector_store.IVFIndex.train", boom)
+    with pytest.raises(RuntimeError):
+        store.rebuild_index(n_lists=1)
+    monkeypatch.undo()
+
+    assert store.query(unit(1), top_k=2) == ["b"]
+    assert VectorStorage(store_path, dim=DIM).query(unit(1), top_k=2) == ["b"]
+
+
+def _write_keys(path, worker, count):
+    store = VectorStorage(path, dim=DIM)
+    for start in range(0, count, 10):
+        store.add_vectors([f"w{worker}-{i}" for i in range(start, start + 10)],
+                          np.stack([unit(worker, 0.001 * i) for i in range(start, start + 10)]))
+    store.close()
+
+
+def test_concurrent_processes_keep_every_key(store_path):
+    ctx = multiprocessing.get_context("spawn")
+    workers = [ctx.Process(target=_write_keys, args=(store_path, w, 200)) for w in range(3)]
+    for p in workers:
+        p.start()
+    for p in workers:
+        p.join(60)
+        assert p.exitcode == 0
+
+    store = VectorStorage(store_path, dim=DIM)
+    assert len(store) == 600
+    for worker in range(3):
+        assert store.query(unit(worker, 0.1), top_k=1)[0].startswith(f"w{worker}-")